@@ -1,14 +1,35 @@
+import os
+
 from dependency_injector import containers, providers
 
 from App.Controllers.CustomController import CustomController
+from App.Controllers.MetricsController import MetricsController
+from App.Controllers.NotificationsController import NotificationsController
 from App.Controllers.ProductsController import ProductsController
 from App.Controllers.SizeChartController import SizeChartController
 from App.Dynamo.MeliUsers import MeliUsers
+from App.Dynamo.SharedCache import DynamoSharedCache
 from App.Services.AccessTokenService import AccessTokenService
+from App.Services.MeliApiClient import MeliApiClient
+from App.Services.MeliNotificationsService import MeliNotificationsService
 from App.Services.MeliProducts import MeliProducts
 from App.Services.MeliSizeChartService import MeliSizeChartService
 from App.Services.MeliUsersService import MeliUsersService
 from App.Services.ResponseHandlerService import ResponseHandlerService
+from App.Utils.Batcher import KeyedBatcher
+from App.Utils.Cache import TTLCache
+from App.Utils.CategoryTree import CategoryTree
+from App.Utils.HttpCache import HttpCache
+from App.Utils.ItemMirror import ItemMirror
+from App.Utils.Metrics import metrics
+from App.Utils.RateLimiter import RateLimiter
+from App.Utils.SingleFlight import SingleFlight
+from App.Utils.TieredCache import InMemorySharedStore, TieredCache
+
+
+def _shared_cache_backend():
+    """Almacén compartido de las cachés: dynamodb | memory | none (default)."""
+    return os.environ.get("SHARED_CACHE_BACKEND", "none").lower()
 
 
 # factories
@@ -16,14 +37,165 @@ class Container(containers.DeclarativeContainer):
     # dynamo
     meli_users = providers.Factory(MeliUsers)
 
+    # almacén compartido entre contenedores (segundo nivel de las TieredCache)
+    shared_cache_store = providers.Selector(
+        providers.Callable(_shared_cache_backend),
+        dynamodb=providers.Singleton(
+            DynamoSharedCache,
+            table_name=os.environ.get("SHARED_CACHE_TABLE", "meli_shared_cache"),
+            region_name=os.environ.get("AWS_REGION", "us-east-2")
+        ),
+        memory=providers.Singleton(InMemorySharedStore),
+        none=providers.Object(None)
+    )
+
+    # cachés compartidas en el proceso (y entre contenedores si hay almacén compartido)
+    category_tree_cache = providers.Singleton(
+        TieredCache,
+        providers.Factory(
+            TTLCache,
+            maxsize=32,
+            ttl=int(os.environ.get("CATEGORY_TREE_TTL", 21600)),
+            name="category_tree"
+        ),
+        shared_cache_store,
+        encode=CategoryTree.to_state,
+        decode=CategoryTree.from_state
+    )
+    category_attributes_cache = providers.Singleton(
+        TieredCache,
+        providers.Factory(
+            TTLCache,
+            maxsize=512,
+            ttl=int(os.environ.get("CATEGORY_ATTRIBUTES_TTL", 21600)),
+            name="category_attributes"
+        ),
+        shared_cache_store
+    )
+    category_rules_cache = providers.Singleton(
+        TTLCache,
+        maxsize=512,
+        ttl=int(os.environ.get("CATEGORY_ATTRIBUTES_TTL", 21600)),
+        name="category_rules"
+    )
+
+    size_chart_cache = providers.Singleton(
+        TieredCache,
+        providers.Factory(
+            TTLCache,
+            maxsize=1024,
+            ttl=int(os.environ.get("SIZE_CHART_TTL", 300)),
+            name="size_chart"
+        ),
+        shared_cache_store
+    )
+
+    # índices de las guías de cada vendedor para elegir la guía de un producto (solo en el proceso)
+    size_chart_index_cache = providers.Singleton(
+        TTLCache,
+        maxsize=256,
+        ttl=int(os.environ.get("SIZE_CHART_LIST_TTL", 300)),
+        name="size_chart_index"
+    )
+
+    # estado de las asociaciones masivas de guías de tallas (para reanudarlas)
+    size_chart_run_cache = providers.Singleton(
+        TieredCache,
+        providers.Factory(
+            TTLCache,
+            maxsize=64,
+            ttl=int(os.environ.get("SIZE_CHART_RUN_TTL", 86400)),
+            name="size_chart_runs"
+        ),
+        shared_cache_store
+    )
+
+    # último estado conocido de los items de cada vendedor
+    item_mirror = providers.Singleton(
+        ItemMirror,
+        providers.Singleton(
+            TieredCache,
+            providers.Factory(
+                TTLCache,
+                maxsize=int(os.environ.get("ITEM_MIRROR_MAX_ENTRIES", 4096)),
+                ttl=int(os.environ.get("ITEM_MIRROR_TTL", 3600)),
+                name="item_mirror"
+            ),
+            shared_cache_store
+        )
+    )
+
+    # IDs de notificaciones ya recibidas (descarta los reintentos de Mercado Libre)
+    notification_dedupe_cache = providers.Singleton(
+        TieredCache,
+        providers.Factory(
+            TTLCache,
+            maxsize=4096,
+            ttl=int(os.environ.get("MELI_NOTIFICATION_DEDUPE_SECONDS", 300)),
+            name="notifications"
+        ),
+        shared_cache_store
+    )
+    # items notificados pendientes de leer, en lotes por vendedor
+    notification_batcher = providers.Singleton(
+        KeyedBatcher,
+        max_size=int(os.environ.get("MELI_NOTIFICATION_BATCH_SIZE", 20)),
+        max_delay=float(os.environ.get("MELI_NOTIFICATION_BATCH_DELAY", 1)),
+        name="notifications"
+    )
+
+    # turnos por vendedor para las llamadas masivas a la API
+    rate_limiter = providers.Singleton(RateLimiter)
+
+    # respuestas GET de la API de Mercado Libre (semántica HTTP, por vendedor o públicas)
+    http_cache = providers.Singleton(HttpCache)
+    # lecturas GET idénticas en curso compartidas entre hilos del proceso
+    single_flight = providers.Singleton(SingleFlight)
+
+    # métricas del proceso (contadores e histogramas)
+    metrics_registry = providers.Object(metrics)
+
     # servicios
-    access_token_service = providers.Factory(AccessTokenService)
+    access_token_service = providers.Factory(AccessTokenService, meli_users)
     meli_users_service = providers.Factory(MeliUsersService, meli_users, access_token_service)
-    meli_products_service = providers.Factory(MeliProducts, meli_users_service)
-    meli_size_chart_service = providers.Factory(MeliSizeChartService, meli_users_service)
+    meli_api_client = providers.Factory(
+        MeliApiClient,
+        meli_users_service,
+        http_cache=http_cache,
+        single_flight=single_flight
+    )
+    meli_size_chart_service = providers.Factory(
+        MeliSizeChartService,
+        meli_users_service,
+        meli_api_client,
+        size_chart_cache,
+        rate_limiter,
+        size_chart_run_cache,
+        size_chart_index_cache
+    )
+    meli_products_service = providers.Factory(
+        MeliProducts,
+        meli_users_service,
+        category_tree_cache,
+        category_attributes_cache,
+        category_rules_cache,
+        meli_api_client,
+        meli_size_chart_service,
+        item_mirror
+    )
+    meli_notifications_service = providers.Factory(
+        MeliNotificationsService,
+        meli_users_service,
+        meli_products_service,
+        notification_dedupe_cache,
+        notification_batcher
+    )
     response_handler_service = providers.Factory(ResponseHandlerService)
 
     # controladores
     custom_controller = providers.Factory(CustomController, response_handler_service)
+    metrics_controller = providers.Factory(MetricsController, metrics_registry)
     products_controller = providers.Factory(ProductsController, response_handler_service, meli_products_service)
-    size_chart_controller = providers.Factory(SizeChartController, response_handler_service, meli_size_chart_service)
\ No newline at end of file
+    size_chart_controller = providers.Factory(SizeChartController, response_handler_service, meli_size_chart_service)
+    notifications_controller = providers.Factory(
+        NotificationsController, response_handler_service, meli_notifications_service)
\ No newline at end of file
@@ -0,0 +1,15 @@
+from flask import Response
+
+from App.Utils.Metrics import OPENMETRICS_CONTENT_TYPE, MetricsRegistry
+
+
+class MetricsController:
+    """
+    Controlador del endpoint de scrape de métricas (formato OpenMetrics).
+    """
+
+    def __init__(self, metrics_registry: MetricsRegistry):
+        self.metrics_registry = metrics_registry
+
+    def scrape(self):
+        return Response(self.metrics_registry.render_openmetrics(), status=200, content_type=OPENMETRICS_CONTENT_TYPE)
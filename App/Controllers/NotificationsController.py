@@ -0,0 +1,46 @@
+from App.Services.MeliNotificationsService import MeliNotificationsService
+from App.Services.ResponseHandlerService import ResponseHandlerService
+from App.Utils.Logger import app_logger
+from App.Utils.SchemaCompiler import compile_schema
+from App.Utils.Timing import span
+from App.Models.Schemas.MeliSchemas import NotificationSchema
+
+
+class NotificationsController:
+    """
+    Controlador de las notificaciones (callbacks) de Mercado Libre.
+    """
+
+    def __init__(self,
+                 response_handler_service: ResponseHandlerService,
+                 meli_notifications_service: MeliNotificationsService):
+        self.response_handler_service = response_handler_service
+        self.meli_notifications_service = meli_notifications_service
+
+        # Esquemas de validación
+        self.notification_schema = NotificationSchema()
+
+    def receive_notification(self, data):
+        """
+        Recibe una notificación. En servidor responde de inmediato (el item se procesa en
+        segundo plano); en Lambda responde después de leer el item.
+        """
+        if data is None or len(data) == 0:
+            app_logger.warning("Datos faltantes en receive_notification")
+            return self.response_handler_service.bad_request("missing data")
+
+        # Validar datos
+        with span("validation"):
+            errors = compile_schema(self.notification_schema).validate(data)
+        if errors:
+            app_logger.warning(f"Errores de validación: {errors}")
+            return self.response_handler_service.bad_request(errors)
+
+        result = self.meli_notifications_service.receive_notification(data)
+
+        # Un error interno responde 500 para que Mercado Libre reintente la notificación
+        if "error" in result:
+            return self.response_handler_service.internal_server_error(result)
+
+        self.response_handler_service.setData(result)
+        return self.response_handler_service.ok("OK")
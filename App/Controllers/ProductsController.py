@@ -1,6 +1,12 @@
+import os
+
 from App.Services.MeliProducts import MeliProducts
 from App.Services.ResponseHandlerService import ResponseHandlerService
 from App.Utils.Logger import app_logger
+from App.Utils.Pagination import wants_pagination
+
+# Tiempo (segundos) que clientes y API Gateway pueden reutilizar las reglas sin revalidar
+RULES_MAX_AGE = int(os.environ.get("RULES_MAX_AGE", 300))
 
 
 class ProductsController:
@@ -90,6 +96,36 @@ class ProductsController:
             self.responseHandlerService.setData(result)
             return self.responseHandlerService.ok("OK")
 
+    def verify_products_batch(self, data):
+        if data is None or len(data) == 0 or 'item_ids' not in data:
+            app_logger.warning("Datos faltantes en verify_products_batch")
+            return self.responseHandlerService.bad_request("missing data or item_ids")
+        else:
+            app_logger.info(f"Verificando {len(data.get('item_ids') or [])} productos")
+            result = self.meliProducts.verify_products_batch(data)
+
+            if "error" in result:
+                app_logger.warning(f"Error al verificar productos: {result.get('error')}")
+                return self.responseHandlerService.bad_request(result)
+
+            self.responseHandlerService.setData(result)
+            return self.responseHandlerService.ok("OK")
+
+    def validate_products_batch(self, data):
+        if data is None or len(data) == 0 or 'products' not in data:
+            app_logger.warning("Datos faltantes en validate_products_batch")
+            return self.responseHandlerService.bad_request("missing data or products")
+        else:
+            app_logger.info(f"Validando {len(data.get('products') or [])} productos")
+            result = self.meliProducts.validate_products_batch(data)
+
+            if "error" in result:
+                app_logger.warning(f"Error al validar productos: {result.get('error')}")
+                return self.responseHandlerService.bad_request(result)
+
+            self.responseHandlerService.setData(result)
+            return self.responseHandlerService.ok("OK")
+
     def update_product(self, data):
         if data is None or len(data) == 0 or 'item_id' not in data or 'update_data' not in data:
             app_logger.warning("Datos faltantes en update_product")
@@ -105,18 +141,54 @@ class ProductsController:
             self.responseHandlerService.setData(result)
             return self.responseHandlerService.ok("OK")
 
-    def get_product_rules(self, data):
+    def get_product_rules(self, data, if_none_match=None):
         from App.Utils.MeliRulesHelper import MeliRulesHelper
 
         app_logger.info("Obteniendo reglas de producto")
 
-        # Usar el helper para extraer y normalizar las reglas
-        rules_helper = MeliRulesHelper()
-        rules = rules_helper.get_normalized_rules()
+        if data.get('category_id'):
+            # Reglas combinadas con los atributos de la categoría (en caché por categoría)
+            result = self.meliProducts.get_category_rules(data)
+            if "error" in result:
+                app_logger.warning(f"Error al obtener reglas de categoría: {result.get('error')}")
+                if result.get("resource_type"):
+                    return self.responseHandlerService.not_found(result)
+                return self.responseHandlerService.bad_request(result)
+            rules, etag = result["rules"], result["etag"]
+        else:
+            # Las reglas se calculan una vez por proceso y se sirven con un ETag estable
+            rules, etag = MeliRulesHelper.get_cached_rules()
+
+        self.responseHandlerService.setHeaders({
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={RULES_MAX_AGE}"
+        })
+
+        if self.responseHandlerService.etag_matches(if_none_match, etag):
+            return self.responseHandlerService.not_modified()
 
         self.responseHandlerService.setData(rules)
         return self.responseHandlerService.ok("OK")
 
+    def _normalize_max_depth(self, data):
+        """Limita max_depth a 5 niveles y usa 3 si el valor no es válido."""
+        if 'max_depth' in data:
+            try:
+                max_depth = int(data['max_depth'])
+                if max_depth > 5:
+                    app_logger.warning(f"max_depth ({max_depth}) es demasiado grande, limitando a 5")
+                    data['max_depth'] = 5
+            except ValueError:
+                app_logger.warning(f"max_depth inválido ({data['max_depth']}), usando valor predeterminado")
+                data['max_depth'] = 3
+
+    def _normalize_limit(self, data, default, maximum):
+        """Convierte el parámetro limit a entero dentro del rango [1, maximum]."""
+        try:
+            data['limit'] = max(1, min(int(data.get('limit', default)), maximum))
+        except (TypeError, ValueError):
+            data['limit'] = default
+
     # Agregar este método en la clase ProductsController
 
     def get_category_tree(self, data):
@@ -131,6 +203,12 @@ class ProductsController:
                 - max_depth (int, opcional): Profundidad máxima de recursión
                 - include_parents (bool, opcional): Si es True, incluirá la ruta completa de padres
                 - fetch_pathways (bool, opcional): Si es True, obtendrá rutas adicionales de categorías
+                - format (str, opcional): 'ndjson' para recibir un registro plano por línea en streaming.
+                  El estado HTTP (200) se envía antes de recorrer el árbol: si el recorrido falla,
+                  la última línea es un registro {"error", "details"} y el cliente debe revisarla.
+                  En Lambda la respuesta se arma completa antes de enviarse (ver LambdaAdapter),
+                  por lo que no hay beneficio de tiempo al primer byte ni de memoria
+                - cursor / page / page_size (opcional): devuelve registros planos paginados
 
         Returns:
             Response: Respuesta HTTP con el árbol de categorías o error
@@ -146,15 +224,7 @@ class ProductsController:
         app_logger.info(f"Obteniendo árbol de categorías para shop_id: {data.get('shop_id')}")
 
         # Validar max_depth para prevenir sobrecarga
-        if 'max_depth' in data:
-            try:
-                max_depth = int(data['max_depth'])
-                if max_depth > 5:
-                    app_logger.warning(f"max_depth ({max_depth}) es demasiado grande, limitando a 5")
-                    data['max_depth'] = 5
-            except ValueError:
-                app_logger.warning(f"max_depth inválido ({data['max_depth']}), usando valor predeterminado")
-                data['max_depth'] = 3
+        self._normalize_max_depth(data)
 
         # Manejar parámetros booleanos que pueden venir como strings
         if 'include_parents' in data and isinstance(data['include_parents'], str):
@@ -163,6 +233,29 @@ class ProductsController:
         if 'fetch_pathways' in data and isinstance(data['fetch_pathways'], str):
             data['fetch_pathways'] = data['fetch_pathways'].lower() in ('true', '1', 't', 'y', 'yes')
 
+        # Modo streaming: un registro plano por categoría conforme se descubre
+        if str(data.get('format', '')).lower() == 'ndjson':
+            result = self.meliProducts.get_category_tree_stream(data)
+
+            if "error" in result:
+                app_logger.warning(f"Error al obtener árbol de categorías: {result.get('error')}")
+                return self.responseHandlerService.bad_request(result)
+
+            return self.responseHandlerService.ndjson(result["records"])
+
+        # Modo paginado: registros planos del árbol en caché por páginas
+        if wants_pagination(data):
+            result = self.meliProducts.get_category_tree_page(data)
+
+            if "error" in result:
+                app_logger.warning(f"Error al obtener página del árbol de categorías: {result.get('error')}")
+                return self.responseHandlerService.bad_request(result)
+
+            pagination = result.pop("pagination")
+            self.responseHandlerService.setData(result)
+            self.responseHandlerService.buildPaginatedResponse(**pagination)
+            return self.responseHandlerService.ok("OK")
+
         # Llamar al servicio para obtener el árbol
         result = self.meliProducts.get_category_tree(data)
 
@@ -173,4 +266,57 @@ class ProductsController:
 
         # Devolver resultado exitoso
         self.responseHandlerService.setData(result)
-        return self.responseHandlerService.ok("Árbol de categorías obtenido correctamente")
\ No newline at end of file
+        return self.responseHandlerService.ok("Árbol de categorías obtenido correctamente")
+
+    def search_categories(self, data):
+        """Busca categorías por nombre sobre el árbol en caché."""
+        if data is None or len(data) == 0 or 'shop_id' not in data or not data.get('q'):
+            app_logger.warning("Datos faltantes en search_categories")
+            return self.responseHandlerService.bad_request("shop_id and q are required")
+
+        self._normalize_max_depth(data)
+        self._normalize_limit(data, 20, 100)
+        result = self.meliProducts.search_categories(data)
+
+        if "error" in result:
+            app_logger.warning(f"Error al buscar categorías: {result.get('error')}")
+            return self.responseHandlerService.bad_request(result)
+
+        self.responseHandlerService.setData(result)
+        return self.responseHandlerService.ok("OK")
+
+    def autocomplete_categories(self, data):
+        """Sugiere categorías a partir de un prefijo del nombre."""
+        if data is None or len(data) == 0 or 'shop_id' not in data or not data.get('prefix'):
+            app_logger.warning("Datos faltantes en autocomplete_categories")
+            return self.responseHandlerService.bad_request("shop_id and prefix are required")
+
+        self._normalize_max_depth(data)
+        self._normalize_limit(data, 10, 50)
+        result = self.meliProducts.autocomplete_categories(data)
+
+        if "error" in result:
+            app_logger.warning(f"Error al autocompletar categorías: {result.get('error')}")
+            return self.responseHandlerService.bad_request(result)
+
+        self.responseHandlerService.setData(result)
+        return self.responseHandlerService.ok("OK")
+
+    def get_category_subtree(self, data):
+        """Obtiene ancestros y descendientes de una categoría sobre el árbol en caché."""
+        if data is None or len(data) == 0 or 'shop_id' not in data or not data.get('category_id'):
+            app_logger.warning("Datos faltantes en get_category_subtree")
+            return self.responseHandlerService.bad_request("shop_id and category_id are required")
+
+        self._normalize_max_depth(data)
+        self._normalize_limit(data, 500, 5000)
+        result = self.meliProducts.get_category_subtree(data)
+
+        if "error" in result:
+            app_logger.warning(f"Error al obtener subárbol de categoría: {result.get('error')}")
+            if result.get("resource_type"):
+                return self.responseHandlerService.not_found(result)
+            return self.responseHandlerService.bad_request(result)
+
+        self.responseHandlerService.setData(result)
+        return self.responseHandlerService.ok("OK")
@@ -1,9 +1,12 @@
 from App.Services.MeliSizeChartService import MeliSizeChartService
 from App.Services.ResponseHandlerService import ResponseHandlerService
 from App.Utils.Logger import app_logger
+from App.Utils.SchemaCompiler import compile_schema
+from App.Utils.Timing import span
 from App.Models.Schemas.MeliSizeGridSchemas import (
     SizeChartCreateRequestSchema, SizeChartGetRequestSchema,
-    SizeChartListRequestSchema, AssociateSizeChartRequestSchema
+    SizeChartListRequestSchema, AssociateSizeChartRequestSchema, AssociateSizeChartBatchRequestSchema,
+    SizeChartMatchRequestSchema
 )
 
 
@@ -23,6 +26,8 @@ class SizeChartController:
         self.get_schema = SizeChartGetRequestSchema()
         self.create_schema = SizeChartCreateRequestSchema()
         self.associate_schema = AssociateSizeChartRequestSchema()
+        self.associate_batch_schema = AssociateSizeChartBatchRequestSchema()
+        self.match_schema = SizeChartMatchRequestSchema()
 
     def not_implemented(self):
         """Método para manejar solicitudes no implementadas."""
@@ -31,7 +36,8 @@ class SizeChartController:
 
     def _validate_data(self, schema, data):
         """Valida los datos con el esquema especificado."""
-        errors = schema.validate(data)
+        with span("validation"):
+            errors = compile_schema(schema).validate(data)
         if errors:
             app_logger.warning(f"Errores de validación: {errors}")
             return False, errors
@@ -57,8 +63,11 @@ class SizeChartController:
             app_logger.warning(f"Error al listar guías de tallas: {result.get('error')}")
             return self.response_handler_service.bad_request(result)
 
-        # Devolver resultado exitoso
+        # Devolver resultado exitoso con el bloque de paginación
+        pagination = result.pop("pagination", None)
         self.response_handler_service.setData(result)
+        if pagination:
+            self.response_handler_service.buildPaginatedResponse(**pagination)
         return self.response_handler_service.ok("OK")
 
     def get_size_chart(self, data):
@@ -131,4 +140,53 @@ class SizeChartController:
 
         # Devolver resultado exitoso
         self.response_handler_service.setData(result)
-        return self.response_handler_service.ok("OK")
\ No newline at end of file
+        return self.response_handler_service.ok("OK")
+
+    def associate_size_chart_batch(self, data):
+        """Asocia una guía de tallas a varios productos (reanudable con run_id)."""
+        if data is None or len(data) == 0:
+            app_logger.warning("Datos faltantes en associate_size_chart_batch")
+            return self.response_handler_service.bad_request("missing data")
+
+        # Validar datos
+        valid, errors = self._validate_data(self.associate_batch_schema, data)
+        if not valid:
+            return self.response_handler_service.bad_request(errors)
+
+        # Procesar solicitud
+        app_logger.info(f"Asociando guía de tallas {data.get('size_chart_id')} a "
+                        f"{len(data.get('item_ids') or [])} productos")
+        result = self.meli_size_chart_service.associate_size_chart_batch(data)
+
+        # Manejar errores
+        if "error" in result:
+            app_logger.warning(f"Error en la asociación masiva de guía de tallas: {result.get('error')}")
+            return self.response_handler_service.bad_request(result)
+
+        # Devolver resultado (incluye los items fallidos o pendientes)
+        self.response_handler_service.setData(result)
+        return self.response_handler_service.ok("OK")
+
+    def match_size_chart(self, data):
+        """Elige la guía de tallas que corresponde a un producto (y opcionalmente la asocia)."""
+        if data is None or len(data) == 0:
+            app_logger.warning("Datos faltantes en match_size_chart")
+            return self.response_handler_service.bad_request("missing data")
+
+        # Validar datos
+        valid, errors = self._validate_data(self.match_schema, data)
+        if not valid:
+            return self.response_handler_service.bad_request(errors)
+
+        # Procesar solicitud
+        app_logger.info(f"Buscando guía de tallas para shop_id: {data.get('shop_id')}")
+        result = self.meli_size_chart_service.match_size_chart(data)
+
+        # Manejar errores
+        if "error" in result:
+            app_logger.warning(f"Error al elegir guía de tallas: {result.get('error')}")
+            return self.response_handler_service.bad_request(result)
+
+        # Devolver resultado (match es null si ninguna guía cubre las tallas del producto)
+        self.response_handler_service.setData(result)
+        return self.response_handler_service.ok("OK")
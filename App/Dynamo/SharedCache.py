@@ -0,0 +1,50 @@
+import time
+
+import boto3
+from boto3.dynamodb.types import Binary
+from botocore.exceptions import ClientError
+
+
+class DynamoSharedCache:
+    """
+    Almacén compartido de App.Utils.TieredCache sobre una tabla de DynamoDB.
+
+    La tabla usa cache_key (string) como llave de partición y expires_at (epoch en
+    segundos) como atributo de TTL. DynamoDB borra los elementos vencidos con retraso,
+    por eso las lecturas también comparan expires_at. Los errores se propagan para que
+    TieredCache los trate como fallos de caché.
+    """
+
+    def __init__(self, table_name="meli_shared_cache", region_name="us-east-2"):
+        self.dynamodb = boto3.resource("dynamodb", region_name=region_name)
+        self.table = self.dynamodb.Table(table_name)
+
+    def get(self, key):
+        """Devuelve (bytes, expires_at) o None si no existe o ya expiró."""
+        item = self.table.get_item(Key={"cache_key": key}).get("Item")
+        if item is None or int(item["expires_at"]) <= time.time():
+            return None
+        return item["value"].value, int(item["expires_at"])
+
+    def set(self, key, data, ttl):
+        self.table.put_item(
+            Item={"cache_key": key, "value": Binary(data), "expires_at": int(time.time() + ttl)}
+        )
+
+    def add(self, key, data, ttl):
+        """Guarda la llave solo si no existe (o ya expiró). Devuelve True si la guardó."""
+        now = int(time.time())
+        try:
+            self.table.put_item(
+                Item={"cache_key": key, "value": Binary(data), "expires_at": now + int(ttl)},
+                ConditionExpression="attribute_not_exists(cache_key) OR expires_at <= :now",
+                ExpressionAttributeValues={":now": now}
+            )
+            return True
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def delete(self, key):
+        self.table.delete_item(Key={"cache_key": key})
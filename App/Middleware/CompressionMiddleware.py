@@ -0,0 +1,88 @@
+import gzip
+import os
+
+from flask import request
+
+from App.Utils.Logger import app_logger
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "text/plain",
+    "text/html",
+    "text/csv"
+}
+
+
+def _supported_encodings():
+    """Codificaciones soportadas en orden de preferencia del servidor."""
+    if brotli is not None:
+        return ["br", "gzip"]
+    return ["gzip"]
+
+
+def _compress(data, encoding, gzip_level, brotli_quality):
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level)
+
+
+def apply_compression(app, min_size=None, gzip_level=None, brotli_quality=None):
+    """
+    Registra la compresión de respuestas (gzip/brotli) en la aplicación Flask.
+
+    La codificación se negocia a partir del header Accept-Encoding y solo se
+    comprimen respuestas exitosas, no transmitidas en streaming, de tipos de
+    contenido textuales y con un tamaño mayor o igual a min_size bytes.
+
+    Args:
+        app: Aplicación Flask
+        min_size: Tamaño mínimo en bytes para comprimir (default: COMPRESSION_MIN_SIZE o 1024)
+        gzip_level: Nivel de compresión gzip (default: COMPRESSION_GZIP_LEVEL o 6)
+        brotli_quality: Calidad de compresión brotli (default: COMPRESSION_BROTLI_QUALITY o 5)
+    """
+    min_size = int(min_size if min_size is not None else os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+    gzip_level = int(gzip_level if gzip_level is not None else os.environ.get("COMPRESSION_GZIP_LEVEL", 6))
+    brotli_quality = int(
+        brotli_quality if brotli_quality is not None else os.environ.get("COMPRESSION_BROTLI_QUALITY", 5))
+    encodings = _supported_encodings()
+
+    @app.after_request
+    def compress_response(response):
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if response.status_code < 200 or response.status_code >= 300 or response.status_code == 204:
+            return response
+        if "Content-Encoding" in response.headers:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        encoding = request.accept_encodings.best_match(encodings)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        try:
+            compressed = _compress(data, encoding, gzip_level, brotli_quality)
+        except Exception as e:
+            app_logger.warning(f"No se pudo comprimir la respuesta con {encoding}: {str(e)}")
+            return response
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Content-Length"] = str(len(compressed))
+        return response
+
+    return app
@@ -0,0 +1,88 @@
+import cProfile
+import hmac
+import os
+import uuid
+
+from flask import g, request
+
+from App.Utils import Logger
+from App.Utils.JsonProvider import dumps_bytes
+from App.Utils.Profiling import profile_summary
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_QUERY_PARAM = "__profile"
+PROFILE_OUTPUT_HEADER = "X-Profile-Output"
+
+
+def apply_profiling(app, token=None, top_n=None):
+    """
+    Registra el perfilado bajo demanda (cProfile) de peticiones individuales.
+
+    Solo se activa si hay un token configurado (PROFILING_TOKEN). Sin token no se registra
+    ningún hook, por lo que las peticiones no pagan ningún costo. Con token, se perfila
+    únicamente la petición que envía el mismo valor en el header X-Profile-Token o en el
+    parámetro __profile.
+
+    El resumen del perfil (tiempo por función, llamadores y pilas más costosas) se guarda
+    en los logs (extra_data, MongoDB) con un profile_id que se devuelve en el header
+    X-Profile-Id. Con X-Profile-Output: inline también se agrega al cuerpo de las
+    respuestas JSON en la llave "profile".
+
+    cProfile solo mide el hilo de la petición: el trabajo de los pools de hilos (multiget,
+    validación masiva) aparece como tiempo de espera en el hilo principal. Se debe registrar
+    después de la compresión para que el perfil se agregue antes de comprimir la respuesta.
+
+    Args:
+        app: Aplicación Flask
+        token: Token que habilita el perfilado (default: PROFILING_TOKEN)
+        top_n: Funciones a incluir en el resumen (default: PROFILING_TOP_N o 40)
+    """
+    token = token if token is not None else os.environ.get("PROFILING_TOKEN", "")
+    if not token:
+        return app
+    top_n = int(top_n if top_n is not None else os.environ.get("PROFILING_TOP_N", 40))
+    expected = token.encode("utf-8")
+
+    def _requested():
+        supplied = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_PARAM)
+        return bool(supplied) and hmac.compare_digest(supplied.encode("utf-8"), expected)
+
+    @app.before_request
+    def start_profiling():
+        if not _requested():
+            return
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+    @app.after_request
+    def finish_profiling(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+
+        profile_id = uuid.uuid4().hex
+        summary = profile_summary(profiler, top_n)
+        body = request.get_json(silent=True) if request.is_json else None
+        shop_id = request.args.get("shop_id") or (body.get("shop_id") if isinstance(body, dict) else None)
+        Logger.info(
+            f"Perfil de la petición {request.method} {request.path}: "
+            f"{summary['total_calls']} llamadas en {summary['total_ms']:.1f} ms",
+            extra_data={
+                "profile_id": profile_id,
+                "request": {"method": request.method, "path": request.path, "shop_id": shop_id},
+                "status": response.status_code,
+                "profile": summary
+            }
+        )
+        response.headers["X-Profile-Id"] = profile_id
+
+        inline = request.headers.get(PROFILE_OUTPUT_HEADER, "").lower() == "inline"
+        if inline and response.is_json and not response.is_streamed:
+            body = response.get_json(silent=True)
+            if isinstance(body, dict):
+                body["profile"] = dict(summary, profile_id=profile_id)
+                response.set_data(dumps_bytes(body))
+        return response
+
+    return app
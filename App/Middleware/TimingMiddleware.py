@@ -0,0 +1,87 @@
+import logging
+import os
+
+from flask import g, request
+
+from App.Utils import Logger
+from App.Utils.Metrics import metrics
+from App.Utils.Timing import TIMING_ENABLED, current_timing, end_request_timing, start_request_timing
+
+request_duration = metrics.histogram(
+    "meli_api_http_request_duration_seconds",
+    "Duración de las peticiones HTTP por ruta",
+    ("method", "route")
+)
+requests_total = metrics.counter(
+    "meli_api_http_requests",
+    "Peticiones HTTP atendidas por ruta y código de respuesta",
+    ("method", "route", "status")
+)
+
+
+def apply_timing(app, server_timing_header=None):
+    """
+    Registra la medición de tiempos por petición en la aplicación Flask.
+
+    Cada petición abre un contexto de medición en el que se acumulan los spans registrados
+    con App.Utils.Timing.span (consulta del usuario, validación, llamadas a Mercado Libre por
+    operation_name, renovación de token, serialización). Al terminar:
+
+    - se agrega el header Server-Timing a la respuesta (SERVER_TIMING_HEADER=false lo desactiva),
+    - se registra un log con los tiempos en extra_data (campo datos_adicionales en MongoDB),
+    - la duración total se agrega al histograma de la ruta (App.Utils.Metrics).
+
+    Conviene registrarla antes que la compresión para que el total la incluya.
+
+    Args:
+        app: Aplicación Flask
+        server_timing_header: Enviar el header Server-Timing (default: SERVER_TIMING_HEADER o True)
+    """
+    if not TIMING_ENABLED:
+        return app
+
+    if server_timing_header is None:
+        server_timing_header = os.environ.get("SERVER_TIMING_HEADER", "true").lower() != "false"
+
+    @app.before_request
+    def start_timing():
+        g.timing_token = start_request_timing()
+        g.timing = current_timing()
+
+    @app.after_request
+    def finish_timing(response):
+        timing = g.get("timing")
+        if timing is None:
+            return response
+
+        route = request.url_rule.rule if request.url_rule else "sin_ruta"
+        timings = timing.as_dict()
+        request_duration.observe(timings["total_ms"] / 1000, method=request.method, route=route)
+        requests_total.inc(method=request.method, route=route, status=response.status_code)
+
+        if server_timing_header:
+            response.headers["Server-Timing"] = timing.server_timing()
+
+        if Logger.app_logger.isEnabledFor(logging.INFO):
+            Logger.info(
+                f"Petición {request.method} {request.path} completada: "
+                f"Status={response.status_code} en {timings['total_ms']:.1f} ms",
+                extra_data={
+                    "request": {"method": request.method, "path": request.path, "route": route},
+                    "status": response.status_code,
+                    "timing": timings
+                }
+            )
+        return response
+
+    @app.teardown_request
+    def end_timing(exc):
+        token = g.pop("timing_token", None)
+        if token is not None:
+            try:
+                end_request_timing(token)
+            except ValueError:
+                # Respuestas en streaming: el teardown puede ejecutarse en otro contexto
+                pass
+
+    return app
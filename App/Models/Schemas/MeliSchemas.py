@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validates, validate, ValidationError
+from marshmallow import EXCLUDE, Schema, fields, validates, validate, ValidationError
 import re
 
 
@@ -13,6 +13,8 @@ class CategoryAttributesRequestSchema(Schema):
     """Esquema para validar peticiones de atributos de categoría."""
     shop_id = fields.Str(required=True, description="ID de la tienda")
     category_id = fields.Str(required=True, description="ID de la categoría en Mercado Libre")
+    projection = fields.Str(required=False, data_key="fields",
+                            description="Campos de cada atributo a devolver separados por coma (ej: id,name,values.id)")
 
     @validates('category_id')
     def validate_category_id(self, value):
@@ -75,6 +77,8 @@ class ProductDataSchema(Schema):
                            description="Configuración de envío")
     sale_terms = fields.List(fields.Dict(), required=False,description="Terminos del producto")
     accepts_mercadopago = fields.Boolean(required=False, description="Acepta mercadopago")
+    catalog_listing = fields.Boolean(required=False,
+                                     description="Publicación de catálogo (exige los atributos catalog_required)")
 
 
 class ProductCreateRequestSchema(Schema):
@@ -82,12 +86,27 @@ class ProductCreateRequestSchema(Schema):
     shop_id = fields.Str(required=True, description="ID de la tienda")
     product_data = fields.Nested(ProductDataSchema, required=True,
                                  description="Datos completos del producto")
+    skip_preflight = fields.Bool(required=False,
+                                 description="Omitir la validación local de atributos de la categoría")
+    auto_size_chart = fields.Bool(required=False,
+                                  description="Asociar al publicar la guía de tallas del vendedor que corresponde al producto")
+
+
+class ProductValidateBatchRequestSchema(Schema):
+    """Esquema para validar peticiones de validación masiva de productos (sin publicar)."""
+    shop_id = fields.Str(required=True, description="ID de la tienda")
+    products = fields.List(fields.Dict(), required=True, validate=validate.Length(min=1, max=5000),
+                           description="Datos de los productos a validar (mismo formato que product_data)")
 
 
 class ProductVerifyRequestSchema(Schema):
     """Esquema para validar peticiones de verificación de productos."""
     shop_id = fields.Str(required=True, description="ID de la tienda")
     item_id = fields.Str(required=True, description="ID del producto en Mercado Libre")
+    projection = fields.Str(required=False, data_key="fields",
+                            description="Campos a devolver separados por coma (ej: status,sub_status,price)")
+    max_age = fields.Int(required=False, validate=validate.Range(min=0, max=86400),
+                         description="Edad máxima en segundos de la copia local aceptada (default: 0, siempre consulta la API)")
 
     @validates('item_id')
     def validate_item_id(self, value):
@@ -95,6 +114,25 @@ class ProductVerifyRequestSchema(Schema):
             raise ValidationError("El item_id debe tener el formato correcto (ej: MLM123456789)")
 
 
+class ProductVerifyBatchRequestSchema(Schema):
+    """Esquema para validar peticiones de verificación masiva de productos."""
+    shop_id = fields.Str(required=True, description="ID de la tienda")
+    item_ids = fields.List(fields.Str(), required=True, validate=validate.Length(min=1, max=5000),
+                           description="IDs de los productos en Mercado Libre")
+    attributes = fields.Str(required=False,
+                            description="Campos a devolver separados por coma (ej: id,status,price)")
+    projection = fields.Str(required=False, data_key="fields",
+                            description="Campos a devolver, admite campos anidados (ej: status,variations.id)")
+    max_age = fields.Int(required=False, validate=validate.Range(min=0, max=86400),
+                         description="Edad máxima en segundos de las copias locales aceptadas (default: 0)")
+
+    @validates('item_ids')
+    def validate_item_ids(self, value):
+        invalid = [item_id for item_id in value if not re.match(r'^ML[A-Z][0-9]+$', item_id)]
+        if invalid:
+            raise ValidationError(f"Los item_ids deben tener el formato correcto (ej: MLM123456789): {invalid[:10]}")
+
+
 class ProductUpdateDataSchema(Schema):
     """Esquema para validar datos de actualización de productos."""
     # Campos actualizables principales
@@ -117,8 +155,30 @@ class ProductUpdateRequestSchema(Schema):
     item_id = fields.Str(required=True, description="ID del producto en Mercado Libre")
     update_data = fields.Nested(ProductUpdateDataSchema, required=True,
                                 description="Datos a actualizar")
+    force = fields.Bool(required=False,
+                        description="Enviar todos los campos aunque coincidan con el item publicado")
+    state_max_age = fields.Int(required=False, validate=validate.Range(min=0, max=86400),
+                               description="Edad máxima en segundos de la copia local con la que se compara "
+                                           "(default: 0, siempre se lee el item de la API)")
 
     @validates('item_id')
     def validate_item_id(self, value):
         if not re.match(r'^ML[A-Z][0-9]+$', value):
-            raise ValidationError("El item_id debe tener el formato correcto (ej: MLM123456789)")
\ No newline at end of file
+            raise ValidationError("El item_id debe tener el formato correcto (ej: MLM123456789)")
+
+
+class NotificationSchema(Schema):
+    """Esquema de las notificaciones (callbacks) de Mercado Libre."""
+
+    class Meta:
+        # Mercado Libre puede agregar campos a las notificaciones
+        unknown = EXCLUDE
+
+    id = fields.Str(required=False, data_key="_id", description="ID de la notificación (se repite en los reintentos)")
+    resource = fields.Str(required=True, description="Recurso notificado (ej: /items/MLM123456789)")
+    user_id = fields.Int(required=True, description="ID del vendedor en Mercado Libre")
+    topic = fields.Str(required=True, description="Tópico de la notificación (ej: items)")
+    application_id = fields.Int(required=False, description="ID de la aplicación")
+    attempts = fields.Int(required=False, description="Número de intento de entrega")
+    sent = fields.Str(required=False, description="Fecha de envío")
+    received = fields.Str(required=False, description="Fecha de recepción en Mercado Libre")
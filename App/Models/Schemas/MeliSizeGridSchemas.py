@@ -1,4 +1,5 @@
 from marshmallow import Schema, fields, validates, validate, ValidationError
+import re
 
 
 class ValueSchema(Schema):
@@ -68,6 +69,8 @@ class SizeChartCreateRequestSchema(Schema):
         validate=validate.Length(min=1),
         description="Filas de la guía de tallas"
     )
+    allow_duplicate = fields.Bool(required=False,
+                                  description="Crear la guía aunque el vendedor ya tenga una idéntica (opcional)")
 
 
 class SizeChartGetRequestSchema(Schema):
@@ -81,10 +84,45 @@ class SizeChartListRequestSchema(Schema):
     shop_id = fields.Str(required=True, description="ID de la tienda")
     limit = fields.Int(required=False, description="Límite de resultados a devolver (opcional)")
     offset = fields.Int(required=False, description="Offset para paginación (opcional)")
+    page_size = fields.Int(required=False, validate=validate.Range(min=1, max=200),
+                           description="Tamaño de página (opcional)")
+    page = fields.Int(required=False, validate=validate.Range(min=1), description="Número de página, base 1 (opcional)")
+    cursor = fields.Str(required=False, description="Cursor devuelto en pagination.next_cursor (opcional)")
 
 
 class AssociateSizeChartRequestSchema(Schema):
     """Esquema para solicitudes de asociación de guías de tallas a productos."""
     shop_id = fields.Str(required=True, description="ID de la tienda")
     item_id = fields.Str(required=True, description="ID del producto en Mercado Libre")
-    size_chart_id = fields.Str(required=True, description="ID de la guía de tallas a asociar")
\ No newline at end of file
+    size_chart_id = fields.Str(required=True, description="ID de la guía de tallas a asociar")
+
+
+class AssociateSizeChartBatchRequestSchema(Schema):
+    """Esquema para solicitudes de asociación masiva de una guía de tallas a varios productos."""
+    shop_id = fields.Str(required=True, description="ID de la tienda")
+    size_chart_id = fields.Str(required=True, description="ID de la guía de tallas a asociar")
+    item_ids = fields.List(fields.Str(), required=True, validate=validate.Length(min=1, max=5000),
+                           description="IDs de los productos en Mercado Libre")
+    run_id = fields.Str(required=False,
+                        description="ID de una ejecución anterior para omitir los items ya asociados (opcional)")
+
+    @validates('item_ids')
+    def validate_item_ids(self, value):
+        invalid = [item_id for item_id in value if not re.match(r'^ML[A-Z][0-9]+$', item_id)]
+        if invalid:
+            raise ValidationError(f"Los item_ids deben tener el formato correcto (ej: MLM123456789): {invalid[:10]}")
+
+
+class SizeChartMatchRequestSchema(Schema):
+    """Esquema para solicitudes de elección de la guía de tallas de un producto."""
+    shop_id = fields.Str(required=True, description="ID de la tienda")
+    domain_id = fields.Str(required=False, description="Dominio del producto (ej: SNEAKERS o MLM-SNEAKERS)")
+    category_id = fields.Str(required=False, description="Categoría del producto (si no se indica domain_id)")
+    title = fields.Str(required=False, description="Título del producto, para predecir el dominio de la categoría")
+    attributes = fields.List(fields.Dict(), required=False, description="Atributos del producto (incluye SIZE)")
+    variations = fields.List(fields.Dict(), required=False, description="Variantes del producto con sus tallas")
+    item_id = fields.Str(required=False, validate=validate.Regexp(r'^ML[A-Z][0-9]+$'),
+                         description="ID del producto en Mercado Libre (requerido si associate es true)")
+    associate = fields.Bool(required=False, description="Asocia la guía elegida al producto")
+    limit = fields.Int(required=False, validate=validate.Range(min=1, max=10),
+                       description="Máximo de guías candidatas en la respuesta (default: 3)")
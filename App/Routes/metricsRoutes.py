@@ -0,0 +1,13 @@
+from flask import Blueprint
+
+from App.Controllers.MetricsController import MetricsController
+
+
+def create_metrics_routes(metrics_controller: MetricsController):
+    metrics_routes = Blueprint('metrics_routes', __name__)
+
+    @metrics_routes.route('/metrics', methods=['GET'])
+    def scrape_metrics():
+        return metrics_controller.scrape()
+
+    return metrics_routes
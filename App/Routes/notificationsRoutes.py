@@ -0,0 +1,19 @@
+from flask import Blueprint, request
+from App.Controllers.NotificationsController import NotificationsController
+from App.Middleware.ErrorHandlerMiddleware import apply_middleware_to_blueprint
+
+
+def create_notifications_routes(notifications_controller: NotificationsController):
+    """
+    Crea las rutas para las notificaciones de Mercado Libre.
+    """
+    notifications_routes = Blueprint('notifications_routes', __name__)
+
+    @notifications_routes.route('/meli/notifications', methods=['POST'])
+    def receive_notification():
+        """URL de callback configurada en la aplicación de Mercado Libre."""
+        request_data = request.get_json(silent=True) or {}
+        return notifications_controller.receive_notification(request_data)
+
+    # Aplicar middleware de manejo de errores
+    return apply_middleware_to_blueprint(notifications_routes)
@@ -47,6 +47,22 @@ def create_products_routes(productsController: ProductsController):
         else:
             return productsController.notImplemented()
 
+    @products_routes.route('/meli/products/verify/batch', methods=['POST'])
+    def verify_products_batch():
+        if request.method == 'POST':
+            requestData = request.get_json()
+            return productsController.verify_products_batch(requestData)
+        else:
+            return productsController.notImplemented()
+
+    @products_routes.route('/meli/products/validate/batch', methods=['POST'])
+    def validate_products_batch():
+        if request.method == 'POST':
+            requestData = request.get_json()
+            return productsController.validate_products_batch(requestData)
+        else:
+            return productsController.notImplemented()
+
     @products_routes.route('/meli/products/update/product', methods=['POST'])
     def update_product():
         if request.method == 'POST':
@@ -74,7 +90,7 @@ def create_products_routes(productsController: ProductsController):
     @products_routes.route('/meli/products/rules', methods=['GET'])
     def product_rules():
         if request.method == 'GET':
-            return productsController.get_product_rules(request.args.to_dict())
+            return productsController.get_product_rules(request.args.to_dict(), request.headers.get('If-None-Match'))
         else:
             return productsController.notImplemented()
 
@@ -98,5 +114,29 @@ def create_products_routes(productsController: ProductsController):
         else:
             return productsController.notImplemented()
 
+    @products_routes.route('/meli/products/categories/search', methods=['GET'])
+    def search_categories():
+        """Busca categorías por nombre sobre el árbol en caché."""
+        if request.method == 'GET':
+            return productsController.search_categories(request.args.to_dict())
+        else:
+            return productsController.notImplemented()
+
+    @products_routes.route('/meli/products/categories/autocomplete', methods=['GET'])
+    def autocomplete_categories():
+        """Sugiere categorías por prefijo del nombre."""
+        if request.method == 'GET':
+            return productsController.autocomplete_categories(request.args.to_dict())
+        else:
+            return productsController.notImplemented()
+
+    @products_routes.route('/meli/products/categories/subtree', methods=['GET'])
+    def get_category_subtree():
+        """Obtiene ancestros y descendientes de una categoría."""
+        if request.method == 'GET':
+            return productsController.get_category_subtree(request.args.to_dict())
+        else:
+            return productsController.notImplemented()
+
     # Aplicar middleware de manejo de errores a todas las rutas
     return apply_middleware_to_blueprint(products_routes)
\ No newline at end of file
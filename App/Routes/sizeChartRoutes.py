@@ -67,5 +67,24 @@ def create_size_chart_routes(size_chart_controller: SizeChartController):
         else:
             return size_chart_controller.not_implemented()
 
+    @size_chart_routes.route('/meli/products/size_charts/<string:size_chart_id>/associate/batch', methods=['POST'])
+    def associate_size_chart_batch(size_chart_id):
+        """Asocia una guía de tallas a varios productos."""
+        if request.method == 'POST':
+            request_data = request.get_json(silent=True) or {}
+            request_data['size_chart_id'] = size_chart_id
+            return size_chart_controller.associate_size_chart_batch(request_data)
+        else:
+            return size_chart_controller.not_implemented()
+
+    @size_chart_routes.route('/meli/products/size_charts/match', methods=['POST'])
+    def match_size_chart():
+        """Elige la guía de tallas que corresponde a un producto."""
+        if request.method == 'POST':
+            request_data = request.get_json(silent=True) or {}
+            return size_chart_controller.match_size_chart(request_data)
+        else:
+            return size_chart_controller.not_implemented()
+
     # Aplicar middleware de manejo de errores
     return apply_middleware_to_blueprint(size_chart_routes)
\ No newline at end of file
@@ -6,11 +6,11 @@ from App.Dynamo.MeliUsers import MeliUsers
 
 
 class AccessTokenService:
-    def __init__(self):
-        pass
+    def __init__(self, meli_users: MeliUsers = None):
+        self.meli_users = meli_users
 
     def execption401(self,meli_seller_id):
-        meli_user = MeliUsers()
+        meli_user = self.meli_users or MeliUsers()
         user = meli_user.get_user_by_id(int(meli_seller_id))
         if user is not None:
             return self.refresh_access_token_via_api(user["refresh_token"])
@@ -0,0 +1,300 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from App.Services.MeliUsersService import MeliUsersService
+from App.Utils.Exceptions import MeliApiError
+from App.Utils.HttpCache import HTTP_CACHE_ENABLED, HttpCache, http_cache_results
+from App.Utils.Logger import app_logger
+from App.Utils.Metrics import metrics
+from App.Utils.SingleFlight import SingleFlight
+from App.Utils.Timing import span
+
+upstream_requests = metrics.counter(
+    "meli_api_upstream_requests",
+    "Llamadas a la API de Mercado Libre por operación y clase de código (2xx, 4xx, 5xx, network_error)",
+    ("operation", "status_class")
+)
+upstream_retries = metrics.counter(
+    "meli_api_upstream_retries",
+    "Peticiones reenviadas a la API de Mercado Libre por operación y motivo",
+    ("operation", "reason")
+)
+upstream_rate_limited = metrics.counter(
+    "meli_api_upstream_rate_limited",
+    "Respuestas 429 (límite de peticiones) de la API de Mercado Libre por operación",
+    ("operation",)
+)
+token_refreshes = metrics.counter(
+    "meli_api_token_refreshes",
+    "Renovaciones del token de acceso por resultado (success, failure, reused)",
+    ("result",)
+)
+
+# Permite desactivar la agrupación de lecturas concurrentes (SINGLE_FLIGHT_ENABLED=false)
+SINGLE_FLIGHT_ENABLED = os.environ.get("SINGLE_FLIGHT_ENABLED", "true").lower() != "false"
+
+
+class MeliApiClient:
+    """
+    Cliente HTTP compartido para las llamadas a la API de Mercado Libre.
+
+    Centraliza el armado del header Authorization, la renovación del token cuando la API
+    responde 401 y la medición de cada llamada: span "meli.<operation_name>" en los tiempos
+    de la petición, más contadores de llamadas, reintentos, respuestas 429 y renovaciones
+    de token en App.Utils.Metrics.
+
+    Ante un 401 el token se renueva una sola vez, se actualiza el diccionario del usuario
+    (las siguientes llamadas de la misma petición ya usan el token nuevo) y se reenvía la
+    misma petición. La renovación se hace con un candado por usuario: los hilos que reciben
+    un 401 con el mismo token esperan a la primera renovación y reutilizan su resultado
+    (el refresh token de Mercado Libre solo se puede usar una vez). El llamador siempre recibe la respuesta HTTP sin procesar, por lo que
+    el resultado se procesa una sola vez.
+
+    Con una HttpCache, las lecturas GET se sirven desde la caché mientras están frescas y
+    se revalidan con peticiones condicionales (ver App.Utils.HttpCache); las escrituras
+    (POST/PUT/DELETE) invalidan la copia de la URL afectada y las lecturas que dependen de
+    ella (con parámetros o multiget que la incluyen).
+
+    Las lecturas GET idénticas y concurrentes (mismo método, URL con parámetros y vendedor)
+    comparten una sola llamada a la API mediante SingleFlight.
+    """
+
+    def __init__(self, meli_users_service: MeliUsersService, base_url=None, http_cache: HttpCache = None,
+                 single_flight: SingleFlight = None):
+        self.meli_users_service = meli_users_service
+        self.base_url = base_url or os.environ.get("MELI_API_BASE_URL", "https://api.mercadolibre.com")
+        self.http_cache = http_cache if HTTP_CACHE_ENABLED else None
+        self.single_flight = (single_flight if single_flight is not None else SingleFlight()) if SINGLE_FLIGHT_ENABLED else None
+        self._revalidation_pool = None
+        # Candados de renovación de token por user_id
+        self._refresh_locks = {}
+        self._refresh_locks_guard = threading.Lock()
+        # Última renovación por user_id: (token reemplazado, tokens nuevos). Cada petición
+        # suele traer su propia copia del usuario, así que la renovación no puede vivir solo ahí
+        self._latest_tokens = {}
+
+    def get(self, endpoint, operation_name, user, **kwargs):
+        return self.request("GET", endpoint, operation_name, user, **kwargs)
+
+    def post(self, endpoint, operation_name, user, **kwargs):
+        return self.request("POST", endpoint, operation_name, user, **kwargs)
+
+    def put(self, endpoint, operation_name, user, **kwargs):
+        return self.request("PUT", endpoint, operation_name, user, **kwargs)
+
+    def invalidate(self, endpoint, user):
+        """Descarta la copia en caché (sin parámetros) de un recurso del vendedor, ej: "/items/MLM1"."""
+        if self.http_cache is not None:
+            self.http_cache.invalidate(f"{self.base_url}{endpoint}", self._cache_scope(user))
+
+    def request(self, method, endpoint, operation_name, user, headers=None, body_factory=None, cache=True,
+                **kwargs):
+        """
+        Envía una petición autenticada con el token del usuario.
+
+        Args:
+            method: Método HTTP
+            endpoint: Ruta relativa a base_url (ej: "/items/MLM1")
+            operation_name: Nombre de la operación (para logs y tiempos)
+            user: Usuario de MeLi con access_token y user_id
+            headers: Headers adicionales
+            body_factory: Función que devuelve (data, content_type) para cuerpos que no se
+                pueden reenviar tal cual (ej: MultipartEncoder); se llama en cada intento
+            cache: Usar la caché HTTP en peticiones GET (default: True)
+            **kwargs: Argumentos de requests (params, json, data...)
+
+        Returns:
+            requests.Response: Respuesta de la API (la del reintento si hubo renovación)
+
+        Raises:
+            MeliApiError: Si el token no se pudo renovar
+            requests.exceptions.RequestException: Errores de red
+        """
+        url = f"{self.base_url}{endpoint}"
+        if method != "GET":
+            response = self._send_authorized(method, url, operation_name, user, headers, body_factory, kwargs)
+            if self.http_cache is not None and response.status_code < 400:
+                self.http_cache.invalidate(url, self._cache_scope(user))
+            return response
+
+        resource = HttpCache.resource_key(url, kwargs.get("params"))
+        scope = self._cache_scope(user)
+        if self.http_cache is None or not cache:
+            if self.http_cache is not None:
+                http_cache_results.inc(operation=operation_name, result="bypass")
+            return self._coalesced(
+                "bypass", resource, scope, headers, operation_name,
+                lambda: self._send_authorized(method, url, operation_name, user, headers, body_factory, kwargs)
+            )
+
+        entry = self.http_cache.lookup(resource, scope)
+        if entry is not None:
+            if entry.is_fresh():
+                http_cache_results.inc(operation=operation_name, result="fresh")
+                return entry.to_response(url, "HIT")
+            if entry.can_serve_stale():
+                http_cache_results.inc(operation=operation_name, result="stale")
+                self._revalidate_in_background(url, operation_name, user, headers, kwargs, resource, scope, entry)
+                return entry.to_response(url, "STALE")
+
+        return self._coalesced(
+            "cache", resource, scope, headers, operation_name,
+            lambda: self._fetch_and_cache(url, operation_name, user, headers, kwargs, resource, scope, entry)
+        )
+
+    def _coalesced(self, mode, resource, scope, headers, operation_name, fetch):
+        """
+        Ejecuta la lectura con SingleFlight: las lecturas idénticas en curso (misma URL con
+        parámetros, vendedor y headers) comparten la misma respuesta.
+        """
+        if self.single_flight is None:
+            return fetch()
+        key = ("GET", resource, scope, tuple(sorted(headers.items())) if headers else (), mode)
+        return self.single_flight.do(key, fetch, operation_name)
+
+    def _send_authorized(self, method, url, operation_name, user, headers, body_factory, kwargs):
+        """Envía la petición y, ante un 401, renueva el token y la reenvía una vez."""
+        self._apply_latest_tokens(user)
+        sent_token = user.get("access_token")
+        response = self._send(method, url, operation_name, user, headers, body_factory, kwargs)
+
+        if response.status_code == 401 and user.get("user_id"):
+            self.refresh_token(user, sent_token)
+            upstream_retries.inc(operation=operation_name, reason="token_expired")
+            response = self._send(method, url, operation_name, user, headers, body_factory, kwargs)
+
+        return response
+
+    @staticmethod
+    def _cache_scope(user):
+        return f"user:{user.get('user_id')}"
+
+    def _fetch_and_cache(self, url, operation_name, user, headers, kwargs, resource, scope, entry):
+        """GET (condicional si hay una entrada vencida) que actualiza la caché con la respuesta."""
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(entry.validators())
+
+        response = self._send_authorized("GET", url, operation_name, user, request_headers, None, kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            http_cache_results.inc(operation=operation_name, result="revalidated")
+            entry = self.http_cache.revalidated(resource, scope, entry, response)
+            return entry.to_response(url, "REVALIDATED")
+
+        http_cache_results.inc(operation=operation_name, result="miss")
+        self.http_cache.store(resource, scope, response)
+        return response
+
+    def _revalidate_in_background(self, url, operation_name, user, headers, kwargs, resource, scope, entry):
+        """
+        Revalida una entrada servida como stale sin bloquear la petición (una a la vez por llave).
+        En Lambda el hilo puede quedar suspendido hasta la siguiente invocación; la ventana
+        stale-while-revalidate está acotada por HttpCache.max_stale.
+        """
+        key = (scope, resource)
+        if not self.http_cache.start_revalidation(key):
+            return
+        if self._revalidation_pool is None:
+            self._revalidation_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="http-revalidate")
+
+        def revalidate():
+            try:
+                # Se usa el mismo diccionario: si hay que renovar el token, la petición original también lo ve
+                self._fetch_and_cache(url, operation_name, user, headers, dict(kwargs), resource, scope, entry)
+            except Exception as e:
+                app_logger.warning(f"No se pudo revalidar {resource} en segundo plano: {str(e)}")
+            finally:
+                self.http_cache.finish_revalidation(key)
+
+        self._revalidation_pool.submit(revalidate)
+
+    def _send(self, method, url, operation_name, user, headers, body_factory, kwargs):
+        request_headers = {"Authorization": f"Bearer {user['access_token']}"}
+        if headers:
+            request_headers.update(headers)
+        if body_factory is not None:
+            kwargs["data"], request_headers["Content-Type"] = body_factory()
+
+        try:
+            with span(f"meli.{operation_name}"):
+                response = requests.request(method, url, headers=request_headers, **kwargs)
+        except requests.exceptions.RequestException:
+            upstream_requests.inc(operation=operation_name, status_class="network_error")
+            raise
+
+        upstream_requests.inc(operation=operation_name, status_class=f"{response.status_code // 100}xx")
+        if response.status_code == 429:
+            upstream_rate_limited.inc(operation=operation_name)
+        return response
+
+    def _refresh_lock(self, user_id):
+        with self._refresh_locks_guard:
+            lock = self._refresh_locks.get(user_id)
+            if lock is None:
+                lock = self._refresh_locks[user_id] = threading.Lock()
+            return lock
+
+    def _apply_latest_tokens(self, user):
+        """
+        Si el token del usuario es uno que este cliente ya reemplazó, copia los tokens nuevos.
+        Devuelve True si se actualizó el diccionario.
+        """
+        latest = self._latest_tokens.get(user.get("user_id"))
+        if latest is not None and user.get("access_token") == latest[0]:
+            user.update(latest[1])
+            return True
+        return False
+
+    def refresh_token(self, user, expired_token=None):
+        """
+        Renueva el token de acceso del usuario y actualiza el diccionario recibido.
+
+        Args:
+            user (dict): Usuario de MeLi (se actualiza con los tokens nuevos)
+            expired_token (str): Token rechazado con 401; si mientras se esperaba el candado
+                otro hilo ya lo reemplazó (en user o en otra copia del mismo usuario), se
+                usan esos tokens y no se renueva de nuevo
+
+        Raises:
+            MeliApiError: Si no se obtuvo un token nuevo
+        """
+        user_id = user.get("user_id")
+        with self._refresh_lock(user_id):
+            if expired_token is not None:
+                latest = self._latest_tokens.get(user_id)
+                if latest is not None and latest[1].get("access_token") != expired_token:
+                    if user.get("access_token") == expired_token:
+                        user.update(latest[1])
+                if user.get("access_token") != expired_token:
+                    token_refreshes.inc(result="reused")
+                    app_logger.info(f"Token del usuario {user_id} ya renovado por otra petición")
+                    return user
+            return self._refresh_token_locked(user, user_id)
+
+    def _refresh_token_locked(self, user, user_id):
+        app_logger.info(f"Token expirado para usuario {user_id}, renovando...")
+        try:
+            with span("token_refresh"):
+                tokens = self.meli_users_service.refreshAccessToken(user_id)
+        except Exception:
+            token_refreshes.inc(result="failure")
+            raise
+
+        if not tokens or not tokens.get("access_token"):
+            token_refreshes.inc(result="failure")
+            app_logger.error(f"No se pudo renovar el token para usuario {user_id}")
+            raise MeliApiError(
+                401,
+                "No se pudo renovar el token de acceso",
+                {"error": "token_refresh_failed"}
+            )
+
+        token_refreshes.inc(result="success")
+        app_logger.info(f"Token renovado exitosamente para usuario {user_id}")
+        self._latest_tokens[user_id] = (user.get("access_token"), dict(tokens))
+        user.update(tokens)
+        return user
@@ -0,0 +1,168 @@
+import os
+import re
+import threading
+
+from App.Services.MeliProducts import MeliProducts
+from App.Services.MeliUsersService import MeliUsersService
+from App.Utils.Batcher import KeyedBatcher
+from App.Utils.Cache import TTLCache
+from App.Utils.Logger import app_logger
+from App.Utils.Metrics import metrics
+from App.Utils.TieredCache import TieredCache
+from App.Utils.Timing import span
+
+# Recursos de los tópicos de items (ej: /items/MLM123 o /items/MLM123/prices)
+ITEM_RESOURCE = re.compile(r"^/items/(ML[A-Z][0-9]+)")
+
+notifications_received = metrics.counter(
+    "meli_api_notifications",
+    "Notificaciones de Mercado Libre por tópico y resultado (accepted, refreshed, duplicate, coalesced, ignored)",
+    ("topic", "result")
+)
+notified_items_refreshed = metrics.counter(
+    "meli_api_notified_items_refreshed",
+    "Items leídos de nuevo a partir de notificaciones por resultado (ok, gone, error, unknown_user)",
+    ("result",)
+)
+
+
+class MeliNotificationsService:
+    """
+    Servicio para recibir las notificaciones (callbacks) de Mercado Libre.
+
+    Se descartan los reintentos de una notificación ya procesada dentro de la ventana
+    MELI_NOTIFICATION_DEDUPE_SECONDS. La llave de una notificación se guarda solo cuando su
+    item se leyó con éxito (MeliProducts.refresh_items, que actualiza las cachés del item):
+    si la lectura falla, el reintento de Mercado Libre la vuelve a procesar.
+
+    - En servidor (MELI_NOTIFICATION_INLINE=false) cada notificación se responde de
+      inmediato y el item se agrega al lote pendiente de su vendedor; los lotes se leen en
+      segundo plano con multiget, por lo que las notificaciones de un mismo item que llegan
+      antes de procesar el lote se agrupan en una sola lectura.
+    - En Lambda (default cuando AWS_LAMBDA_FUNCTION_NAME está definido) el contenedor se
+      congela al responder y un lote pendiente se perdería: el item se lee antes de
+      responder y un error responde 500 para que Mercado Libre reintente.
+    """
+
+    def __init__(self, meli_users_service: MeliUsersService, meli_products_service: MeliProducts,
+                 dedupe_cache: TieredCache = None, batcher: KeyedBatcher = None):
+        self.meli_users_service = meli_users_service
+        self.meli_products_service = meli_products_service
+        # Tópicos atendidos (el resto se responde sin procesar)
+        self.topics = {topic.strip() for topic in os.environ.get("MELI_NOTIFICATION_TOPICS", "items").split(",")
+                       if topic.strip()}
+        # IDs de notificaciones ya recibidas (compartidos entre contenedores si hay almacén compartido)
+        self.dedupe_window = int(os.environ.get("MELI_NOTIFICATION_DEDUPE_SECONDS", 300))
+        self.dedupe_cache = (dedupe_cache if dedupe_cache is not None
+                             else TieredCache(TTLCache(maxsize=4096, ttl=self.dedupe_window, name="notifications")))
+        # Items pendientes de leer, agrupados por vendedor
+        self.batcher = batcher if batcher is not None else KeyedBatcher(name="notifications")
+        default_inline = "true" if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") else "false"
+        self.inline = os.environ.get("MELI_NOTIFICATION_INLINE", default_inline).lower() != "false"
+        # Llaves de las notificaciones de cada item en lote, (user_id, item_id) -> set de llaves;
+        # se guardan en dedupe_cache cuando el lote lee el item con éxito
+        self._pending_keys = {}
+        self._pending_lock = threading.Lock()
+
+    def receive_notification(self, data):
+        """
+        Registra una notificación validada con NotificationSchema.
+
+        Returns:
+            dict: {"status": "accepted" | "refreshed" | "duplicate" | "coalesced" | "ignored", ...}
+                o un diccionario con "error" si la lectura en línea falló (Mercado Libre reintenta)
+        """
+        operation_name = "receive_notification"
+        try:
+            topic = data.get('topic')
+            resource = data.get('resource') or ""
+            match = ITEM_RESOURCE.match(resource)
+            if topic not in self.topics or match is None:
+                # El tópico lo envía quien llama: fuera de los configurados no se usa como etiqueta
+                notifications_received.inc(topic=topic if topic in self.topics else "other", result="ignored")
+                app_logger.info(f"Notificación ignorada: {topic} {resource}")
+                return {"status": "ignored", "topic": topic, "resource": resource}
+
+            item_id = match.group(1)
+            user_id = data.get('user_id')
+            dedupe_key = ("notification", data.get('_id') or f"{topic}:{resource}:{data.get('sent')}")
+            with span("notification_dedupe"):
+                seen = self.dedupe_cache.get(dedupe_key) is not None
+            if seen:
+                status = "duplicate"
+            elif self.inline:
+                with span("notification_refresh"):
+                    outcome = self._refresh_items(user_id, [item_id])[item_id]
+                if outcome == "error":
+                    notifications_received.inc(topic=topic, result="error")
+                    return {"error": "No se pudo leer el item notificado", "details": {"item_id": item_id}}
+                self.dedupe_cache.set(dedupe_key, 1, ttl=self.dedupe_window)
+                status = "refreshed"
+            else:
+                with self._pending_lock:
+                    self._pending_keys.setdefault((user_id, item_id), set()).add(dedupe_key)
+                added = self.batcher.add(user_id, item_id, self._refresh_batch)
+                status = "accepted" if added else "coalesced"
+
+            notifications_received.inc(topic=topic, result=status)
+            app_logger.info(f"Notificación {topic} para {item_id} (user_id {data.get('user_id')}): {status}")
+            return {"status": status, "topic": topic, "item_id": item_id}
+
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def _refresh_batch(self, user_id, item_ids):
+        """Procesa un lote y guarda las llaves de las notificaciones cuyos items se leyeron."""
+        outcomes = {}
+        try:
+            outcomes = self._refresh_items(user_id, item_ids)
+        finally:
+            with self._pending_lock:
+                keys = {item_id: self._pending_keys.pop((user_id, item_id), set()) for item_id in item_ids}
+            for item_id, outcome in outcomes.items():
+                if outcome != "error":
+                    for key in keys[item_id]:
+                        self.dedupe_cache.set(key, 1, ttl=self.dedupe_window)
+
+    def _refresh_items(self, user_id, item_ids):
+        """
+        Lee de nuevo items notificados de un vendedor.
+
+        Returns:
+            dict: Resultado por item_id: "ok", "gone" (el item no existe o no es accesible),
+                "unknown_user" o "error" (falla que se puede reintentar)
+        """
+        try:
+            user = self.meli_users_service.getMeliUserByUserId(user_id)
+        except Exception as e:
+            user = {"error": str(e)}
+        if user is not None and "error" in user:
+            # Falla al consultar el vendedor (ej: DynamoDB con throttling): se puede reintentar
+            notified_items_refreshed.inc(len(item_ids), result="error")
+            app_logger.warning(f"No se pudo consultar el vendedor {user_id}: {user['error']}")
+            return {item_id: "error" for item_id in item_ids}
+        if not user:
+            notified_items_refreshed.inc(len(item_ids), result="unknown_user")
+            app_logger.warning(f"Notificaciones de un vendedor desconocido (user_id {user_id}): "
+                               f"{len(item_ids)} items sin actualizar")
+            return {item_id: "unknown_user" for item_id in item_ids}
+
+        try:
+            results = self.meli_products_service.refresh_items(user, item_ids)
+        except Exception as e:
+            app_logger.exception(f"Error al leer {len(item_ids)} items notificados: {str(e)}")
+            results = {}
+
+        outcomes = {}
+        for item_id in item_ids:
+            result = results.get(item_id) or {"error": "Sin resultado"}
+            status_code = result.get("status_code") or 500
+            if "error" not in result:
+                outcomes[item_id] = "ok"
+            elif status_code < 500 and status_code not in (401, 429):
+                outcomes[item_id] = "gone"
+            else:
+                outcomes[item_id] = "error"
+            notified_items_refreshed.inc(result=outcomes[item_id])
+        return outcomes
@@ -2,8 +2,11 @@ import requests
 from requests_toolbelt.multipart.encoder import MultipartEncoder
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from marshmallow import ValidationError
 
+from App.Services.MeliApiClient import MeliApiClient
+from App.Services.MeliSizeChartService import MeliSizeChartService
 from App.Services.MeliUsersService import MeliUsersService
 from App.Models.Schemas.MeliSchemas import (
     CategoryRequestSchema,
@@ -11,17 +14,72 @@ from App.Models.Schemas.MeliSchemas import (
     ImageUploadRequestSchema,
     ProductCreateRequestSchema,
     ProductVerifyRequestSchema,
-    ProductUpdateRequestSchema
+    ProductVerifyBatchRequestSchema,
+    ProductUpdateRequestSchema,
+    ProductRulesRequestSchema,
+    ProductDataSchema,
+    ProductValidateBatchRequestSchema
 )
+from App.Utils.Cache import TTLCache
+from App.Utils.CategoryTree import CategoryTree
+from App.Utils.CategoryValidator import CategoryValidator
 from App.Utils.Logger import app_logger
+from App.Utils.Pagination import page_bounds, page_info
 from App.Utils.Exceptions import MeliApiError, NotFoundError
+from App.Utils.FieldProjection import compile_projection, top_level_fields
+from App.Utils.ItemDiff import diff_update
+from App.Utils.ItemMirror import ItemMirror
+from App.Utils.MeliRulesHelper import MeliRulesHelper
+from App.Utils.Metrics import metrics
+from App.Utils.SchemaCompiler import compile_schema
+from App.Utils.Timing import span, with_current_context
+
+# Máximo de items por consulta multiget (/items?ids=...)
+MULTIGET_CHUNK_SIZE = 20
+
+item_updates = metrics.counter(
+    "meli_api_item_updates",
+    "Actualizaciones de items por resultado (unchanged: sin llamada, partial: solo campos cambiados, sent: completas)",
+    ("result",)
+)
 
 
 class MeliProducts:
-    def __init__(self, meliUsersService: MeliUsersService):
+    def __init__(self, meliUsersService: MeliUsersService, categoryTreeCache: TTLCache = None,
+                 categoryAttributesCache: TTLCache = None, categoryRulesCache: TTLCache = None,
+                 meliApiClient: MeliApiClient = None, meliSizeChartService: MeliSizeChartService = None,
+                 itemMirror: ItemMirror = None):
         self.meliUsersService = meliUsersService
-        self.base_url = "https://api.mercadolibre.com"
+        # Llamadas a la API con renovación de token y medición de tiempos
+        self.meliApiClient = meliApiClient if meliApiClient is not None else MeliApiClient(meliUsersService)
+        # Guías de tallas del vendedor (para asociarlas al publicar con auto_size_chart)
+        self.meliSizeChartService = (meliSizeChartService if meliSizeChartService is not None
+                                     else MeliSizeChartService(meliUsersService, self.meliApiClient))
+        # Árboles y atributos de categorías compartidos entre peticiones (son datos públicos del sitio).
+        # Pueden ser TTLCache o TieredCache (compartida entre contenedores); ambas tienen la misma interfaz
+        # (se compara con None: una caché vacía es falsa por su __len__)
+        self.categoryTreeCache = (categoryTreeCache if categoryTreeCache is not None
+                                  else TTLCache(maxsize=32, ttl=21600, name="category_tree"))
+        self.categoryAttributesCache = (categoryAttributesCache if categoryAttributesCache is not None
+                                        else TTLCache(maxsize=512, ttl=21600, name="category_attributes"))
+        # Reglas combinadas (esquema + atributos) y validadores por categoría; solo en el proceso,
+        # se derivan de los atributos en caché
+        self.categoryRulesCache = (categoryRulesCache if categoryRulesCache is not None
+                                   else TTLCache(maxsize=512, ttl=21600, name="category_rules"))
+        # Último estado conocido de los items de cada vendedor (ver verify_product con max_age)
+        self.itemMirror = itemMirror if itemMirror is not None else ItemMirror()
+        # Edad máxima aceptada de la copia local si la petición no indica max_age (0: siempre consultar)
+        self.item_mirror_max_age = int(os.environ.get("ITEM_MIRROR_MAX_AGE", 0))
+        # Actualizaciones mínimas: comparar con el estado actual del item y enviar solo lo que
+        # cambió. Por defecto el estado se lee de la API (un multiget sin caché): una copia
+        # vieja del espejo podría descartar una corrección de precio o stock real
+        self.update_diff_enabled = os.environ.get("ITEM_UPDATE_DIFF", "true").lower() != "false"
+        self.update_state_max_age = int(os.environ.get("ITEM_UPDATE_STATE_MAX_AGE", 0))
         self.site_id = "MLM"  # México por defecto
+        # Consultas multiget concurrentes en operaciones masivas
+        self.multiget_workers = int(os.environ.get("MELI_MULTIGET_WORKERS", 8))
+        # Validación local de atributos antes de publicar
+        self.preflight_enabled = os.environ.get("MELI_PREFLIGHT_VALIDATION", "true").lower() != "false"
 
         # Esquemas de validación
         self.category_schema = CategoryRequestSchema()
@@ -29,7 +87,11 @@ class MeliProducts:
         self.image_upload_schema = ImageUploadRequestSchema()
         self.product_create_schema = ProductCreateRequestSchema()
         self.product_verify_schema = ProductVerifyRequestSchema()
+        self.product_verify_batch_schema = ProductVerifyBatchRequestSchema()
         self.product_update_schema = ProductUpdateRequestSchema()
+        self.product_rules_schema = ProductRulesRequestSchema()
+        self.product_data_schema = ProductDataSchema()
+        self.product_validate_batch_schema = ProductValidateBatchRequestSchema()
 
     def _validate_data(self, schema, data):
         """
@@ -37,7 +99,8 @@ class MeliProducts:
         Lanza ValidationError si los datos no son válidos.
         """
         try:
-            return schema.load(data)
+            with span("validation"):
+                return compile_schema(schema).load(data)
         except ValidationError as err:
             app_logger.error(f"Error de validación: {err.messages}")
             raise ValidationError(err.messages)
@@ -46,7 +109,8 @@ class MeliProducts:
         """
         Obtiene un usuario de MeLi por su shop_id.
         """
-        user = self.meliUsersService.getMeliUserByShopId(shop_id)
+        with span("user_lookup"):
+            user = self.meliUsersService.getMeliUserByShopId(shop_id)
         if not user or len(user) == 0:
             app_logger.error(f"Usuario no encontrado para shop_id: {shop_id}")
             raise NotFoundError("Usuario", shop_id)
@@ -54,16 +118,15 @@ class MeliProducts:
         app_logger.info(f"Usuario encontrado para shop_id: {shop_id}, user_id: {user[0].get('user_id', 'desconocido')}")
         return user[0]
 
-    def _handle_api_response(self, response, operation_name, user_id=None, retry_func=None, retry_args=None):
+    def _handle_api_response(self, response, operation_name):
         """
         Maneja la respuesta de la API, procesa errores y registra información relevante.
 
+        La renovación del token ante un 401 la hace MeliApiClient antes de devolver la respuesta.
+
         Args:
             response: Respuesta HTTP de requests
             operation_name: Nombre de la operación (para logs)
-            user_id: ID del usuario (opcional)
-            retry_func: Función a llamar en caso de token expirado (401)
-            retry_args: Argumentos para la función de reintento
 
         Returns:
             Datos de la respuesta procesados
@@ -84,21 +147,6 @@ class MeliProducts:
         # Log de la respuesta
         app_logger.info(f"Respuesta de API para {operation_name}: Status={response.status_code}")
 
-        # Si el token expiró y tenemos la función de reintento
-        if response.status_code == 401 and retry_func and user_id:
-            app_logger.info(f"Token expirado para usuario {user_id}, renovando...")
-            tokens = self.meliUsersService.refreshAccessToken(user_id)
-            if tokens:
-                app_logger.info(f"Token renovado exitosamente para usuario {user_id}")
-                return retry_func(*retry_args, tokens)
-            else:
-                app_logger.error(f"No se pudo renovar el token para usuario {user_id}")
-                raise MeliApiError(
-                    401,
-                    "No se pudo renovar el token de acceso",
-                    {"error": "token_refresh_failed"}
-                )
-
         # Para errores de la API que devuelven códigos de error
         if response.status_code >= 400:
             error_message = data.get('message', 'Error desconocido')
@@ -165,24 +213,15 @@ class MeliProducts:
         basándose en el nombre del producto.
         """
         operation_name = "invoke_meliCategories"
-        base_url = "https://api.mercadolibre.com/sites/MLM/domain_discovery/search"
-        headers = {
-            "Authorization": f"Bearer {user['access_token']}"
-        }
+        endpoint = "/sites/MLM/domain_discovery/search"
         params = {"q": product_name}
 
         try:
             app_logger.info(f"Consultando API para categorías de: {product_name}")
-            response = requests.get(base_url, headers=headers, params=params)
+            response = self.meliApiClient.get(endpoint, operation_name, user, params=params)
 
             # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get("user_id"),
-                self.__invoke_meliCategories,
-                (product_name,)
-            )
+            data = self._handle_api_response(response, operation_name)
 
             categories = []
             if data and isinstance(data, list):
@@ -226,12 +265,64 @@ class MeliProducts:
             shop_id = validated_data['shop_id']
             category_id = validated_data['category_id']
 
-            # Obtener usuario
-            user = self._get_user_by_shop_id(shop_id)
+            # Los atributos de la categoría se sirven desde caché cuando es posible
+            result = self._get_category_attributes_cached(category_id, shop_id)
 
-            # Llamar a la API
+            # La API de atributos no admite selección de campos: se proyecta en el servidor
+            project = compile_projection(validated_data.get('projection'))
+            if project:
+                result = {key: project(attributes) for key, attributes in result.items()}
+
+            return result
+
+        except ValidationError as err:
+            return {"error": "Error de validación", "details": err.messages}
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def _get_category_attributes_cached(self, category_id, shop_id):
+        """
+        Devuelve los atributos de una categoría desde la caché o los consulta en la API.
+        El usuario solo se consulta cuando los atributos no están en caché.
+        """
+        def load():
+            user = self._get_user_by_shop_id(shop_id)
             return self.__invoke_category_attributes(category_id, user)
 
+        return self.categoryAttributesCache.get_or_set(category_id, load)
+
+    def get_category_rules(self, data):
+        """
+        Obtiene las reglas de producto combinadas con los atributos de una categoría.
+
+        El resultado se calcula una vez por categoría y se guarda en memoria junto con su ETag.
+
+        Returns:
+            dict: {"rules": reglas combinadas, "etag": etag} o un diccionario de error
+        """
+        operation_name = "get_category_rules"
+        try:
+            app_logger.info(f"Iniciando {operation_name} para categoría: {data.get('category_id', 'desconocido')}")
+            validated_data = self._validate_data(self.product_rules_schema, data)
+
+            category_id = validated_data.get('category_id')
+            if not category_id:
+                raise ValidationError({"category_id": ["Este campo es requerido."]})
+
+            def build_rules():
+                attributes = self._get_category_attributes_cached(category_id, validated_data['shop_id'])
+                built = MeliRulesHelper.build_category_rules(category_id, attributes)
+                app_logger.info(f"Reglas combinadas calculadas para categoría {category_id} con ETag {built[1]}")
+                return built
+
+            rules, etag = self.categoryRulesCache.get_or_set(category_id, build_rules)
+            return {"rules": rules, "etag": etag}
+
         except ValidationError as err:
             return {"error": "Error de validación", "details": err.messages}
         except MeliApiError as err:
@@ -248,22 +339,13 @@ class MeliProducts:
         """
         operation_name = "invoke_category_attributes"
         endpoint = f"/categories/{category_id}/attributes"
-        headers = {
-            "Authorization": f"Bearer {user['access_token']}"
-        }
 
         try:
             app_logger.info(f"Consultando API para atributos de categoría: {category_id}")
-            response = requests.get(f"{self.base_url}{endpoint}", headers=headers)
+            response = self.meliApiClient.get(endpoint, operation_name, user)
 
             # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get("user_id"),
-                self.__invoke_category_attributes,
-                (category_id,)
-            )
+            data = self._handle_api_response(response, operation_name)
 
             # Separamos los atributos requeridos de los opcionales
             required_attributes = []
@@ -330,9 +412,13 @@ class MeliProducts:
         """
         operation_name = "invoke_upload_image"
         endpoint = "/pictures"
-        headers = {
-            "Authorization": f"Bearer {user['access_token']}"
-        }
+
+        def multipart(content):
+            # El encoder se consume al enviarse: se crea uno nuevo en cada intento
+            def build():
+                multipart_data = MultipartEncoder(fields={'file': ('filename', content, 'image/jpeg')})
+                return multipart_data, multipart_data.content_type
+            return build
 
         try:
             app_logger.info(f"Subiendo imagen a API")
@@ -341,42 +427,21 @@ class MeliProducts:
             if image_data.startswith('http'):
                 app_logger.info("Subiendo imagen desde URL")
                 payload = {"source": image_data}
-                response = requests.post(f"{self.base_url}{endpoint}", headers=headers, json=payload)
+                response = self.meliApiClient.post(endpoint, operation_name, user, json=payload)
             # Si es una ruta de archivo local
             elif os.path.isfile(image_data):
                 app_logger.info(f"Subiendo imagen desde archivo local: {image_data}")
                 with open(image_data, 'rb') as f:
-                    multipart_data = MultipartEncoder(
-                        fields={'file': ('filename', f, 'image/jpeg')}
-                    )
-                    headers['Content-Type'] = multipart_data.content_type
-                    response = requests.post(
-                        f"{self.base_url}{endpoint}",
-                        headers=headers,
-                        data=multipart_data
-                    )
+                    content = f.read()
+                response = self.meliApiClient.post(endpoint, operation_name, user, body_factory=multipart(content))
             # Asumimos que es base64
             else:
                 app_logger.info("Subiendo imagen en formato base64")
-                # Procesar base64
-                multipart_data = MultipartEncoder(
-                    fields={'file': ('filename', image_data, 'image/jpeg')}
-                )
-                headers['Content-Type'] = multipart_data.content_type
-                response = requests.post(
-                    f"{self.base_url}{endpoint}",
-                    headers=headers,
-                    data=multipart_data
-                )
+                response = self.meliApiClient.post(
+                    endpoint, operation_name, user, body_factory=multipart(image_data))
 
             # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get("user_id"),
-                self.__invoke_upload_image,
-                (image_data,)
-            )
+            data = self._handle_api_response(response, operation_name)
 
             app_logger.info(f"Imagen subida exitosamente: {data.get('id', 'desconocido')}")
             return {"image": data}
@@ -394,6 +459,10 @@ class MeliProducts:
     def create_product(self, data):
         """
         Crea un nuevo producto en Mercado Libre.
+
+        Con auto_size_chart=true, después de publicar se elige entre las guías de tallas del
+        vendedor la que corresponde al producto y se asocia; el resultado se devuelve en
+        "size_chart" sin afectar la publicación.
         """
         operation_name = "create_product"
         try:
@@ -405,11 +474,135 @@ class MeliProducts:
             shop_id = validated_data['shop_id']
             product_data = validated_data['product_data']
 
+            # Validar atributos y variantes contra la categoría antes de publicar
+            if self.preflight_enabled and not validated_data.get('skip_preflight'):
+                report = self._preflight_product(product_data, shop_id)
+                if report and not report["valid"]:
+                    app_logger.warning(
+                        f"Validación local fallida para categoría {product_data['category_id']}: "
+                        f"{len(report['errors'])} errores")
+                    return {"error": "Error de validación de atributos", "details": report}
+
             # Obtener usuario
             user = self._get_user_by_shop_id(shop_id)
 
             # Llamar a la API
-            return self.__invoke_create_product(product_data, user)
+            result = self.__invoke_create_product(product_data, user)
+            self.itemMirror.put(shop_id, result["product"], "create")
+
+            if validated_data.get('auto_size_chart'):
+                item = dict(product_data, **result["product"])
+                with span("size_chart_match"):
+                    result["size_chart"] = self.meliSizeChartService.associate_matching_size_chart(shop_id, item)
+
+            return result
+
+        except ValidationError as err:
+            return {"error": "Error de validación", "details": err.messages}
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def _get_category_validator(self, category_id, shop_id):
+        """
+        Devuelve el validador local de una categoría, construido a partir de los atributos en caché.
+        Los validadores se guardan en la caché de reglas con la llave ("validator", category_id).
+        """
+        key = ("validator", category_id)
+        validator = self.categoryRulesCache.get(key)
+        if validator is None:
+            validator = CategoryValidator(category_id, self._get_category_attributes_cached(category_id, shop_id))
+            self.categoryRulesCache.set(key, validator)
+        return validator
+
+    def _preflight_product(self, product_data, shop_id):
+        """
+        Valida localmente los atributos y variantes de un producto.
+
+        Si los atributos de la categoría no se pueden obtener, no se bloquea la publicación:
+        se registra una advertencia y se devuelve None para que Mercado Libre haga la validación.
+        """
+        category_id = product_data['category_id']
+        try:
+            validator = self._get_category_validator(category_id, shop_id)
+        except (MeliApiError, requests.exceptions.RequestException) as err:
+            app_logger.warning(f"No se pudo validar localmente la categoría {category_id}: {err}")
+            return None
+        with span("attribute_validation"):
+            return validator.validate(product_data)
+
+    def validate_products_batch(self, data):
+        """
+        Valida un lote de productos (esquema + atributos de categoría) sin publicarlos.
+
+        Los atributos de cada categoría distinta se consultan una sola vez (en paralelo si
+        no están en caché) y cada producto se valida de forma local.
+        """
+        operation_name = "validate_products_batch"
+        try:
+            app_logger.info(f"Iniciando {operation_name} para {len(data.get('products') or [])} productos")
+            validated_data = self._validate_data(self.product_validate_batch_schema, data)
+
+            shop_id = validated_data['shop_id']
+            products = validated_data['products']
+
+            results = []
+            loaded = {}
+            product_data_validator = compile_schema(self.product_data_schema)
+            with span("validation"):
+                for position, product in enumerate(products):
+                    try:
+                        loaded[position] = product_data_validator.load(product)
+                        results.append(None)
+                    except ValidationError as err:
+                        results.append({"index": position, "valid": False, "schema_errors": err.messages,
+                                        "errors": [], "warnings": []})
+
+            # Construir los validadores de las categorías del lote
+            category_ids = sorted({product['category_id'] for product in loaded.values()})
+            validators = {}
+            category_errors = {}
+            with ThreadPoolExecutor(max_workers=max(1, min(self.multiget_workers, len(category_ids)))) as executor:
+                futures = {
+                    executor.submit(with_current_context(self._get_category_validator), category_id, shop_id):
+                        category_id
+                    for category_id in category_ids
+                }
+                for future in as_completed(futures):
+                    category_id = futures[future]
+                    try:
+                        validators[category_id] = future.result()
+                    except NotFoundError:
+                        raise
+                    except MeliApiError as err:
+                        category_errors[category_id] = {"error": err.message, "status_code": err.status_code}
+
+            with span("attribute_validation"):
+                for position, product in loaded.items():
+                    category_id = product['category_id']
+                    if category_id in category_errors:
+                        results[position] = {"index": position, "valid": False, "errors": [{
+                            "field": "category_id", "attribute_id": None, "code": "category_unavailable",
+                            "message": category_errors[category_id]["error"]
+                        }], "warnings": []}
+                        continue
+                    results[position] = {"index": position, **validators[category_id].validate(product)}
+
+            valid = sum(1 for result in results if result["valid"])
+            app_logger.info(f"{operation_name} completado: {valid}/{len(results)} productos válidos")
+            return {
+                "results": results,
+                "summary": {
+                    "total": len(results),
+                    "valid": valid,
+                    "invalid": len(results) - valid,
+                    "categories": len(category_ids)
+                }
+            }
 
         except ValidationError as err:
             return {"error": "Error de validación", "details": err.messages}
@@ -427,29 +620,15 @@ class MeliProducts:
         """
         operation_name = "invoke_create_product"
         endpoint = "/items"
-        headers = {
-            "Authorization": f"Bearer {user['access_token']}",
-            "Content-Type": "application/json"
-        }
 
         try:
             app_logger.info(f"Creando producto en API: {product_data.get('title', 'desconocido')}")
             app_logger.debug(f"Datos completos del producto: {json.dumps(product_data)}")
 
-            response = requests.post(
-                f"{self.base_url}{endpoint}",
-                headers=headers,
-                json=product_data
-            )
+            response = self.meliApiClient.post(endpoint, operation_name, user, json=product_data)
 
             # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get("user_id"),
-                self.__invoke_create_product,
-                (product_data,)
-            )
+            data = self._handle_api_response(response, operation_name)
 
             app_logger.info(f"Producto creado exitosamente: {data.get('id', 'desconocido')}")
             return {"product": data}
@@ -474,6 +653,10 @@ class MeliProducts:
     def verify_product(self, data):
         """
         Verifica el estado de un producto publicado.
+
+        Con max_age (segundos) se acepta el documento del espejo local si se leyó hace
+        max_age segundos o menos ("source": "mirror"); si no, se consulta la API y el
+        documento completo se guarda en el espejo.
         """
         operation_name = "verify_product"
         try:
@@ -483,12 +666,28 @@ class MeliProducts:
 
             shop_id = validated_data['shop_id']
             item_id = validated_data['item_id']
+            projection = validated_data.get('projection')
+            max_age = validated_data.get('max_age', self.item_mirror_max_age)
+
+            project = compile_projection(projection)
+            if max_age > 0:
+                cached = self.itemMirror.get(shop_id, item_id, max_age)
+                if cached is not None:
+                    item, age = cached
+                    app_logger.info(f"Producto {item_id} servido desde el espejo local (edad {age:.1f}s)")
+                    return {"product": project(item) if project else item, "source": "mirror", "age": round(age, 3)}
 
             # Obtener usuario
             user = self._get_user_by_shop_id(shop_id)
 
-            # Llamar a la API
-            return self.__invoke_verify_product(item_id, user)
+            # Llamar a la API (documento completo si se quiere llenar el espejo)
+            result = self.__invoke_verify_product(item_id, None if max_age > 0 else projection, user)
+            if max_age > 0 or not projection:
+                self.itemMirror.put(shop_id, result["product"], "verify")
+                if project:
+                    result["product"] = project(result["product"])
+            result["source"] = "api"
+            return result
 
         except ValidationError as err:
             return {"error": "Error de validación", "details": err.messages}
@@ -500,32 +699,238 @@ class MeliProducts:
             app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
             return {"error": "Error interno del servidor", "details": str(e)}
 
-    def __invoke_verify_product(self, item_id, user):
+    def __invoke_verify_product(self, item_id, projection, user):
         """
         Consulta la API de Mercado Libre para verificar el estado de un producto.
+
+        Si se indica una proyección, los campos de primer nivel se piden a la API
+        con attributes= y los campos anidados se filtran en el servidor.
         """
         operation_name = "invoke_verify_product"
         endpoint = f"/items/{item_id}"
-        headers = {
-            "Authorization": f"Bearer {user['access_token']}"
-        }
+        params = {}
+        if projection:
+            params["attributes"] = ",".join(top_level_fields(projection))
 
         try:
             app_logger.info(f"Verificando producto en API: {item_id}")
 
-            response = requests.get(f"{self.base_url}{endpoint}", headers=headers)
+            response = self.meliApiClient.get(endpoint, operation_name, user, params=params or None)
 
             # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get("user_id"),
-                self.__invoke_verify_product,
-                (item_id,)
-            )
+            data = self._handle_api_response(response, operation_name)
 
             app_logger.info(f"Producto verificado: {item_id} - Estado: {data.get('status', 'desconocido')}")
-            return {"product": data}
+
+            project = compile_projection(projection)
+            return {"product": project(data) if project else data}
+
+        except MeliApiError as err:
+            raise err
+        except requests.exceptions.RequestException as e:
+            app_logger.exception(f"Error de red en {operation_name}: {str(e)}")
+            raise MeliApiError(
+                500,
+                f"Error en la solicitud: {str(e)}",
+                {"error_type": "network_error"}
+            )
+
+    def verify_products_batch(self, data):
+        """
+        Verifica el estado de muchos productos usando consultas multiget concurrentes.
+
+        Los item_ids se dividen en grupos de MULTIGET_CHUNK_SIZE y cada grupo se consulta
+        con una sola llamada a /items?ids=... El parámetro attributes permite pedir solo
+        algunos campos de cada item para reducir el tamaño de la respuesta. Con max_age,
+        los items leídos hace max_age segundos o menos se toman del espejo local y solo el
+        resto se consulta (completos, para llenar el espejo).
+
+        Args:
+            data (dict): shop_id, item_ids y opcionalmente attributes (ej: "id,status,sub_status")
+                o fields (admite campos anidados, ej: "status,variations.id") y max_age
+
+        Returns:
+            dict: Resultado por item y un resumen por estado
+        """
+        operation_name = "verify_products_batch"
+        try:
+            # Validar datos
+            app_logger.info(f"Iniciando {operation_name} para {len(data.get('item_ids') or [])} items")
+            validated_data = self._validate_data(self.product_verify_batch_schema, data)
+
+            shop_id = validated_data['shop_id']
+            item_ids = list(dict.fromkeys(validated_data['item_ids']))  # Sin duplicados, conservando el orden
+            attributes = validated_data.get('attributes')
+            projection = validated_data.get('projection')
+            if projection and not attributes:
+                attributes = ",".join(top_level_fields(projection))
+            max_age = validated_data.get('max_age', self.item_mirror_max_age)
+
+            results = {}
+            if max_age > 0:
+                fields = [name for name in attributes.split(",") if name] if attributes else None
+                for item_id in item_ids:
+                    cached = self.itemMirror.get(shop_id, item_id, max_age)
+                    if cached is not None:
+                        item = cached[0]
+                        results[item_id] = {
+                            "item_id": item_id, "status_code": 200, "status": item.get("status"),
+                            "sub_status": item.get("sub_status"), "source": "mirror",
+                            "product": {key: value for key, value in item.items() if key in fields} if fields else item
+                        }
+            mirror_hits = len(results)
+            pending = [item_id for item_id in item_ids if item_id not in results]
+            fetch_attributes = None if max_age > 0 else attributes
+
+            # Obtener usuario
+            user = self._get_user_by_shop_id(shop_id) if pending else None
+
+            chunks = [pending[i:i + MULTIGET_CHUNK_SIZE] for i in range(0, len(pending), MULTIGET_CHUNK_SIZE)]
+            fetched = {}
+
+            with ThreadPoolExecutor(max_workers=max(1, min(self.multiget_workers, len(chunks)))) as executor:
+                futures = {
+                    executor.submit(with_current_context(self.__invoke_multiget_items), chunk, fetch_attributes,
+                                    user): chunk
+                    for chunk in chunks
+                }
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        fetched.update(future.result())
+                    except MeliApiError as err:
+                        app_logger.error(f"Error en multiget para {len(chunk)} items: {err.message}")
+                        for item_id in chunk:
+                            fetched[item_id] = {"item_id": item_id, "status_code": err.status_code,
+                                                "error": err.message}
+
+            fields = [name for name in attributes.split(",") if name] if attributes else None
+            for item_id, result in fetched.items():
+                if "product" in result and max_age > 0:
+                    result["source"] = "api"
+                if "product" in result and not fetch_attributes:
+                    self.itemMirror.put(shop_id, result["product"], "verify")
+                    if fields:
+                        result["product"] = {key: value for key, value in result["product"].items() if key in fields}
+            results.update(fetched)
+
+            items = [results[item_id] for item_id in item_ids]
+
+            project = compile_projection(projection)
+            if project:
+                for item in items:
+                    if "product" in item:
+                        item["product"] = project(item["product"])
+
+            by_status = {}
+            errors = 0
+            for item in items:
+                if "error" in item:
+                    errors += 1
+                else:
+                    status = item.get("status") or "desconocido"
+                    by_status[status] = by_status.get(status, 0) + 1
+
+            app_logger.info(
+                f"Verificación masiva completada: {len(items)} items en {len(chunks)} llamadas, {errors} errores")
+            return {
+                "items": items,
+                "summary": {
+                    "total": len(items),
+                    "found": len(items) - errors,
+                    "errors": errors,
+                    "by_status": by_status,
+                    "upstream_calls": len(chunks),
+                    "mirror_hits": mirror_hits
+                }
+            }
+
+        except ValidationError as err:
+            return {"error": "Error de validación", "details": err.messages}
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def refresh_items(self, user, item_ids):
+        """
+        Vuelve a leer items de la API con consultas multiget (ej: al recibir notificaciones),
+        guarda cada item leído en el espejo local y descarta su copia en la caché HTTP.
+
+        Args:
+            user (dict): Usuario de MeLi dueño de los items
+            item_ids (list): IDs de los items
+
+        Returns:
+            dict: Resultado por item_id (mismo formato que verify_products_batch)
+        """
+        chunks = [item_ids[i:i + MULTIGET_CHUNK_SIZE] for i in range(0, len(item_ids), MULTIGET_CHUNK_SIZE)]
+        results = {}
+        for chunk in chunks:
+            try:
+                results.update(self.__invoke_multiget_items(chunk, None, user))
+            except MeliApiError as err:
+                app_logger.error(f"Error en multiget para {len(chunk)} items: {err.message}")
+                for item_id in chunk:
+                    results[item_id] = {"item_id": item_id, "status_code": err.status_code, "error": err.message}
+
+        for item_id, result in results.items():
+            if "product" in result:
+                self.itemMirror.put(user.get('shop_id'), result["product"], "refresh")
+                self.meliApiClient.invalidate(f"/items/{item_id}", user)
+
+        app_logger.info(f"Items actualizados: {sum(1 for result in results.values() if 'product' in result)}"
+                        f"/{len(item_ids)} en {len(chunks)} llamadas")
+        return results
+
+    def __invoke_multiget_items(self, item_ids, attributes, user, cache=True):
+        """
+        Consulta hasta MULTIGET_CHUNK_SIZE items en una sola llamada a /items?ids=...
+        Con cache=False no se usa la caché HTTP (para decisiones que requieren el estado actual).
+
+        Returns:
+            dict: Resultado por item_id
+        """
+        operation_name = "invoke_multiget_items"
+        endpoint = "/items"
+        params = {"ids": ",".join(item_ids)}
+        if attributes:
+            params["attributes"] = attributes
+
+        try:
+            response = self.meliApiClient.get(endpoint, operation_name, user, params=params, cache=cache)
+
+            # Procesar respuesta
+            data = self._handle_api_response(response, operation_name)
+
+            results = {}
+            # La API responde en el mismo orden en que se enviaron los ids
+            for item_id, entry in zip(item_ids, data if isinstance(data, list) else []):
+                code = entry.get("code", 200)
+                body = entry.get("body") or {}
+                if code >= 400:
+                    results[item_id] = {
+                        "item_id": item_id,
+                        "status_code": code,
+                        "error": body.get("message", "Error desconocido")
+                    }
+                else:
+                    results[item_id] = {
+                        "item_id": item_id,
+                        "status_code": code,
+                        "status": body.get("status"),
+                        "sub_status": body.get("sub_status"),
+                        "product": body
+                    }
+
+            for item_id in item_ids:
+                if item_id not in results:
+                    results[item_id] = {"item_id": item_id, "status_code": 502, "error": "Sin respuesta de la API"}
+
+            return results
 
         except MeliApiError as err:
             raise err
@@ -540,6 +945,11 @@ class MeliProducts:
     def update_product(self, data):
         """
         Actualiza un producto existente en Mercado Libre.
+
+        La actualización se compara con el estado actual del item (leído con multiget, o la
+        copia del espejo si la petición acepta una de hasta state_max_age segundos) y solo se
+        envían los campos que cambian; si ninguno cambia no se hace el PUT y se responde
+        "status": "unchanged". Con force=true (o ITEM_UPDATE_DIFF=false) se envía todo.
         """
         operation_name = "update_product"
         try:
@@ -550,12 +960,39 @@ class MeliProducts:
             shop_id = validated_data['shop_id']
             item_id = validated_data['item_id']
             update_data = validated_data['update_data']
+            compare = self.update_diff_enabled and not validated_data.get('force')
+            state_max_age = validated_data.get('state_max_age', self.update_state_max_age)
+
+            # Copia del espejo solo si la petición la acepta (evita buscar el usuario si no hay nada que enviar)
+            current = None
+            if compare and state_max_age > 0:
+                cached = self.itemMirror.get(shop_id, item_id, state_max_age)
+                current = cached[0] if cached is not None else None
+            user = None
+            if compare and current is None:
+                user = self._get_user_by_shop_id(shop_id)
+                current = self._fetch_item_state(shop_id, item_id, user)
+
+            unchanged = []
+            if current is not None:
+                with span("item_diff"):
+                    changes, unchanged = diff_update(update_data, current)
+                if not changes:
+                    item_updates.inc(result="unchanged")
+                    app_logger.info(f"Producto {item_id} sin cambios: no se envía la actualización")
+                    return {"product": current, "status": "unchanged", "unchanged_fields": unchanged}
+                update_data = changes
 
             # Obtener usuario
-            user = self._get_user_by_shop_id(shop_id)
+            if user is None:
+                user = self._get_user_by_shop_id(shop_id)
 
             # Llamar a la API
-            return self.__invoke_update_product(item_id, update_data, user)
+            result = self.__invoke_update_product(item_id, update_data, user)
+            self.itemMirror.put(shop_id, result["product"], "update")
+            item_updates.inc(result="partial" if unchanged else "sent")
+            result.update({"status": "updated", "sent_fields": sorted(update_data), "unchanged_fields": unchanged})
+            return result
 
         except ValidationError as err:
             return {"error": "Error de validación", "details": err.messages}
@@ -567,35 +1004,36 @@ class MeliProducts:
             app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
             return {"error": "Error interno del servidor", "details": str(e)}
 
+    def _fetch_item_state(self, shop_id, item_id, user):
+        """
+        Lee el item con multiget para compararlo con una actualización y lo guarda en el espejo.
+        Si no se puede leer devuelve None y la actualización se envía completa.
+        """
+        try:
+            result = self.__invoke_multiget_items([item_id], None, user, cache=False)[item_id]
+        except MeliApiError as err:
+            app_logger.warning(f"No se pudo leer el estado de {item_id} antes de actualizarlo: {err.message}")
+            return None
+        if "product" not in result:
+            return None
+        self.itemMirror.put(shop_id, result["product"], "update_check")
+        return result["product"]
+
     def __invoke_update_product(self, item_id, update_data, user):
         """
         Realiza la actualización del producto en Mercado Libre.
         """
         operation_name = "invoke_update_product"
         endpoint = f"/items/{item_id}"
-        headers = {
-            "Authorization": f"Bearer {user['access_token']}",
-            "Content-Type": "application/json"
-        }
 
         try:
             app_logger.info(f"Actualizando producto en API: {item_id}")
             app_logger.debug(f"Datos de actualización: {json.dumps(update_data)}")
 
-            response = requests.put(
-                f"{self.base_url}{endpoint}",
-                headers=headers,
-                json=update_data
-            )
+            response = self.meliApiClient.put(endpoint, operation_name, user, json=update_data)
 
             # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get("user_id"),
-                self.__invoke_update_product,
-                (item_id, update_data)
-            )
+            data = self._handle_api_response(response, operation_name)
 
             app_logger.info(f"Producto actualizado exitosamente: {item_id}")
             return {"product": data}
@@ -636,44 +1074,23 @@ class MeliProducts:
             max_depth = int(data.get('max_depth', 3))  # Limitar profundidad de recursión para evitar sobrecarga
             include_parents = data.get('include_parents', True)  # Por defecto, incluir información de padres
 
-            # Obtener usuario
-            user = self._get_user_by_shop_id(shop_id)
-
-            # Obtener árbol de categorías con padres
-            tree = self.__invoke_category_tree(site_id, category_id, user, max_depth)
+            # Obtener árbol de categorías compacto (desde caché si está disponible)
+            tree = self._get_category_tree_cached(site_id, category_id, max_depth, shop_id)
 
             result = {
                 "site_id": site_id,
-                "tree": tree,
+                "tree": tree.to_nested(include_parents),
                 "include_parents": include_parents
             }
 
             if category_id:
                 result["category_id"] = category_id
 
-                # Si estamos empezando de una categoría específica y queremos incluir sus padres,
-                # obtenemos la información de esa categoría para tener más contexto
-                if include_parents:
-                    try:
-                        headers = {"Authorization": f"Bearer {user['access_token']}"}
-                        path_response = requests.get(f"{self.base_url}/categories/{category_id}", headers=headers)
-                        category_data = self._handle_api_response(
-                            path_response,
-                            "get_category_detail",
-                            user.get("user_id")
-                        )
-
-                        # Agregar información de la categoría actual al resultado
-                        result["category_name"] = category_data.get("name")
-
-                        # Obtener la ruta completa hacia la raíz
-                        path_from_root = category_data.get("path_from_root", [])
-                        if path_from_root:
-                            result["path_from_root"] = path_from_root
-                            app_logger.info(
-                                f"Obtenida ruta desde la raíz para categoría {category_id} con {len(path_from_root)} niveles")
-                    except Exception as e:
-                        app_logger.warning(f"No se pudo obtener información adicional para {category_id}: {str(e)}")
+                # La ruta desde la raíz se obtiene en la misma consulta del detalle de la categoría inicial
+                if tree.root_path:
+                    result["category_name"] = tree.root_path[-1].get("name")
+                    if include_parents:
+                        result["path_from_root"] = tree.root_path
 
             return result
 
@@ -687,143 +1104,359 @@ class MeliProducts:
             app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
             return {"error": "Error interno del servidor", "details": str(e)}
 
-    def __invoke_category_tree(self, site_id, category_id, user, max_depth, current_depth=0, parent_path=None):
+    def get_category_tree_page(self, data):
+        """
+        Devuelve una página de registros planos del árbol de categorías en caché.
+
+        Los registros se ordenan en pre-orden (cada categoría antes que sus hijos) y
+        el orden es estable mientras el árbol permanezca en caché, por lo que las
+        páginas se pueden pedir en paralelo con page o en secuencia con cursor.
+
+        Args:
+            data (dict): Mismos campos que get_category_tree más cursor, page y page_size
+
+        Returns:
+            dict: {"site_id", "categories", "pagination"} o un diccionario con "error"
+        """
+        operation_name = "get_category_tree_page"
+        try:
+            site_id = data.get('site_id', 'MLM')
+            category_id = data.get('category_id')
+            max_depth = int(data.get('max_depth', 3))
+            try:
+                offset, page_size = page_bounds(data, default_size=500, max_size=2000)
+            except ValueError as err:
+                return {"error": "Error de validación", "details": str(err)}
+
+            tree = self._get_category_tree_cached(site_id, category_id, max_depth, data.get('shop_id'))
+            end = min(offset + page_size, len(tree))
+            categories = [tree.record(index) for index in range(offset, end)]
+
+            result = {
+                "site_id": site_id,
+                "categories": categories,
+                "pagination": page_info(len(tree), offset, page_size, len(categories))
+            }
+            if category_id:
+                result["category_id"] = category_id
+            return result
+
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def _get_category_tree_cached(self, site_id, category_id, max_depth, shop_id):
+        """
+        Devuelve el árbol de categorías desde la caché o lo construye consultando la API.
+        El usuario solo se consulta cuando el árbol no está en caché.
+        """
+        def load():
+            user = self._get_user_by_shop_id(shop_id)
+            return self.__invoke_category_tree(site_id, category_id, user, max_depth)
+
+        return self.categoryTreeCache.get_or_set((site_id, category_id or "", max_depth), load)
+
+    def __invoke_category_tree(self, site_id, category_id, user, max_depth):
         """
-        Implementación recursiva para obtener el árbol de categorías incluyendo información de padres.
+        Obtiene el árbol de categorías en una estructura compacta.
 
         Args:
             site_id (str): ID del sitio (ej: 'MLM')
-            category_id (str, opcional): ID de la categoría actual
+            category_id (str, opcional): ID de la categoría inicial
             user (dict): Información del usuario con token de acceso
             max_depth (int): Profundidad máxima de recursión
-            current_depth (int): Profundidad actual en la recursión
-            parent_path (list, opcional): Lista de categorías padre con formato [{"id": "ID", "name": "NOMBRE"}, ...]
 
         Returns:
-            list: Lista de categorías con sus hijos anidados y referencias a padres
+            CategoryTree: Árbol con referencias al padre; la ruta y el breadcrumb se generan bajo demanda
         """
-        # Inicializar la ruta de padres si es None
-        if parent_path is None:
-            parent_path = []
+        try:
+            children, path = self.__category_tree_start(site_id, category_id, user)
+            tree = CategoryTree(path)
+
+            # En un recorrido pre-orden el padre de un nodo es el último nodo visitado en el nivel anterior
+            last_by_depth = []
+            for node_id, name, parent_id, depth, level_path in self.__walk_category_tree(
+                    children, path, user, max_depth):
+                parent_index = last_by_depth[depth - 1] if depth > 0 else -1
+                del last_by_depth[depth:]
+                last_by_depth.append(tree.add(node_id, name, parent_index))
+
+            app_logger.info(f"Árbol de categorías obtenido con {len(tree)} categorías")
+            return tree
+
+        except MeliApiError as err:
+            raise err
+        except requests.exceptions.RequestException as e:
+            app_logger.exception(f"Error de red al obtener árbol de categorías: {str(e)}")
+            raise MeliApiError(500, f"Error en la solicitud: {str(e)}", {"error_type": "network_error"})
 
-        # Limitar la profundidad de recursión para evitar problemas de rendimiento o timeouts
-        if current_depth >= max_depth:
-            app_logger.info(f"Alcanzada profundidad máxima ({max_depth}) de recursión para árbol de categorías")
-            return []
+    def get_category_tree_stream(self, data):
+        """
+        Obtiene el árbol de categorías como un flujo de registros planos (uno por categoría).
 
-        headers = {
-            "Authorization": f"Bearer {user['access_token']}"
-        }
+        Los registros se generan conforme se descubren los nodos (recorrido en profundidad),
+        por lo que la memoria utilizada depende de la profundidad del árbol y no de su tamaño.
+        Los errores de la primera consulta se devuelven con "error"; los posteriores llegan
+        como último registro del flujo (la respuesta ya salió con estado 200).
 
+        Args:
+            data (dict): Mismos campos que get_category_tree
+
+        Returns:
+            dict: {"records": generador de registros} o un diccionario con "error"
+        """
+        operation_name = "get_category_tree_stream"
         try:
-            tree = []
+            app_logger.info(f"Iniciando {operation_name} para shop_id: {data.get('shop_id', 'desconocido')}")
 
-            # Si no hay category_id, obtener categorías raíz
-            if not category_id:
-                app_logger.info(f"Obteniendo categorías raíz para sitio {site_id}")
-                response = requests.get(f"{self.base_url}/sites/{site_id}/categories", headers=headers)
-                data = self._handle_api_response(
-                    response,
-                    "get_category_tree_root",
-                    user.get("user_id"),
-                    self.__invoke_category_tree,
-                    (site_id, None, user, max_depth, current_depth, parent_path)
-                )
+            shop_id = data.get('shop_id')
+            site_id = data.get('site_id', 'MLM')
+            category_id = data.get('category_id')
+            max_depth = int(data.get('max_depth', 3))
 
-                for category in data:
-                    # Construir el breadcrumb como string
-                    breadcrumb = " > ".join([parent["name"] for parent in parent_path])
-
-                    cat_info = {
-                        "id": category.get("id"),
-                        "name": category.get("name"),
-                        "path": parent_path.copy(),  # Copiar la ruta de padres actuales
-                        "breadcrumb": breadcrumb,  # Añadir el breadcrumb
-                        "children": []
-                    }
+            # Si el árbol ya está en caché se transmite directamente sin consultar la API
+            tree = self.categoryTreeCache.get((site_id, category_id or "", max_depth))
+            if tree is not None:
+                app_logger.info(f"Árbol de categorías obtenido de caché para {site_id}/{category_id or 'raíz'}")
+                return {"records": (tree.record(index) for index in range(len(tree)))}
 
-                    # Crear nueva ruta para los hijos que incluye esta categoría como padre
-                    new_parent_path = parent_path.copy()
-                    new_parent_path.append({"id": cat_info["id"], "name": cat_info["name"]})
+            # Obtener usuario
+            user = self._get_user_by_shop_id(shop_id)
 
-                    # Llamada recursiva para obtener hijos
-                    if current_depth < max_depth - 1:
-                        app_logger.info(f"Obteniendo hijos para categoría {cat_info['id']} (nivel {current_depth})")
-                        cat_info["children"] = self.__invoke_category_tree(
-                            site_id, cat_info["id"], user, max_depth, current_depth + 1, new_parent_path
-                        )
+            # La primera consulta se hace antes de iniciar el flujo para reportar errores con el código correcto
+            children, path = self.__category_tree_start(site_id, category_id, user)
 
-                    tree.append(cat_info)
-            else:
-                # Obtener información de la categoría específica
-                app_logger.info(f"Obteniendo detalles para categoría {category_id}")
-                response = requests.get(f"{self.base_url}/categories/{category_id}", headers=headers)
-                data = self._handle_api_response(
-                    response,
-                    "get_category_detail",
-                    user.get("user_id"),
-                    self.__invoke_category_tree,
-                    (site_id, category_id, user, max_depth, current_depth, parent_path)
-                )
-
-                # Obtener información completa de la categoría actual para asegurarnos de tener todos los datos
-                # Especialmente útil si estamos comenzando desde una categoría intermedia
-                if current_depth == 0 and category_id and len(parent_path) == 0:
-                    # Intentar obtener la ruta completa de padres para esta categoría
-                    try:
-                        path_response = requests.get(f"{self.base_url}/categories/{category_id}/path_from_root",
-                                                     headers=headers)
-                        path_data = self._handle_api_response(
-                            path_response,
-                            "get_category_path",
-                            user.get("user_id")
-                        )
-
-                        # Construir la ruta de padres
-                        for path_item in path_data[:-1]:  # Excluir la categoría actual
-                            parent_path.append({"id": path_item.get("id"), "name": path_item.get("name")})
-
-                        app_logger.info(
-                            f"Obtenida ruta de padres para categoría {category_id}: {len(parent_path)} niveles")
-                    except Exception as e:
-                        app_logger.warning(f"No se pudo obtener la ruta de padres para {category_id}: {str(e)}")
-
-                # Procesar hijos
-                children = data.get("children_categories", [])
-                for child in children:
-                    # Construir el breadcrumb como string
-                    breadcrumb = " > ".join([parent["name"] for parent in parent_path])
-
-                    child_info = {
-                        "id": child.get("id"),
-                        "name": child.get("name"),
-                        "path": parent_path.copy(),  # Copiar la ruta de padres actuales
-                        "breadcrumb": breadcrumb,  # Añadir el breadcrumb
-                        "children": []
-                    }
+            return {"records": self.__iter_category_tree_records(children, path, user, max_depth)}
+
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def __fetch_category_json(self, endpoint, operation_name, user):
+        """
+        Consulta un endpoint de categorías de Mercado Libre y devuelve el JSON procesado.
+        """
+        try:
+            response = self.meliApiClient.get(endpoint, operation_name, user)
+            return self._handle_api_response(response, operation_name)
+        except requests.exceptions.RequestException as e:
+            app_logger.exception(f"Error de red en {operation_name}: {str(e)}")
+            raise MeliApiError(500, f"Error en la solicitud: {str(e)}", {"error_type": "network_error"})
 
-                    # Crear nueva ruta para los nietos
-                    new_parent_path = parent_path.copy()
-                    new_parent_path.append({"id": child_info["id"], "name": child_info["name"]})
+    def __category_tree_start(self, site_id, category_id, user):
+        """
+        Obtiene el primer nivel del árbol y la ruta de padres desde la raíz.
 
-                    # Llamada recursiva para obtener nietos
-                    if current_depth < max_depth - 1:
-                        app_logger.info(
-                            f"Obteniendo hijos para categoría {child_info['id']} (nivel {current_depth + 1})")
-                        child_info["children"] = self.__invoke_category_tree(
-                            site_id, child_info["id"], user, max_depth, current_depth + 1, new_parent_path
-                        )
+        Returns:
+            tuple: (lista de categorías del primer nivel, ruta [{"id", "name"}, ...] hasta la categoría inicial)
+        """
+        if not category_id:
+            app_logger.info(f"Obteniendo categorías raíz para sitio {site_id}")
+            children = self.__fetch_category_json(f"/sites/{site_id}/categories", "get_category_tree_root", user)
+            return children or [], []
+
+        app_logger.info(f"Obteniendo detalles para categoría {category_id}")
+        data = self.__fetch_category_json(f"/categories/{category_id}", "get_category_detail", user)
+        path = [{"id": item.get("id"), "name": item.get("name")} for item in data.get("path_from_root", [])]
+        if not path:
+            path = [{"id": data.get("id", category_id), "name": data.get("name")}]
+        return data.get("children_categories", []), path
+
+    def __walk_category_tree(self, children, path, user, max_depth):
+        """
+        Recorre el árbol en profundidad (pre-orden) usando una pila explícita.
 
-                    tree.append(child_info)
+        Yields:
+            tuple: (id, nombre, id del padre, profundidad, ruta de padres)
+        """
+        if max_depth <= 0:
+            return
+
+        stack = [(iter(children), path, 0)]
+        while stack:
+            level, level_path, depth = stack[-1]
+            category = next(level, None)
+            if category is None:
+                stack.pop()
+                continue
+
+            category_id = category.get("id")
+            name = category.get("name")
+            parent_id = level_path[-1]["id"] if level_path else None
+            yield category_id, name, parent_id, depth, level_path
+
+            if depth < max_depth - 1:
+                data = self.__fetch_category_json(f"/categories/{category_id}", "get_category_detail", user)
+                stack.append((
+                    iter(data.get("children_categories", [])),
+                    level_path + [{"id": category_id, "name": name}],
+                    depth + 1
+                ))
+
+    def __iter_category_tree_records(self, children, path, user, max_depth):
+        """
+        Genera los registros planos del árbol. Los errores durante el recorrido
+        se reportan como un registro final con la llave "error".
+        """
+        operation_name = "iter_category_tree_records"
+        total = 0
+        try:
+            for category_id, name, parent_id, depth, level_path in self.__walk_category_tree(
+                    children, path, user, max_depth):
+                total += 1
+                yield {
+                    "id": category_id,
+                    "name": name,
+                    "parent_id": parent_id,
+                    "depth": depth,
+                    "path": level_path
+                }
+            app_logger.info(f"Flujo de árbol de categorías completado con {total} categorías")
+        except MeliApiError as err:
+            app_logger.error(f"Error en {operation_name} después de {total} categorías: {err.message}")
+            yield {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            yield {"error": "Error interno del servidor", "details": str(e)}
 
-            # Limitar el logging para evitar mensajes excesivos
-            if current_depth == 0:
-                app_logger.info(f"Árbol de categorías obtenido con {len(tree)} categorías de nivel superior")
+    def _get_category_index(self, data):
+        """
+        Obtiene el índice de búsqueda sobre el árbol del sitio en caché, hasta max_depth niveles.
 
-            return tree
+        El índice solo contiene las categorías de los primeros max_depth niveles (default: 3);
+        las más profundas, que suelen ser las categorías donde se publica, no aparecen en
+        búsqueda, autocompletado ni subárbol. Por eso cada respuesta incluye la cobertura:
+        indexed_depth y truncated (true si hay categorías en el último nivel indexado, cuyos
+        hijos no se consultaron).
+
+        Si el árbol no está en caché se construye dentro de la petición con un recorrido en
+        serie: una llamada a /categories/{id} por cada categoría de los niveles anteriores
+        al último (cientos a miles de llamadas en MLM con max_depth=3). Conviene precalentarlo
+        con /meli/products/categories/tree con el mismo site_id y max_depth.
+
+        Returns:
+            tuple: (CategoryTree, CategoryIndex, {"indexed_depth", "truncated"})
+        """
+        site_id = data.get('site_id', 'MLM')
+        max_depth = int(data.get('max_depth', 3))
+        tree = self._get_category_tree_cached(site_id, None, max_depth, data.get('shop_id'))
+        coverage = {"indexed_depth": max_depth, "truncated": max(tree.depths, default=-1) >= max_depth - 1}
+        return tree, tree.index(), coverage
+
+    def search_categories(self, data):
+        """
+        Busca categorías por nombre en el árbol en caché, sin consultar la API.
+
+        Args:
+            data (dict): Diccionario con los siguientes campos:
+                - shop_id (str): ID de la tienda (solo se usa si hay que construir el árbol)
+                - q (str): Texto a buscar; todas las palabras deben coincidir como prefijo
+                - site_id (str, opcional): ID del sitio (default: 'MLM')
+                - max_depth (int, opcional): Profundidad del árbol indexado (default: 3)
+                - limit (int, opcional): Máximo de resultados (default: 20)
+        """
+        operation_name = "search_categories"
+        try:
+            app_logger.info(f"Iniciando {operation_name} para: {data.get('q', '')}")
+            tree, index, coverage = self._get_category_index(data)
+            limit = int(data.get('limit', 20))
+
+            matches = index.search(data.get('q', ''), limit)
+            return {"query": data.get('q'), "total": len(matches), "categories": [tree.record(i) for i in matches],
+                    **coverage}
 
         except MeliApiError as err:
-            raise err
-        except requests.exceptions.RequestException as e:
-            app_logger.exception(f"Error de red al obtener árbol de categorías: {str(e)}")
-            raise MeliApiError(500, f"Error en la solicitud: {str(e)}", {"error_type": "network_error"})
\ No newline at end of file
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def autocomplete_categories(self, data):
+        """
+        Sugiere categorías cuyo nombre (o alguna palabra del nombre) empieza con el prefijo dado.
+
+        Args:
+            data (dict): shop_id, prefix, site_id (opcional), max_depth (opcional), limit (opcional, default: 10)
+        """
+        operation_name = "autocomplete_categories"
+        try:
+            tree, index, coverage = self._get_category_index(data)
+            limit = int(data.get('limit', 10))
+
+            matches = index.autocomplete(data.get('prefix', ''), limit)
+            return {
+                "prefix": data.get('prefix'),
+                "suggestions": [
+                    {"id": tree.ids[i], "name": tree.names[i], "breadcrumb": tree.breadcrumb(i)} for i in matches
+                ],
+                **coverage
+            }
+
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def get_category_subtree(self, data):
+        """
+        Devuelve los ancestros, hijos y descendientes de una categoría usando el árbol en caché.
+
+        Args:
+            data (dict): Diccionario con los siguientes campos:
+                - shop_id (str): ID de la tienda
+                - category_id (str): Categoría a consultar
+                - descendant_id (str, opcional): Si se envía, indica si es descendiente de category_id
+                - site_id (str, opcional), max_depth (int, opcional)
+                - limit (int, opcional): Máximo de descendientes a devolver (default: 500)
+        """
+        operation_name = "get_category_subtree"
+        try:
+            category_id = data.get('category_id')
+            app_logger.info(f"Iniciando {operation_name} para categoría: {category_id}")
+            tree, index, coverage = self._get_category_index(data)
+            limit = int(data.get('limit', 500))
+
+            node = index.get(category_id)
+            if node is None:
+                # Puede existir por debajo de la profundidad indexada (ver coverage)
+                err = NotFoundError("Categoría", category_id)
+                return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id,
+                        **coverage}
+
+            result = {
+                "category": tree.record(node),
+                "ancestors": [tree.record(i) for i in tree.ancestors(node)],
+                "children": [tree.record(i) for i in tree.children(node)],
+                "descendants": [tree.record(i) for i in index.descendants(node, limit)],
+                "total_descendants": index.descendant_count(node),
+                **coverage
+            }
+
+            descendant_id = data.get('descendant_id')
+            if descendant_id:
+                other = index.get(descendant_id)
+                result["descendant_id"] = descendant_id
+                result["is_descendant"] = other is not None and other != node and index.is_ancestor(node, other)
+
+            return result
+
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
@@ -1,7 +1,34 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+
+from App.Services.MeliApiClient import MeliApiClient, upstream_retries
 from App.Services.MeliUsersService import MeliUsersService
+from App.Utils.Cache import TTLCache
+from App.Utils.TieredCache import TieredCache
 from App.Utils.Logger import app_logger
 from App.Utils.Exceptions import MeliApiError, NotFoundError
+from App.Utils.Pagination import page_bounds, page_info
+from App.Utils.RateLimiter import RateLimiter
+from App.Utils.SizeChartMatcher import SizeChartIndex, normalize_domain
+from App.Utils.SizeChartValidator import SizeChartValidator, size_chart_fingerprint
+from App.Utils.Timing import span, with_current_context
+
+# Máximo de guías de tallas que devuelve la API por llamada
+UPSTREAM_PAGE_SIZE = 50
+# Máximo de guías de tallas por página en nuestras respuestas
+MAX_PAGE_SIZE = 200
+# Vida del contador de generación de un vendedor (debe superar al TTL de las páginas)
+GENERATION_TTL = 86400
+# Reintentos por item ante respuestas 429 en la asociación masiva
+BATCH_RATE_LIMIT_RETRIES = 3
+# Máximo de guías de un vendedor que se leen para buscar duplicados y elegir guías
+MAX_SELLER_CHARTS = 2000
+# Vida del dominio de una categoría (dato público del sitio)
+CATEGORY_DOMAIN_TTL = 86400
 
 
 class MeliSizeChartService:
@@ -10,15 +37,40 @@ class MeliSizeChartService:
     Basado en la documentación: https://developers.mercadolibre.com.ar/en_us/size-guide
     """
 
-    def __init__(self, meli_users_service: MeliUsersService):
+    def __init__(self, meli_users_service: MeliUsersService, meli_api_client: MeliApiClient = None,
+                 size_chart_cache: TieredCache = None, rate_limiter: RateLimiter = None,
+                 batch_run_cache: TieredCache = None, index_cache: TTLCache = None):
         self.meli_users_service = meli_users_service
-        self.base_url = "https://api.mercadolibre.com"
+        # Llamadas a la API con renovación de token y medición de tiempos
+        self.meli_api_client = (meli_api_client if meli_api_client is not None
+                                else MeliApiClient(meli_users_service))
+        # Guías de tallas por vendedor: guías por ID y páginas del listado por generación.
+        # Nuestras escrituras (crear, asociar) cambian la generación del vendedor y con ello
+        # descartan sus páginas; el TTL cubre los cambios hechos fuera de esta API.
+        self.size_chart_cache = (size_chart_cache if size_chart_cache is not None
+                                 else TieredCache(TTLCache(maxsize=1024, ttl=300, name="size_chart")))
+        self.list_ttl = int(os.environ.get("SIZE_CHART_LIST_TTL", 300))
+        # Validación local de las guías antes de crearlas
+        self.preflight_enabled = os.environ.get("MELI_PREFLIGHT_VALIDATION", "true").lower() != "false"
+        # Índices de guías por vendedor para elegir la guía de un item; solo en el proceso,
+        # se derivan de las guías del vendedor en caché
+        self.index_cache = (index_cache if index_cache is not None
+                            else TTLCache(maxsize=256, ttl=self.list_ttl, name="size_chart_index"))
+        self.site_id = "MLM"  # México por defecto
+        # Asociación masiva: turnos por vendedor, hilos concurrentes, tiempo máximo por petición
+        # y estado de cada ejecución (para reanudarla desde otra petición o contenedor)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.batch_run_cache = (batch_run_cache if batch_run_cache is not None
+                                else TieredCache(TTLCache(maxsize=1024, ttl=86400, name="size_chart_runs")))
+        self.batch_workers = int(os.environ.get("SIZE_CHART_BATCH_WORKERS", 8))
+        self.batch_max_seconds = float(os.environ.get("SIZE_CHART_BATCH_MAX_SECONDS", 25))
 
     def _get_user_by_shop_id(self, shop_id):
         """
         Obtiene un usuario de MeLi por su shop_id.
         """
-        user = self.meli_users_service.getMeliUserByShopId(shop_id)
+        with span("user_lookup"):
+            user = self.meli_users_service.getMeliUserByShopId(shop_id)
         if not user or len(user) == 0:
             app_logger.error(f"Usuario no encontrado para shop_id: {shop_id}")
             raise NotFoundError("Usuario", shop_id)
@@ -26,9 +78,27 @@ class MeliSizeChartService:
         app_logger.info(f"Usuario encontrado para shop_id: {shop_id}, user_id: {user[0].get('user_id', 'desconocido')}")
         return user[0]
 
-    def _handle_api_response(self, response, operation_name, user_id=None, retry_func=None, retry_args=None):
+    def _generation(self, shop_id):
+        """Generación actual de las guías de tallas del vendedor (se lee del almacén compartido)."""
+        return self.size_chart_cache.get_current(("generation", str(shop_id)), "0")
+
+    def _charts_generation(self, shop_id):
+        """Generación del contenido de las guías del vendedor (solo cambia al crear guías)."""
+        return self.size_chart_cache.get_current(("charts_generation", str(shop_id)), "0")
+
+    def _invalidate_listing(self, shop_id, charts_changed=True):
+        """
+        Descarta las páginas en caché del vendedor en todos los contenedores. Si cambiaron las
+        guías (no solo sus asociaciones), descarta también la lista completa y su índice.
+        """
+        self.size_chart_cache.set(("generation", str(shop_id)), uuid.uuid4().hex, ttl=GENERATION_TTL)
+        if charts_changed:
+            self.size_chart_cache.set(("charts_generation", str(shop_id)), uuid.uuid4().hex, ttl=GENERATION_TTL)
+
+    def _handle_api_response(self, response, operation_name):
         """
         Maneja la respuesta de la API, procesa errores y registra información relevante.
+        La renovación del token ante un 401 la hace MeliApiClient antes de devolver la respuesta.
         """
         try:
             data = response.json()
@@ -43,21 +113,6 @@ class MeliSizeChartService:
         # Log de la respuesta
         app_logger.info(f"Respuesta de API para {operation_name}: Status={response.status_code}")
 
-        # Si el token expiró y tenemos la función de reintento
-        if response.status_code == 401 and retry_func and user_id:
-            app_logger.info(f"Token expirado para usuario {user_id}, renovando...")
-            tokens = self.meli_users_service.refreshAccessToken(user_id)
-            if tokens:
-                app_logger.info(f"Token renovado exitosamente para usuario {user_id}")
-                return retry_func(*retry_args, tokens)
-            else:
-                app_logger.error(f"No se pudo renovar el token para usuario {user_id}")
-                raise MeliApiError(
-                    401,
-                    "No se pudo renovar el token de acceso",
-                    {"error": "token_refresh_failed"}
-                )
-
         # Para errores de la API que devuelven códigos de error
         if response.status_code >= 400:
             error_message = data.get('message', 'Error desconocido')
@@ -77,41 +132,54 @@ class MeliSizeChartService:
 
     def list_size_charts(self, data):
         """
-        Lista las guías de tallas disponibles para un usuario.
+        Lista las guías de tallas disponibles para un usuario con paginación por cursor.
+
+        La página solicitada se arma en el servidor recorriendo tantas páginas de la API
+        como sean necesarias (la API devuelve como máximo UPSTREAM_PAGE_SIZE por llamada).
+        Las páginas se guardan en caché por vendedor hasta la siguiente escritura o hasta
+        SIZE_CHART_LIST_TTL.
 
         Endpoint: GET /users/{user_id}/size_charts
+
+        Args:
+            data (dict): shop_id y opcionalmente cursor, page, page_size (o limit/offset)
+
+        Returns:
+            dict: {"size_charts": [...], "pagination": {...}} o un diccionario con "error"
         """
         operation_name = "list_size_charts"
         try:
             shop_id = data.get('shop_id')
-            limit = data.get('limit', 50)
-            offset = data.get('offset', 0)
-
-            # Obtener usuario
-            user = self._get_user_by_shop_id(shop_id)
-            user_id = user.get('user_id')
-
-            # Construir endpoint
-            endpoint = f"/users/{user_id}/size_charts"
-            params = {
-                'limit': limit,
-                'offset': offset
-            }
-
-            # Llamar a la API
-            headers = {"Authorization": f"Bearer {user['access_token']}"}
-            response = requests.get(f"{self.base_url}{endpoint}", headers=headers, params=params)
-
-            # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user_id,
-                self.list_size_charts,
-                ({"shop_id": shop_id, "limit": limit, "offset": offset},)
-            )
-
-            return {"size_charts": data}
+            try:
+                offset, page_size = page_bounds(data, default_size=50, max_size=MAX_PAGE_SIZE)
+            except ValueError as err:
+                return {"error": "Error de validación", "details": str(err)}
+
+            def load():
+                # Obtener usuario (solo si la página no está en caché)
+                user = self._get_user_by_shop_id(shop_id)
+
+                charts = []
+                total = None
+                while len(charts) < page_size:
+                    limit = min(UPSTREAM_PAGE_SIZE, page_size - len(charts))
+                    page, total = self.__fetch_size_charts_page(user, offset + len(charts), limit)
+                    charts.extend(page)
+                    if len(page) < limit or (total is not None and offset + len(charts) >= total):
+                        break
+
+                app_logger.info(f"Guías de tallas obtenidas: {len(charts)} (offset {offset}, total {total})")
+                if offset == 0 and total is not None and len(charts) >= total:
+                    # La página contiene todas las guías: sirve también para buscar duplicados y elegir guías
+                    self.size_chart_cache.set(("all", str(shop_id), charts_generation), charts, ttl=self.list_ttl)
+                return {
+                    "size_charts": charts,
+                    "pagination": page_info(total, offset, page_size, len(charts))
+                }
+
+            charts_generation = self._charts_generation(shop_id)
+            key = ("list", str(shop_id), self._generation(shop_id), offset, page_size)
+            return self.size_chart_cache.get_or_set(key, load, ttl=self.list_ttl)
 
         except MeliApiError as err:
             return {"error": err.message, "details": err.details, "status_code": err.status_code}
@@ -121,6 +189,78 @@ class MeliSizeChartService:
             app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
             return {"error": "Error interno del servidor", "details": str(e)}
 
+    def __fetch_size_charts_page(self, user, offset, limit):
+        """
+        Obtiene una página de guías de tallas de la API.
+
+        Returns:
+            tuple: (lista de guías, total reportado por la API o None)
+        """
+        operation_name = "list_size_charts"
+        endpoint = f"/users/{user.get('user_id')}/size_charts"
+        params = {
+            'limit': limit,
+            'offset': offset
+        }
+
+        response = self.meli_api_client.get(endpoint, operation_name, user, params=params)
+        data = self._handle_api_response(response, operation_name)
+
+        if isinstance(data, list):
+            return data, None
+
+        charts = data.get('charts', data.get('results', []))
+        total = data.get('paging', {}).get('total')
+        return charts, total
+
+    def _seller_size_charts(self, shop_id):
+        """
+        Todas las guías de tallas del vendedor (hasta MAX_SELLER_CHARTS), en caché hasta que se
+        crea una guía o hasta SIZE_CHART_LIST_TTL. El listado completo (primera página con
+        todas las guías) también la llena.
+        """
+        def load():
+            user = self._get_user_by_shop_id(shop_id)
+            charts = []
+            while len(charts) < MAX_SELLER_CHARTS:
+                page, total = self.__fetch_size_charts_page(user, len(charts), UPSTREAM_PAGE_SIZE)
+                charts.extend(page)
+                if len(page) < UPSTREAM_PAGE_SIZE or (total is not None and len(charts) >= total):
+                    break
+            app_logger.info(f"Guías de tallas del vendedor {shop_id}: {len(charts)}")
+            return charts
+
+        key = ("all", str(shop_id), self._charts_generation(shop_id))
+        return self.size_chart_cache.get_or_set(key, load, ttl=self.list_ttl)
+
+    def _size_chart_index(self, shop_id):
+        """Índice por dominio de las guías del vendedor (se reconstruye al cambiar sus guías)."""
+        generation = self._charts_generation(shop_id)
+
+        def build():
+            with span("size_chart_index"):
+                index = SizeChartIndex(self._seller_size_charts(shop_id))
+            app_logger.info(f"Índice de guías de tallas para shop_id {shop_id}: {len(index)} guías")
+            return index
+
+        return self.index_cache.get_or_set((str(shop_id), generation), build)
+
+    def _find_duplicate(self, shop_id, chart_data):
+        """
+        Busca una guía del vendedor con el mismo dominio y la misma huella de contenido.
+        Si el listado no se puede obtener, no se bloquea la creación.
+        """
+        fingerprint = size_chart_fingerprint(chart_data)
+        try:
+            charts = self._seller_size_charts(shop_id)
+        except (MeliApiError, requests.exceptions.RequestException) as e:
+            app_logger.warning(f"No se pudo buscar guías duplicadas para shop_id {shop_id}: {str(e)}")
+            return None
+        for chart in charts:
+            if chart.get('domain_id') == chart_data['domain_id'] and size_chart_fingerprint(chart) == fingerprint:
+                return chart
+        return None
+
     def get_size_chart(self, data):
         """
         Obtiene una guía de tallas específica por su ID.
@@ -132,26 +272,17 @@ class MeliSizeChartService:
             shop_id = data.get('shop_id')
             size_chart_id = data.get('size_chart_id')
 
-            # Obtener usuario
-            user = self._get_user_by_shop_id(shop_id)
-
-            # Construir endpoint
-            endpoint = f"/size_charts/{size_chart_id}"
+            def load():
+                # Obtener usuario (solo si la guía no está en caché)
+                user = self._get_user_by_shop_id(shop_id)
 
-            # Llamar a la API
-            headers = {"Authorization": f"Bearer {user['access_token']}"}
-            response = requests.get(f"{self.base_url}{endpoint}", headers=headers)
+                # Llamar a la API
+                response = self.meli_api_client.get(f"/size_charts/{size_chart_id}", operation_name, user)
 
-            # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get('user_id'),
-                self.get_size_chart,
-                ({"shop_id": shop_id, "size_chart_id": size_chart_id},)
-            )
+                # Procesar respuesta (los errores lanzan excepción y no se guardan)
+                return self._handle_api_response(response, operation_name)
 
-            return {"size_chart": data}
+            return {"size_chart": self.size_chart_cache.get_or_set(("chart", str(shop_id), str(size_chart_id)), load)}
 
         except MeliApiError as err:
             return {"error": err.message, "details": err.details, "status_code": err.status_code}
@@ -165,6 +296,11 @@ class MeliSizeChartService:
         """
         Crea una nueva guía de tallas.
 
+        Antes de llamar a la API la guía se valida localmente (SizeChartValidator) y se busca
+        entre las guías del vendedor una del mismo dominio con idéntico contenido; si existe
+        se devuelve esa guía con duplicate=true en lugar de crear otra (allow_duplicate=true
+        fuerza la creación).
+
         Endpoint: POST /catalog/charts
         """
         operation_name = "create_size_chart"
@@ -181,6 +317,21 @@ class MeliSizeChartService:
                 "rows": data.get('rows')
             }
 
+            # Validar el contenido de la guía antes de enviarla
+            if self.preflight_enabled:
+                with span("size_chart_validation"):
+                    report = SizeChartValidator.validate(chart_data)
+                if not report["valid"]:
+                    app_logger.warning(f"Validación local de guía de tallas fallida: {len(report['errors'])} errores")
+                    return {"error": "Error de validación de guía de tallas", "details": report}
+
+            # Reutilizar una guía idéntica del vendedor
+            if not data.get('allow_duplicate'):
+                duplicate = self._find_duplicate(shop_id, chart_data)
+                if duplicate is not None:
+                    app_logger.info(f"Guía de tallas idéntica encontrada para shop_id {shop_id}: {duplicate.get('id')}")
+                    return {"size_chart": duplicate, "duplicate": True}
+
             # Obtener usuario
             user = self._get_user_by_shop_id(shop_id)
 
@@ -188,24 +339,18 @@ class MeliSizeChartService:
             endpoint = "/catalog/charts"
 
             # Llamar a la API
-            headers = {
-                "Authorization": f"Bearer {user['access_token']}",
-                "Content-Type": "application/json"
-            }
-
             app_logger.info(f"Enviando solicitud para crear guía de tallas: {chart_data}")
-            response = requests.post(f"{self.base_url}{endpoint}", headers=headers, json=chart_data)
+            response = self.meli_api_client.post(endpoint, operation_name, user, json=chart_data)
 
             # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get('user_id'),
-                self.create_size_chart,
-                (data,)
-            )
+            data = self._handle_api_response(response, operation_name)
 
-            return {"size_chart": data}
+            # La guía nueva queda en caché y el listado del vendedor se invalida
+            if isinstance(data, dict) and data.get('id') is not None:
+                self.size_chart_cache.set(("chart", str(shop_id), str(data['id'])), data)
+            self._invalidate_listing(shop_id)
+
+            return {"size_chart": data, "duplicate": False}
 
         except MeliApiError as err:
             return {"error": err.message, "details": err.details, "status_code": err.status_code}
@@ -234,20 +379,12 @@ class MeliSizeChartService:
             endpoint = f"/items/{item_id}/size_charts/{size_chart_id}"
 
             # Llamar a la API
-            headers = {
-                "Authorization": f"Bearer {user['access_token']}",
-                "Content-Type": "application/json"
-            }
-            response = requests.post(f"{self.base_url}{endpoint}", headers=headers)
+            response = self.meli_api_client.post(
+                endpoint, operation_name, user, headers={"Content-Type": "application/json"})
 
             # Procesar respuesta
-            data = self._handle_api_response(
-                response,
-                operation_name,
-                user.get('user_id'),
-                self.associate_size_chart,
-                (data,)
-            )
+            data = self._handle_api_response(response, operation_name)
+            self._invalidate_listing(shop_id, charts_changed=False)
 
             return {"association": data}
 
@@ -257,4 +394,268 @@ class MeliSizeChartService:
             return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
         except Exception as e:
             app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
-            return {"error": "Error interno del servidor", "details": str(e)}
\ No newline at end of file
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def _resolve_domain(self, shop_id, category_id, title):
+        """
+        Dominio de una categoría. Se obtiene de la predicción de dominio por título
+        (/sites/{site_id}/domain_discovery/search) y cada par categoría/dominio de la respuesta
+        queda en caché. Devuelve None si no se puede determinar.
+        """
+        if not category_id:
+            return None
+        key = ("domain", category_id)
+        domain_id = self.size_chart_cache.get(key)
+        if domain_id is not None or not title:
+            return domain_id
+
+        operation_name = "domain_discovery"
+        user = self._get_user_by_shop_id(shop_id)
+        endpoint = f"/sites/{self.site_id}/domain_discovery/search"
+        response = self.meli_api_client.get(endpoint, operation_name, user, params={"q": title})
+        data = self._handle_api_response(response, operation_name)
+
+        for prediction in data if isinstance(data, list) else []:
+            if prediction.get("category_id") and prediction.get("domain_id"):
+                self.size_chart_cache.set(("domain", prediction["category_id"]), prediction["domain_id"],
+                                          ttl=CATEGORY_DOMAIN_TTL)
+                if prediction["category_id"] == category_id:
+                    domain_id = prediction["domain_id"]
+        return domain_id
+
+    def _match_item(self, shop_id, item, limit=3):
+        """
+        Elige la guía de tallas del vendedor para un item (domain_id o category_id + title,
+        attributes y variations). Solo hay match si la guía cubre todas las tallas del item.
+        """
+        domain_id = item.get('domain_id') or self._resolve_domain(shop_id, item.get('category_id'), item.get('title'))
+        result = {"domain_id": normalize_domain(domain_id) if domain_id else None,
+                  "match": None, "candidates": [], "reason": None}
+        if not domain_id:
+            result["reason"] = "domain_unknown"
+            return result
+
+        index = self._size_chart_index(shop_id)
+        with span("size_chart_match"):
+            candidates = index.match(domain_id, item, limit)
+        result["candidates"] = candidates
+        if not candidates:
+            result["reason"] = index.miss_reason(domain_id, item)
+        elif candidates[0]["coverage"] < 1:
+            result["reason"] = "partial_coverage"
+        else:
+            result["match"] = candidates[0]
+        return result
+
+    def match_size_chart(self, data):
+        """
+        Elige la guía de tallas del vendedor que corresponde a un item por dominio, atributo
+        principal y tallas, y opcionalmente la asocia al item (associate=true e item_id).
+
+        Returns:
+            dict: {"domain_id", "match", "candidates", "reason"} (y "association" si se asoció)
+                o un diccionario con "error"
+        """
+        operation_name = "match_size_chart"
+        try:
+            shop_id = data.get('shop_id')
+            if not data.get('domain_id') and not data.get('category_id'):
+                return {"error": "Error de validación", "details": {"domain_id": ["Se requiere domain_id o category_id"]}}
+            if data.get('associate') and not data.get('item_id'):
+                return {"error": "Error de validación", "details": {"item_id": ["Se requiere item_id para asociar la guía"]}}
+
+            result = self._match_item(shop_id, data, limit=data.get('limit') or 3)
+            app_logger.info(f"Guía de tallas para el item {data.get('item_id', 'nuevo')}: "
+                            f"{(result['match'] or {}).get('size_chart_id')} ({result['reason'] or 'match'})")
+
+            if data.get('associate') and result["match"] is not None:
+                association = self.associate_size_chart({
+                    "shop_id": shop_id,
+                    "item_id": data.get('item_id'),
+                    "size_chart_id": result["match"]["size_chart_id"]
+                })
+                if "error" in association:
+                    return association
+                result["association"] = association["association"]
+
+            return result
+
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def associate_matching_size_chart(self, shop_id, item):
+        """
+        Asocia a un item recién publicado la guía de tallas que le corresponde.
+        No lanza excepciones: el item ya existe, por lo que cualquier error se reporta como
+        "failed" junto al producto publicado (un error de la petición provocaría reintentos
+        y publicaciones duplicadas).
+
+        Returns:
+            dict: {"status": "associated" | "unmatched" | "failed", ...}
+        """
+        try:
+            result = self._match_item(shop_id, item, limit=1)
+        except (MeliApiError, NotFoundError, requests.exceptions.RequestException) as e:
+            app_logger.warning(f"No se pudo elegir la guía de tallas del item {item.get('id')}: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado al elegir la guía de tallas del item {item.get('id')}: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+
+        if result["match"] is None:
+            return {"status": "unmatched", "reason": result["reason"], "domain_id": result["domain_id"],
+                    "candidates": result["candidates"]}
+
+        try:
+            association = self.associate_size_chart({
+                "shop_id": shop_id,
+                "item_id": item.get('id'),
+                "size_chart_id": result["match"]["size_chart_id"]
+            })
+        except Exception as e:
+            app_logger.exception(f"Error inesperado al asociar la guía de tallas al item {item.get('id')}: {str(e)}")
+            association = {"error": str(e)}
+        if "error" in association:
+            return {"status": "failed", "match": result["match"], "error": association["error"]}
+        return {"status": "associated", "match": result["match"]}
+
+    def associate_size_chart_batch(self, data):
+        """
+        Asocia una guía de tallas a muchos productos.
+
+        El vendedor se resuelve una sola vez y las asociaciones se envían en paralelo
+        (SIZE_CHART_BATCH_WORKERS hilos), cada una con un turno del limitador de peticiones
+        del vendedor; las respuestas 429 se reintentan respetando Retry-After.
+
+        La ejecución se limita a SIZE_CHART_BATCH_MAX_SECONDS: los items que no alcanzaron
+        a enviarse quedan como "pending" y la respuesta incluye complete=false y
+        remaining_item_ids (pendientes y fallidos). Para reanudar basta con repetir la
+        petición con esos item_ids, sin depender de ningún estado del servidor.
+
+        Además el estado se guarda con el run_id devuelto (compartido entre contenedores si
+        hay almacén compartido): al repetir la petición con ese run_id los items ya asociados
+        se omiten ("skipped"). Si el estado ya no existe (expiró, se expulsó o el contenedor
+        no lo tiene) se envían todos los item_ids recibidos y la respuesta indica
+        run_state="missing"; volver a asociar un item ya asociado no tiene efecto.
+
+        Endpoint: POST /items/{item_id}/size_charts/{size_chart_id} (por item)
+
+        Args:
+            data (dict): shop_id, size_chart_id, item_ids y opcionalmente run_id
+
+        Returns:
+            dict: {"run_id", "run_state", "complete", "remaining_item_ids", "items": [...], "summary": {...}}
+                o un diccionario con "error"
+        """
+        operation_name = "associate_size_chart_batch"
+        try:
+            shop_id = str(data.get('shop_id'))
+            size_chart_id = str(data.get('size_chart_id'))
+            item_ids = list(dict.fromkeys(data.get('item_ids') or []))  # Sin duplicados, conservando el orden
+            run_id = data.get('run_id')
+            deadline = time.monotonic() + self.batch_max_seconds
+
+            previous = {}
+            run_state = "new"
+            if run_id:
+                run = self.batch_run_cache.get(run_id)
+                if run is None:
+                    run_state = "missing"
+                    app_logger.warning(f"Estado de la ejecución {run_id} no encontrado: se envían los "
+                                       f"{len(item_ids)} items recibidos")
+                elif run.get('shop_id') != shop_id or run.get('size_chart_id') != size_chart_id:
+                    return {"error": "Error de validación",
+                            "details": {"run_id": ["La ejecución corresponde a otra tienda o guía de tallas."]}}
+                else:
+                    run_state = "resumed"
+                    previous = run.get('associated', {})
+            else:
+                run_id = uuid.uuid4().hex
+
+            # Obtener usuario (una sola vez para todos los items)
+            user = self._get_user_by_shop_id(shop_id)
+
+            outcomes = {item_id: {"item_id": item_id, "status": "skipped"} for item_id in item_ids
+                        if item_id in previous}
+            to_send = [item_id for item_id in item_ids if item_id not in previous]
+            app_logger.info(f"Asociando guía de tallas {size_chart_id} a {len(to_send)} items "
+                            f"({len(outcomes)} ya asociados en la ejecución {run_id})")
+
+            if to_send:
+                with ThreadPoolExecutor(max_workers=max(1, min(self.batch_workers, len(to_send)))) as executor:
+                    futures = [
+                        executor.submit(with_current_context(self.__associate_item),
+                                        item_id, size_chart_id, user, deadline)
+                        for item_id in to_send
+                    ]
+                    for future in futures:
+                        outcome = future.result()
+                        outcomes[outcome['item_id']] = outcome
+
+            items = [outcomes[item_id] for item_id in item_ids]
+            associated = dict(previous)
+            associated.update({item['item_id']: int(time.time()) for item in items if item['status'] == "associated"})
+            self.batch_run_cache.set(run_id, {"shop_id": shop_id, "size_chart_id": size_chart_id,
+                                              "associated": associated})
+            if len(associated) > len(previous):
+                self._invalidate_listing(shop_id, charts_changed=False)
+
+            summary = {status: 0 for status in ("associated", "skipped", "failed", "pending")}
+            for item in items:
+                summary[item['status']] += 1
+            summary["total"] = len(items)
+
+            app_logger.info(f"Asociación masiva {run_id}: {summary}")
+            return {
+                "run_id": run_id,
+                "run_state": run_state,
+                "complete": summary["failed"] == 0 and summary["pending"] == 0,
+                "remaining_item_ids": [item['item_id'] for item in items if item['status'] in ("failed", "pending")],
+                "items": items,
+                "summary": summary
+            }
+
+        except MeliApiError as err:
+            return {"error": err.message, "details": err.details, "status_code": err.status_code}
+        except NotFoundError as err:
+            return {"error": err.message, "resource_type": err.resource_type, "resource_id": err.resource_id}
+        except Exception as e:
+            app_logger.exception(f"Error inesperado en {operation_name}: {str(e)}")
+            return {"error": "Error interno del servidor", "details": str(e)}
+
+    def __associate_item(self, item_id, size_chart_id, user, deadline):
+        """
+        Asocia la guía a un item respetando el limitador y el tiempo máximo de la ejecución.
+
+        Returns:
+            dict: Resultado del item (associated, failed o pending)
+        """
+        operation_name = "associate_size_chart"
+        endpoint = f"/items/{item_id}/size_charts/{size_chart_id}"
+        for attempt in range(BATCH_RATE_LIMIT_RETRIES + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.rate_limiter.acquire(user.get('user_id'), timeout=remaining):
+                return {"item_id": item_id, "status": "pending"}
+
+            try:
+                response = self.meli_api_client.post(
+                    endpoint, operation_name, user, headers={"Content-Type": "application/json"})
+                if response.status_code == 429 and attempt < BATCH_RATE_LIMIT_RETRIES:
+                    retry_after = response.headers.get("Retry-After", "")
+                    delay = float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt
+                    upstream_retries.inc(operation=operation_name, reason="rate_limited")
+                    time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+                    continue
+                self._handle_api_response(response, operation_name)
+                return {"item_id": item_id, "status": "associated"}
+            except MeliApiError as err:
+                return {"item_id": item_id, "status": "failed", "status_code": err.status_code, "error": err.message}
+            except Exception as e:
+                app_logger.error(f"Error al asociar guía de tallas al item {item_id}: {str(e)}")
+                return {"item_id": item_id, "status": "failed", "error": str(e)}
+        return {"item_id": item_id, "status": "pending"}
@@ -11,5 +11,9 @@ class MeliUsersService:
         user = self.dynamodb.get_users_by_shop_id(shopId)
         return user
 
+    def getMeliUserByUserId(self,userId:int):
+        user = self.dynamodb.get_user_by_id(userId)
+        return user
+
     def refreshAccessToken(self,user):
         return self.accessTokenService.execption401(user)
@@ -1,5 +1,10 @@
 import time
 
+from flask import Response, stream_with_context
+from werkzeug.http import parse_etags
+
+from App.Utils.JsonProvider import dumps_bytes
+
 
 class ResponseHandlerService:
     def __init__(self):
@@ -11,11 +16,13 @@ class ResponseHandlerService:
             "time": int(time.time())
         }
         self._data = {}
+        self._headers = {}
         self._pagination = {
             "total_items": 0,
             "total_pages": 0,
             "current_page": 0,
-            "items_per_page": 0
+            "items_per_page": 0,
+            "next_cursor": None
         }
         pass
 
@@ -25,21 +32,55 @@ class ResponseHandlerService:
         self._metaData['http_status_phrase'] = http_status_phrase
         self._metaData['message'] = message
 
-    def buildPaginatedResponse(self, total_items, total_pages, current_page, items_per_page):
+    def buildPaginatedResponse(self, total_items, total_pages, current_page, items_per_page, next_cursor=None):
         self._pagination['total_items'] = total_items
         self._pagination['total_pages'] = total_pages
         self._pagination['current_page'] = current_page
         self._pagination['items_per_page'] = items_per_page
+        self._pagination['next_cursor'] = next_cursor
 
     def setData(self, data):
         self._data = data
 
+    def setHeaders(self, headers):
+        """Headers adicionales que se enviarán en la siguiente respuesta."""
+        self._headers.update(headers)
+
+    @staticmethod
+    def etag_matches(if_none_match, etag):
+        """Indica si el header If-None-Match coincide con el ETag (comparación débil)."""
+        if not if_none_match:
+            return False
+        return parse_etags(if_none_match).contains_weak(etag.removeprefix("W/").strip('"'))
+
     def doResponse(self):
-        return {
+        pagination, data = self._pagination, self._data
+        # La instancia se reutiliza entre peticiones: la paginación y los datos no deben
+        # arrastrarse a la siguiente (ej: una respuesta de error tras una exitosa)
+        self._pagination = {
+            "total_items": 0,
+            "total_pages": 0,
+            "current_page": 0,
+            "items_per_page": 0,
+            "next_cursor": None
+        }
+        self._data = {}
+        body = {
             "metaData": self._metaData,
-            "data": self._data,
-            "pagination": self._pagination
-        }, self._metaData["http_status"]
+            "data": data,
+            "pagination": pagination
+        }
+        if self._headers:
+            headers, self._headers = self._headers, {}
+            return body, self._metaData["http_status"], headers
+        return body, self._metaData["http_status"]
+
+    def not_modified(self) -> tuple:
+        """
+        Retorna una respuesta 304 (Not Modified) sin cuerpo, con los headers configurados.
+        """
+        headers, self._headers = self._headers, {}
+        return "", 304, headers
 
     def bad_request(self, message="Bad Request") -> tuple:
         """
@@ -112,3 +153,17 @@ class ResponseHandlerService:
             message
         )
         return self.doResponse()
+
+    def ndjson(self, records) -> Response:
+        """
+        Retorna una respuesta en streaming con formato NDJSON (un objeto JSON por línea).
+
+        El estado 200 se envía con la primera línea: un error a mitad del flujo solo puede
+        reportarse como un registro final con la llave "error".
+        """
+
+        def generate():
+            for record in records:
+                yield dumps_bytes(record) + b"\n"
+
+        return Response(stream_with_context(generate()), status=200, mimetype="application/x-ndjson")
@@ -0,0 +1,127 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from App.Utils.Logger import app_logger
+from App.Utils.Metrics import metrics
+
+batches_processed = metrics.counter(
+    "meli_api_batches",
+    "Lotes procesados por KeyedBatcher por lote y resultado (ok, error)",
+    ("batcher", "result")
+)
+batch_size = metrics.histogram(
+    "meli_api_batch_size",
+    "Elementos por lote procesado",
+    ("batcher",),
+    buckets=(1, 2, 5, 10, 20, 50, 100)
+)
+
+
+class _Group:
+    __slots__ = ("items", "handler", "timer")
+
+    def __init__(self, handler):
+        self.items = {}
+        self.handler = handler
+        self.timer = None
+
+
+class KeyedBatcher:
+    """
+    Agrupa elementos por llave (ej: vendedor) y los procesa en lotes en segundo plano.
+
+    Un lote se procesa cuando junta max_size elementos o max_delay segundos después de su
+    primer elemento, lo que ocurra primero. Un elemento que ya está pendiente en el lote de
+    su llave no se agrega de nuevo. handler(key, items) se ejecuta en un pool de hilos;
+    sus excepciones se registran y no afectan a los demás lotes.
+
+    En Lambda los hilos se congelan al terminar la invocación: los lotes pendientes se
+    procesan cuando el contenedor vuelve a recibir peticiones.
+    """
+
+    def __init__(self, max_size=None, max_delay=None, workers=None, name="batch"):
+        """
+        Args:
+            max_size (int): Elementos por lote (default: BATCH_MAX_SIZE o 20)
+            max_delay (float): Espera máxima del primer elemento en segundos (default: BATCH_MAX_DELAY o 1)
+            workers (int): Hilos que procesan lotes (default: BATCH_WORKERS o 2)
+            name (str): Nombre del batcher (para logs y métricas)
+        """
+        self.max_size = int(max_size if max_size is not None else os.environ.get("BATCH_MAX_SIZE", 20))
+        self.max_delay = float(max_delay if max_delay is not None else os.environ.get("BATCH_MAX_DELAY", 1))
+        self.name = name
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(workers if workers is not None else os.environ.get("BATCH_WORKERS", 2)),
+            thread_name_prefix=f"batch-{name}"
+        )
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(group.items) for group in self._groups.values())
+
+    def add(self, key, item, handler):
+        """
+        Agrega un elemento al lote de la llave.
+
+        Args:
+            key: Llave del lote
+            item: Elemento hashable
+            handler: Función handler(key, items) que procesa el lote
+
+        Returns:
+            bool: False si el elemento ya estaba pendiente
+        """
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _Group(handler)
+                group.timer = threading.Timer(self.max_delay, self._flush_key, (key, group))
+                group.timer.daemon = True
+                group.timer.start()
+            elif item in group.items:
+                return False
+            group.handler = handler
+            group.items[item] = None
+            full = len(group.items) >= self.max_size
+            if full:
+                self._detach(key, group)
+
+        if full:
+            self._executor.submit(self._process, key, group)
+        return True
+
+    def flush(self):
+        """Procesa en el hilo actual todos los lotes pendientes."""
+        with self._lock:
+            groups = list(self._groups.items())
+            for key, group in groups:
+                self._detach(key, group)
+        for key, group in groups:
+            self._process(key, group)
+
+    def _detach(self, key, group):
+        """Saca el lote de los pendientes (con el candado tomado)."""
+        if self._groups.get(key) is group:
+            del self._groups[key]
+        if group.timer is not None:
+            group.timer.cancel()
+
+    def _flush_key(self, key, group):
+        with self._lock:
+            if self._groups.get(key) is not group:
+                return
+            self._detach(key, group)
+        self._executor.submit(self._process, key, group)
+
+    def _process(self, key, group):
+        items = list(group.items)
+        batch_size.observe(len(items), batcher=self.name)
+        try:
+            group.handler(key, items)
+            batches_processed.inc(batcher=self.name, result="ok")
+        except Exception as e:
+            batches_processed.inc(batcher=self.name, result="error")
+            app_logger.exception(f"Error al procesar un lote de {self.name} ({len(items)} elementos): {str(e)}")
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+
+from App.Utils.Metrics import metrics
+
+_MISSING = object()
+
+cache_requests = metrics.counter(
+    "meli_api_cache_requests",
+    "Consultas a las cachés en memoria por caché y resultado (hit, miss)",
+    ("cache", "result")
+)
+cache_evictions = metrics.counter(
+    "meli_api_cache_evictions",
+    "Entradas expulsadas de las cachés en memoria por tamaño",
+    ("cache",)
+)
+
+
+class TTLCache:
+    """
+    Caché LRU en memoria con expiración por TTL, segura para hilos.
+
+    Se usa para datos de solo lectura que se pueden compartir dentro del proceso
+    (por ejemplo, árboles de categorías). En Lambda el contenido sobrevive mientras
+    el contenedor permanezca caliente.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, name="cache"):
+        """
+        Args:
+            maxsize (int): Número máximo de entradas antes de expulsar las menos usadas
+            ttl (int): Tiempo de vida por defecto de cada entrada, en segundos
+            name (str): Nombre de la caché (para logs y métricas)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """Devuelve el valor de la llave o default si no existe o ya expiró."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                cache_requests.inc(cache=self.name, result="miss")
+                return default
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                cache_requests.inc(cache=self.name, result="miss")
+                return default
+
+            self._data.move_to_end(key)
+        cache_requests.inc(cache=self.name, result="hit")
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Guarda un valor con el TTL indicado (o el TTL por defecto)."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                cache_evictions.inc(cache=self.name)
+
+    def delete(self, key):
+        """Elimina una llave si existe."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Elimina todas las entradas."""
+        with self._lock:
+            self._data.clear()
+
+    def get_or_set(self, key, loader, ttl=None):
+        """
+        Devuelve el valor en caché o lo calcula con loader() y lo guarda.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
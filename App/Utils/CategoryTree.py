@@ -0,0 +1,308 @@
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+
+class CategoryTree:
+    """
+    Árbol de categorías compacto basado en arreglos paralelos.
+
+    Cada categoría se identifica por su índice de inserción. En lugar de guardar
+    una copia de la ruta de padres en cada nodo, se guarda solo el índice del padre
+    (parent pointer) y los enlaces primer hijo / siguiente hermano, por lo que la
+    memoria es O(nodos). La ruta y el breadcrumb se calculan bajo demanda.
+    """
+
+    __slots__ = ("ids", "names", "parents", "depths", "first_child", "next_sibling",
+                 "_last_child", "_last_root", "first_root", "root_path", "_index")
+
+    def __init__(self, root_path=None):
+        """
+        Args:
+            root_path (list, opcional): Ancestros de las categorías de primer nivel
+                con formato [{"id": "ID", "name": "NOMBRE"}, ...]
+        """
+        self.ids = []
+        self.names = []
+        self.parents = array("i")
+        self.depths = array("b")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self._last_child = array("i")
+        self._last_root = -1
+        self.first_root = -1
+        self.root_path = root_path or []
+        self._index = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, category_id, name, parent_index=-1):
+        """
+        Agrega una categoría al árbol y devuelve su índice.
+
+        Args:
+            category_id (str): ID de la categoría
+            name (str): Nombre de la categoría
+            parent_index (int): Índice del padre o -1 para categorías de primer nivel
+        """
+        index = len(self.ids)
+        self.ids.append(sys.intern(category_id) if isinstance(category_id, str) else category_id)
+        self.names.append(sys.intern(name) if isinstance(name, str) else name)
+        self.parents.append(parent_index)
+        self.depths.append(self.depths[parent_index] + 1 if parent_index >= 0 else 0)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self._last_child.append(-1)
+
+        if parent_index < 0:
+            if self._last_root < 0:
+                self.first_root = index
+            else:
+                self.next_sibling[self._last_root] = index
+            self._last_root = index
+        else:
+            last = self._last_child[parent_index]
+            if last < 0:
+                self.first_child[parent_index] = index
+            else:
+                self.next_sibling[last] = index
+            self._last_child[parent_index] = index
+
+        return index
+
+    def to_state(self):
+        """Estado serializable a JSON (para cachés compartidas); se reconstruye con from_state."""
+        return {"root_path": self.root_path, "ids": self.ids, "names": self.names, "parents": self.parents.tolist()}
+
+    @classmethod
+    def from_state(cls, state):
+        """Reconstruye un árbol desde to_state (los padres siempre preceden a sus hijos)."""
+        tree = cls(state["root_path"])
+        for category_id, name, parent_index in zip(state["ids"], state["names"], state["parents"]):
+            tree.add(category_id, name, parent_index)
+        return tree
+
+    def children(self, index=-1):
+        """Itera los índices de los hijos de un nodo (o de las raíces si index es -1)."""
+        child = self.first_root if index < 0 else self.first_child[index]
+        while child >= 0:
+            yield child
+            child = self.next_sibling[child]
+
+    def ancestors(self, index):
+        """Devuelve los índices de los ancestros de un nodo, desde la raíz hasta el padre."""
+        result = []
+        parent = self.parents[index]
+        while parent >= 0:
+            result.append(parent)
+            parent = self.parents[parent]
+        result.reverse()
+        return result
+
+    def path(self, index):
+        """Ruta de padres de un nodo con formato [{"id": "ID", "name": "NOMBRE"}, ...]."""
+        return self.root_path + [{"id": self.ids[i], "name": self.names[i]} for i in self.ancestors(index)]
+
+    def breadcrumb(self, index):
+        """Ruta de padres de un nodo como texto (ej: 'Ropa > Calzado')."""
+        return " > ".join(parent["name"] for parent in self.path(index))
+
+    def record(self, index):
+        """Registro plano de una categoría (mismo formato que el modo NDJSON)."""
+        parent = self.parents[index]
+        if parent >= 0:
+            parent_id = self.ids[parent]
+        else:
+            parent_id = self.root_path[-1]["id"] if self.root_path else None
+
+        return {
+            "id": self.ids[index],
+            "name": self.names[index],
+            "parent_id": parent_id,
+            "depth": self.depths[index],
+            "path": self.path(index)
+        }
+
+    def index(self):
+        """Devuelve el índice de búsqueda del árbol, construyéndolo la primera vez."""
+        if self._index is None:
+            self._index = CategoryIndex(self)
+        return self._index
+
+    def to_nested(self, include_parents=True):
+        """
+        Construye la representación anidada del árbol.
+
+        Args:
+            include_parents (bool): Si es True, cada nodo incluye "path" y "breadcrumb"
+
+        Returns:
+            list: Lista de categorías con sus hijos anidados
+        """
+        return self._render_level(-1, self.root_path, include_parents)
+
+    def _render_level(self, parent_index, parent_path, include_parents):
+        level = []
+        breadcrumb = " > ".join(parent["name"] for parent in parent_path) if include_parents else None
+
+        for index in self.children(parent_index):
+            node = {
+                "id": self.ids[index],
+                "name": self.names[index]
+            }
+            if include_parents:
+                node["path"] = parent_path
+                node["breadcrumb"] = breadcrumb
+
+            child_path = parent_path
+            if include_parents and self.first_child[index] >= 0:
+                child_path = parent_path + [{"id": node["id"], "name": node["name"]}]
+            node["children"] = self._render_level(index, child_path, include_parents)
+
+            level.append(node)
+
+        return level
+
+
+def normalize_text(text):
+    """Normaliza un texto para búsqueda: minúsculas y sin acentos."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class CategoryIndex:
+    """
+    Índice en memoria sobre un CategoryTree.
+
+    - Mapa id -> índice del nodo.
+    - Numeración de recorrido en profundidad (tin/tout) para responder en O(1)
+      si un nodo es ancestro de otro; el subárbol de un nodo es el rango contiguo
+      [tin, tout] del orden de recorrido.
+    - Índice de prefijos ordenado (nombre completo y cada palabra del nombre)
+      para autocompletado y búsqueda por nombre con búsqueda binaria.
+    """
+
+    __slots__ = ("tree", "by_id", "order", "tin", "tout", "_name_keys", "_name_nodes",
+                 "_word_keys", "_word_nodes", "_words")
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.by_id = {category_id: index for index, category_id in enumerate(tree.ids)}
+        self._build_euler()
+        self._build_prefix_index()
+
+    def _build_euler(self):
+        size = len(self.tree)
+        self.order = array("i")
+        self.tin = array("i", [0]) * size
+        self.tout = array("i", [0]) * size
+
+        # Recorrido iterativo en pre-orden; tout es la última posición del subárbol
+        stack = [(index, False) for index in reversed(list(self.tree.children(-1)))]
+        while stack:
+            index, closing = stack.pop()
+            if closing:
+                self.tout[index] = len(self.order) - 1
+                continue
+
+            self.tin[index] = len(self.order)
+            self.order.append(index)
+            stack.append((index, True))
+            for child in reversed(list(self.tree.children(index))):
+                stack.append((child, False))
+
+    def _build_prefix_index(self):
+        names = []
+        words = []
+        self._words = []
+        for index, name in enumerate(self.tree.names):
+            normalized = normalize_text(name)
+            names.append((normalized, index))
+            node_words = tuple(sorted(set(normalized.split())))
+            self._words.append(node_words)
+            for word in node_words:
+                words.append((word, index))
+
+        names.sort()
+        words.sort()
+        self._name_keys = [key for key, _ in names]
+        self._name_nodes = array("i", [index for _, index in names])
+        self._word_keys = [key for key, _ in words]
+        self._word_nodes = array("i", [index for _, index in words])
+
+    @staticmethod
+    def _scan_prefix(keys, nodes, prefix):
+        """Itera los nodos cuyas llaves empiezan con el prefijo."""
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix):
+            yield nodes[position]
+            position += 1
+
+    def get(self, category_id):
+        """Devuelve el índice del nodo para un ID de categoría o None."""
+        return self.by_id.get(category_id)
+
+    def is_ancestor(self, ancestor, descendant):
+        """Indica si el nodo ancestor es ancestro (o el mismo nodo) de descendant."""
+        return self.tin[ancestor] <= self.tin[descendant] and self.tout[descendant] <= self.tout[ancestor]
+
+    def descendants(self, index, max_results=None):
+        """Índices de los descendientes de un nodo (sin incluirlo) en orden de recorrido."""
+        start = self.tin[index] + 1
+        end = self.tout[index] + 1
+        if max_results is not None:
+            end = min(end, start + max_results)
+        return self.order[start:end]
+
+    def descendant_count(self, index):
+        """Número de descendientes de un nodo."""
+        return self.tout[index] - self.tin[index]
+
+    def autocomplete(self, prefix, limit=10):
+        """
+        Categorías cuyo nombre (o alguna de sus palabras) empieza con el prefijo.
+        Las coincidencias por nombre completo se devuelven primero.
+        """
+        prefix = normalize_text(prefix).strip()
+        if not prefix:
+            return []
+
+        results = []
+        seen = set()
+        for source in (self._scan_prefix(self._name_keys, self._name_nodes, prefix),
+                       self._scan_prefix(self._word_keys, self._word_nodes, prefix)):
+            for index in source:
+                if index not in seen:
+                    seen.add(index)
+                    results.append(index)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def search(self, query, limit=20):
+        """
+        Categorías cuyo nombre contiene todas las palabras de la consulta
+        (cada palabra se compara como prefijo de alguna palabra del nombre).
+        """
+        terms = sorted(set(normalize_text(query).split()), key=len, reverse=True)
+        if not terms:
+            return []
+
+        # El término más largo suele ser el más selectivo
+        candidates = self._scan_prefix(self._word_keys, self._word_nodes, terms[0])
+        results = []
+        seen = set()
+        for index in candidates:
+            if index in seen:
+                continue
+            seen.add(index)
+            node_words = self._words[index]
+            if all(any(word.startswith(term) for word in node_words) for term in terms[1:]):
+                results.append(index)
+
+        results.sort(key=lambda index: (self.tree.depths[index], self.tree.names[index]))
+        return results[:limit]
@@ -0,0 +1,231 @@
+import re
+
+from App.Utils.CategoryTree import normalize_text
+
+# Tipos de valor numéricos de Mercado Libre
+NUMERIC_VALUE_TYPES = ("number", "number_unit")
+
+# Número (con punto o coma decimal) seguido opcionalmente de una unidad, con o sin espacio
+NUMBER_WITH_UNIT = re.compile(r"^\s*([-+]?(?:\d+(?:[.,]\d*)?|[.,]\d+))\s*(\S*?)\s*$")
+
+
+def _has_tag(attribute, tag):
+    tags = attribute.get("tags") or {}
+    return tag in tags
+
+
+def _has_value(attribute_value):
+    """Indica si un atributo del producto tiene value_id, value_name o values con contenido."""
+    return bool(attribute_value.get("value_id") or attribute_value.get("value_name")
+                or attribute_value.get("values"))
+
+
+class CategoryValidator:
+    """
+    Validador local de atributos y variantes de un producto para una categoría.
+
+    Se construye una sola vez a partir de los atributos de la categoría (formato de
+    MeliProducts.get_category_attributes) y se reutiliza para todos los productos de
+    esa categoría. Detecta antes de llamar a /items los errores que Mercado Libre
+    devolvería con un 400: atributos requeridos faltantes, value_id inexistentes y
+    atributos de variante que la categoría no admite.
+
+    Los atributos catalog_required solo son obligatorios en publicaciones de catálogo
+    (catalog_listing); en las demás su ausencia se reporta como advertencia.
+    """
+
+    __slots__ = ("category_id", "attributes", "required", "catalog_required", "variation_ids", "value_ids",
+                 "value_names")
+
+    def __init__(self, category_id, category_attributes):
+        self.category_id = category_id
+        self.attributes = {}
+        self.required = []
+        self.catalog_required = []
+        self.variation_ids = set()
+        self.value_ids = {}
+        self.value_names = {}
+
+        for attribute in (category_attributes.get("required_attributes", [])
+                          + category_attributes.get("optional_attributes", [])):
+            attribute_id = attribute.get("id")
+            if not attribute_id:
+                continue
+            self.attributes[attribute_id] = attribute
+
+            if _has_tag(attribute, "required"):
+                self.required.append(attribute_id)
+            elif _has_tag(attribute, "catalog_required"):
+                self.catalog_required.append(attribute_id)
+            if _has_tag(attribute, "allow_variations") or _has_tag(attribute, "variation_attribute"):
+                self.variation_ids.add(attribute_id)
+            if attribute.get("values"):
+                self.value_ids[attribute_id] = {str(value.get("id")) for value in attribute["values"]}
+                self.value_names[attribute_id] = {normalize_text(value.get("name")) for value in attribute["values"]}
+
+    def validate(self, product_data):
+        """
+        Valida los atributos y variantes de un producto.
+
+        Returns:
+            dict: {"valid": bool, "errors": [...], "warnings": [...]}; cada entrada
+                incluye field, attribute_id, code y message
+        """
+        errors = []
+        warnings = []
+        attributes = product_data.get("attributes") or []
+        variations = product_data.get("variations") or []
+
+        provided = set()
+        for position, attribute_value in enumerate(attributes):
+            field = f"attributes[{position}]"
+            attribute_id = attribute_value.get("id")
+            if not attribute_id:
+                errors.append(self._issue(field, None, "missing_id", "El atributo no tiene id"))
+                continue
+            if _has_value(attribute_value):
+                provided.add(attribute_id)
+            self._check_value(field, attribute_value, errors, warnings)
+
+        # Atributos presentes en todas las variantes (los de variante pueden ir en cada una)
+        in_all_variations = None
+        for position, variation in enumerate(variations):
+            variation_ids = self._check_variation(position, variation, errors, warnings)
+            in_all_variations = variation_ids if in_all_variations is None else in_all_variations & variation_ids
+        self._check_combinations(variations, errors)
+
+        catalog_listing = bool(product_data.get("catalog_listing"))
+        for attribute_id in self.required + self.catalog_required:
+            if attribute_id in provided or (in_all_variations and attribute_id in in_all_variations):
+                continue
+            name = self.attributes[attribute_id].get("name")
+            if attribute_id in self.required or catalog_listing:
+                errors.append(self._issue(
+                    "attributes", attribute_id, "missing_required",
+                    f"El atributo requerido {attribute_id} ({name}) no fue enviado"
+                ))
+            else:
+                warnings.append(self._issue(
+                    "attributes", attribute_id, "missing_catalog_required",
+                    f"El atributo {attribute_id} ({name}) es obligatorio para publicar en catálogo"
+                ))
+
+        return {"valid": not errors, "errors": errors, "warnings": warnings}
+
+    def _check_variation(self, position, variation, errors, warnings):
+        """Valida una variante y devuelve los IDs de atributos que define."""
+        defined = set()
+        for index, combination in enumerate(variation.get("attribute_combinations") or []):
+            field = f"variations[{position}].attribute_combinations[{index}]"
+            attribute_id = combination.get("id")
+            if not attribute_id:
+                errors.append(self._issue(field, None, "missing_id", "La combinación no tiene id de atributo"))
+                continue
+            if attribute_id not in self.variation_ids:
+                errors.append(self._issue(
+                    field, attribute_id, "variation_not_allowed",
+                    f"La categoría {self.category_id} no permite variantes por el atributo {attribute_id}"
+                ))
+                continue
+            defined.add(attribute_id)
+            self._check_value(field, combination, errors, warnings)
+
+        for index, attribute_value in enumerate(variation.get("attributes") or []):
+            field = f"variations[{position}].attributes[{index}]"
+            attribute_id = attribute_value.get("id")
+            if attribute_id and _has_value(attribute_value):
+                defined.add(attribute_id)
+            self._check_value(field, attribute_value, errors, warnings)
+
+        return defined
+
+    def _check_combinations(self, variations, errors):
+        """Todas las variantes deben usar los mismos atributos y no repetir combinaciones."""
+        expected = None
+        seen = {}
+        for position, variation in enumerate(variations):
+            combination = {}
+            for item in variation.get("attribute_combinations") or []:
+                if item.get("id"):
+                    combination[item["id"]] = str(item.get("value_id") or normalize_text(item.get("value_name")))
+
+            ids = frozenset(combination)
+            if expected is None:
+                expected = ids
+            elif ids != expected:
+                errors.append(self._issue(
+                    f"variations[{position}].attribute_combinations", None, "inconsistent_combinations",
+                    f"Todas las variantes deben combinar los mismos atributos: {sorted(expected)}"
+                ))
+
+            key = tuple(sorted(combination.items()))
+            if key in seen:
+                errors.append(self._issue(
+                    f"variations[{position}].attribute_combinations", None, "duplicated_variation",
+                    f"La combinación de atributos se repite en la variante {seen[key]}"
+                ))
+            else:
+                seen[key] = position
+
+    def _check_value(self, field, attribute_value, errors, warnings):
+        attribute_id = attribute_value.get("id")
+        attribute = self.attributes.get(attribute_id)
+        if attribute is None:
+            if attribute_id:
+                warnings.append(self._issue(
+                    field, attribute_id, "unknown_attribute",
+                    f"El atributo {attribute_id} no existe en la categoría {self.category_id}"
+                ))
+            return
+
+        if _has_tag(attribute, "read_only"):
+            warnings.append(self._issue(field, attribute_id, "read_only",
+                                        f"El atributo {attribute_id} es de solo lectura y será ignorado"))
+
+        value_id = attribute_value.get("value_id")
+        value_name = attribute_value.get("value_name")
+        allowed_ids = self.value_ids.get(attribute_id)
+
+        if value_id is not None and allowed_ids is not None and str(value_id) not in allowed_ids:
+            errors.append(self._issue(
+                f"{field}.value_id", attribute_id, "invalid_value_id",
+                f"El value_id {value_id} no es válido para el atributo {attribute_id}"
+            ))
+        elif (value_id is None and value_name and allowed_ids is not None
+              and attribute.get("value_type") == "list"
+              and normalize_text(value_name) not in self.value_names[attribute_id]):
+            warnings.append(self._issue(
+                f"{field}.value_name", attribute_id, "unlisted_value",
+                f"El valor '{value_name}' no está en la lista de valores del atributo {attribute_id}"
+            ))
+
+        if value_name is None:
+            return
+        max_length = attribute.get("value_max_length")
+        if max_length and len(str(value_name)) > max_length:
+            errors.append(self._issue(
+                f"{field}.value_name", attribute_id, "value_too_long",
+                f"El valor del atributo {attribute_id} excede {max_length} caracteres"
+            ))
+        if attribute.get("value_type") in NUMERIC_VALUE_TYPES and not self._is_numeric(value_name, attribute):
+            errors.append(self._issue(
+                f"{field}.value_name", attribute_id, "invalid_number",
+                f"El valor '{value_name}' del atributo {attribute_id} debe ser numérico"
+                + (" con una unidad permitida" if attribute.get("value_type") == "number_unit" else "")
+            ))
+
+    @staticmethod
+    def _is_numeric(value_name, attribute):
+        """Número, o número y unidad para number_unit ("10 cm" o "10cm")."""
+        match = NUMBER_WITH_UNIT.match(str(value_name))
+        if match is None:
+            return False
+        unit = match.group(2)
+        if attribute.get("value_type") != "number_unit":
+            return not unit
+        units = {unit.get("id") for unit in attribute.get("allowed_units") or []}
+        return bool(unit) and (not units or unit in units)
+
+    @staticmethod
+    def _issue(field, attribute_id, code, message):
+        return {"field": field, "attribute_id": attribute_id, "code": code, "message": message}
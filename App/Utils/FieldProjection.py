@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+
+def normalize_fields(spec):
+    """
+    Normaliza una especificación de campos a una cadena canónica.
+
+    Acepta "status,price" o ["status", "price"]; los campos anidados se
+    indican con punto (ej: "values.id"). El resultado está ordenado y sin
+    duplicados para que proyecciones equivalentes compartan la misma versión compilada.
+    """
+    if not spec:
+        return ""
+    if isinstance(spec, str):
+        spec = spec.split(",")
+    return ",".join(sorted({field.strip() for field in spec if field and field.strip()}))
+
+
+def top_level_fields(spec):
+    """Campos de primer nivel de una proyección (los que se pueden pedir a la API con attributes=)."""
+    normalized = normalize_fields(spec)
+    if not normalized:
+        return []
+    return sorted({field.split(".", 1)[0] for field in normalized.split(",")})
+
+
+def _build_tree(normalized):
+    tree = {}
+    for field in normalized.split(","):
+        node = tree
+        parts = field.split(".")
+        for part in parts[:-1]:
+            if part in node and node[part] is None:
+                # Un campo completo tiene prioridad sobre sus subcampos ("values" sobre "values.id")
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _compile_node(tree):
+    """Genera una función que proyecta un valor según el árbol de campos."""
+    keys = tuple((key, _compile_node(subtree) if subtree else None) for key, subtree in tree.items())
+
+    def project(value):
+        if isinstance(value, list):
+            return [project(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+
+        result = {}
+        for key, sub_project in keys:
+            if key in value:
+                result[key] = sub_project(value[key]) if sub_project else value[key]
+        return result
+
+    return project
+
+
+@lru_cache(maxsize=256)
+def _compile(normalized):
+    return _compile_node(_build_tree(normalized))
+
+
+def compile_projection(spec):
+    """
+    Devuelve una función que aplica la proyección a un documento (o lista de documentos).
+
+    La función compilada se guarda en caché por proyección normalizada, de modo que
+    el análisis de la especificación solo ocurre una vez por combinación de campos.
+    Si no se especifican campos, devuelve None.
+    """
+    normalized = normalize_fields(spec)
+    if not normalized:
+        return None
+    return _compile(normalized)
@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from werkzeug.datastructures import ResponseCacheControl
+from werkzeug.http import parse_cache_control_header
+
+from App.Utils.Cache import TTLCache
+from App.Utils.Metrics import metrics
+
+# Permite desactivar la caché HTTP (HTTP_CACHE_ENABLED=false) sin cambiar código
+HTTP_CACHE_ENABLED = os.environ.get("HTTP_CACHE_ENABLED", "true").lower() != "false"
+
+http_cache_results = metrics.counter(
+    "meli_api_http_cache_results",
+    "Resultado de las lecturas GET con la caché HTTP (fresh, stale, revalidated, miss, bypass)",
+    ("operation", "result")
+)
+
+# Headers de la respuesta original que se conservan en la caché
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Date")
+
+
+# Headers de Vary que no cambian el cuerpo almacenado (requests ya lo entrega descomprimido)
+_IGNORED_VARY = frozenset(("accept-encoding",))
+
+
+def _int_directive(cache_control, name):
+    value = cache_control.get(name)
+    try:
+        return max(0, int(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class HttpCacheEntry:
+    """Respuesta almacenada con sus validadores y su política de frescura."""
+
+    __slots__ = ("status_code", "content", "headers", "etag", "last_modified", "stored_at", "max_age",
+                 "stale_while_revalidate", "shared")
+
+    def __init__(self, response, max_age, stale_while_revalidate, shared):
+        self.status_code = response.status_code
+        self.content = response.content
+        self.headers = {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers}
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.stored_at = time.monotonic()
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.shared = shared
+
+    def age(self):
+        return time.monotonic() - self.stored_at
+
+    def is_fresh(self):
+        return self.age() < self.max_age
+
+    def can_serve_stale(self):
+        return self.age() < self.max_age + self.stale_while_revalidate
+
+    def validators(self):
+        """Headers para la petición condicional (If-None-Match / If-Modified-Since)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, url, cache_status):
+        """Reconstruye un requests.Response equivalente a la respuesta almacenada."""
+        response = requests.Response()
+        response.status_code = self.status_code
+        response._content = self.content
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.headers["X-Cache"] = cache_status
+        response.headers["Age"] = str(int(self.age()))
+        response.url = url
+        response.encoding = "utf-8"
+        return response
+
+
+class HttpCache:
+    """
+    Caché HTTP para las lecturas GET a la API de Mercado Libre (semántica de Cache-Control).
+
+    - Solo se guardan respuestas 200 sin no-store que traen validadores (ETag o
+      Last-Modified) o un max-age positivo. Las que varían por headers de la petición
+      (Vary, salvo Accept-Encoding) no se guardan: la llave no incluye esos headers.
+    - Mientras la entrada está fresca (max-age) se sirve sin llamar a la API.
+    - Vencida, pero dentro de stale-while-revalidate (acotado por max_stale), se sirve la
+      copia y se revalida en segundo plano.
+    - Vencida fuera de esa ventana, se hace una petición condicional con If-None-Match /
+      If-Modified-Since; un 304 renueva la entrada y devuelve el cuerpo almacenado.
+
+    Las llaves incluyen el alcance: las respuestas "public" se comparten entre vendedores
+    (ej: categorías y atributos) y el resto se guardan por user_id, de modo que un recurso
+    privado de un vendedor nunca se sirve a otro. Si existen ambas copias de un recurso,
+    se usa la del vendedor.
+
+    Cada entrada se registra bajo su ruta sin parámetros y, en las consultas multiget
+    (/items?ids=A,B), bajo la ruta de cada item (/items/A): invalidar un recurso descarta
+    también sus lecturas con parámetros (ej: /items/A?attributes=price) y los multiget
+    que lo incluyen.
+    """
+
+    def __init__(self, maxsize=None, max_stale=None, max_body_bytes=None, retention=None):
+        """
+        Args:
+            maxsize (int): Entradas máximas (default: HTTP_CACHE_MAX_ENTRIES o 2048)
+            max_stale (int): Límite en segundos para stale-while-revalidate (default: HTTP_CACHE_MAX_STALE o 60)
+            max_body_bytes (int): Tamaño máximo de un cuerpo almacenable (default: HTTP_CACHE_MAX_BODY o 1 MB)
+            retention (int): Tiempo que se conserva una entrada vencida para revalidarla
+                (default: HTTP_CACHE_RETENTION o 3600)
+        """
+        self.max_stale = int(max_stale if max_stale is not None else os.environ.get("HTTP_CACHE_MAX_STALE", 60))
+        self.max_body_bytes = int(
+            max_body_bytes if max_body_bytes is not None else os.environ.get("HTTP_CACHE_MAX_BODY", 1048576))
+        self.retention = int(retention if retention is not None else os.environ.get("HTTP_CACHE_RETENTION", 3600))
+        self.entries = TTLCache(
+            maxsize=int(maxsize if maxsize is not None else os.environ.get("HTTP_CACHE_MAX_ENTRIES", 2048)),
+            ttl=self.retention,
+            name="http"
+        )
+        # Ruta sin parámetros -> llaves de las entradas que dependen de ella
+        self.dependents = TTLCache(maxsize=self.entries.maxsize, ttl=self.retention, name="http_dependents")
+        self._revalidating = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def resource_key(url, params=None):
+        """URL con los parámetros en orden canónico."""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted((key, str(value)) for key, value in params.items()))}"
+
+    @staticmethod
+    def dependency_paths(resource):
+        """Rutas cuya escritura invalida una lectura: la suya sin parámetros y la de cada item de un multiget."""
+        path, _, query = resource.partition("?")
+        paths = [path]
+        for name, value in parse_qsl(query):
+            if name == "ids":
+                paths.extend(f"{path}/{item_id.strip()}" for item_id in value.split(",") if item_id.strip())
+        return paths
+
+    def lookup(self, resource, scope):
+        """
+        Busca primero la copia del vendedor y después la compartida.
+
+        Returns:
+            HttpCacheEntry o None
+        """
+        entry = self.entries.get((scope, resource))
+        if entry is None:
+            entry = self.entries.get(("public", resource))
+        return entry
+
+    def store(self, resource, scope, response):
+        """
+        Guarda la respuesta si es almacenable según Cache-Control.
+
+        Returns:
+            HttpCacheEntry guardada o None
+        """
+        if response.status_code != 200 or len(response.content) > self.max_body_bytes:
+            return None
+        cache_control = parse_cache_control_header(response.headers.get("Cache-Control"), cls=ResponseCacheControl)
+        if "no-store" in cache_control:
+            return None
+        vary = {name.strip().lower() for name in response.headers.get("Vary", "").split(",") if name.strip()}
+        if vary - _IGNORED_VARY:
+            return None
+
+        max_age = 0 if "no-cache" in cache_control else (_int_directive(cache_control, "max-age") or 0)
+        has_validators = "ETag" in response.headers or "Last-Modified" in response.headers
+        if not max_age and not has_validators:
+            return None
+
+        stale = min(_int_directive(cache_control, "stale-while-revalidate") or 0, self.max_stale)
+        shared = "public" in cache_control and "private" not in cache_control
+        entry = HttpCacheEntry(response, max_age, stale, shared)
+        key = ("public" if shared else scope, resource)
+        ttl = max(self.retention, max_age + stale)
+        self.entries.set(key, entry, ttl=ttl)
+        with self._lock:
+            for path in self.dependency_paths(resource):
+                keys = self.dependents.get(path)
+                if keys is None:
+                    keys = set()
+                self.dependents.set(path, keys | {key}, ttl=ttl)
+        return entry
+
+    def revalidated(self, resource, scope, entry, response):
+        """
+        Renueva una entrada tras un 304, tomando los headers nuevos de frescura y validadores.
+
+        Returns:
+            HttpCacheEntry renovada
+        """
+        merged = requests.Response()
+        merged.status_code = entry.status_code
+        merged._content = entry.content
+        merged.headers = CaseInsensitiveDict(entry.headers)
+        for name in _STORED_HEADERS:
+            if name in response.headers:
+                merged.headers[name] = response.headers[name]
+        return self.store(resource, scope, merged) or entry
+
+    def invalidate(self, resource, scope):
+        """
+        Elimina las copias (compartida y del vendedor) de un recurso y las lecturas que
+        dependen de él (con parámetros o multiget que lo incluyen).
+        """
+        self.entries.delete(("public", resource))
+        self.entries.delete((scope, resource))
+        with self._lock:
+            keys = self.dependents.get(resource)
+            self.dependents.delete(resource)
+        for key in keys or ():
+            self.entries.delete(key)
+
+    def start_revalidation(self, key):
+        """Marca una revalidación en curso; devuelve False si ya había una para la llave."""
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def finish_revalidation(self, key):
+        with self._lock:
+            self._revalidating.discard(key)
@@ -0,0 +1,112 @@
+# Campos de la actualización que se comparan con el item publicado; el resto (ej: description,
+# que no forma parte del documento de /items) se envía siempre
+COMPARABLE_FIELDS = ("price", "available_quantity", "title", "pictures", "attributes", "variations")
+
+
+def _text(value):
+    """Texto sin espacios repetidos ni en los extremos (mayúsculas y acentos sí cuentan)."""
+    return " ".join(str(value).split()) if value is not None else None
+
+
+def _same_value(requested, current):
+    """Compara valores simples; los números se comparan como float (1299 == 1299.0) y un booleano no es un número."""
+    if isinstance(requested, bool) or isinstance(current, bool):
+        return type(requested) is type(current) and requested == current
+    if isinstance(requested, (int, float)) and isinstance(current, (int, float)):
+        return float(requested) == float(current)
+    return requested == current
+
+
+def _same_attribute(requested, current):
+    """Un atributo no cambia si coincide su value_id o, sin value_id, su value_name."""
+    if current is None:
+        return False
+    if requested.get("value_id") is not None:
+        return str(requested["value_id"]) == str(current.get("value_id"))
+    if "value_name" in requested:
+        return _text(requested["value_name"]) == _text(current.get("value_name"))
+    return False
+
+
+def _picture_ids(pictures):
+    return [picture.get("id") for picture in pictures or []]
+
+
+def _same_combinations(requested, current):
+    current_by_id = {attribute.get("id"): attribute for attribute in current or []}
+    return len(requested or []) == len(current or []) and all(
+        _same_attribute(attribute, current_by_id.get(attribute.get("id"))) for attribute in requested or [])
+
+
+def _same_variations(requested, current):
+    """
+    Las variantes no cambian si son las mismas (por id) y cada campo enviado coincide con el
+    publicado. Mercado Libre elimina las variantes que no se envían, por eso cualquier
+    diferencia obliga a enviar la lista completa tal como llegó.
+    """
+    current_by_id = {variation.get("id"): variation for variation in current or []}
+    if any(variation.get("id") is None for variation in requested) or \
+            {variation["id"] for variation in requested} != set(current_by_id):
+        return False
+    for variation in requested:
+        published = current_by_id[variation["id"]]
+        for field, value in variation.items():
+            if field == "id":
+                continue
+            if field == "attribute_combinations":
+                if not _same_combinations(value, published.get(field)):
+                    return False
+            elif field == "attributes":
+                published_by_id = {attribute.get("id"): attribute for attribute in published.get(field) or []}
+                if not all(_same_attribute(attribute, published_by_id.get(attribute.get("id"))) for attribute in value):
+                    return False
+            elif field not in published or not _same_value(value, published[field]):
+                return False
+    return True
+
+
+def diff_update(update_data, item):
+    """
+    Compara una actualización con el documento publicado del item.
+
+    Args:
+        update_data (dict): Campos a actualizar (formato de PUT /items/{item_id})
+        item (dict): Documento actual del item
+
+    Returns:
+        tuple: (campos que cambian, lista de campos sin cambios). Los atributos generales
+            que cambian se envían solos (Mercado Libre actualiza solo los atributos enviados).
+    """
+    changes = {}
+    unchanged = []
+    for field, value in update_data.items():
+        if field not in COMPARABLE_FIELDS or field not in item:
+            changes[field] = value
+        elif field == "pictures":
+            if _picture_ids(value) == _picture_ids(item[field]):
+                unchanged.append(field)
+            else:
+                changes[field] = value
+        elif field == "attributes":
+            current_by_id = {attribute.get("id"): attribute for attribute in item[field] or []}
+            changed = [attribute for attribute in value
+                       if not _same_attribute(attribute, current_by_id.get(attribute.get("id")))]
+            if changed:
+                changes[field] = changed
+            else:
+                unchanged.append(field)
+        elif field == "variations":
+            if _same_variations(value, item[field]):
+                unchanged.append(field)
+            else:
+                changes[field] = value
+        elif field == "title":
+            if _text(value) == _text(item[field]):
+                unchanged.append(field)
+            else:
+                changes[field] = value
+        elif _same_value(value, item[field]):
+            unchanged.append(field)
+        else:
+            changes[field] = value
+    return changes, unchanged
@@ -0,0 +1,85 @@
+import os
+import time
+
+from App.Utils.Cache import TTLCache
+from App.Utils.Metrics import metrics
+from App.Utils.TieredCache import TieredCache
+
+item_mirror_reads = metrics.counter(
+    "meli_api_item_mirror_reads",
+    "Lecturas de items del espejo local por resultado (hit, stale, miss)",
+    ("result",)
+)
+item_mirror_writes = metrics.counter(
+    "meli_api_item_mirror_writes",
+    "Escrituras en el espejo de items por origen y resultado (stored, outdated)",
+    ("source", "result")
+)
+
+
+class ItemMirror:
+    """
+    Espejo local de los items de cada vendedor: último documento conocido de cada item
+    (llave shop_id + item_id), con el momento en que se leyó y su versión (last_updated).
+
+    Se llena con las respuestas de publicar, actualizar y verificar items y con las lecturas
+    que disparan las notificaciones. Un documento con last_updated anterior al guardado no
+    lo reemplaza (ej: una respuesta lenta que llega después de una notificación).
+
+    Los documentos viven en una TieredCache, compartida entre contenedores si hay almacén
+    compartido, durante ITEM_MIRROR_TTL segundos (la edad máxima que se puede pedir).
+    """
+
+    def __init__(self, cache: TieredCache = None):
+        self.ttl = int(os.environ.get("ITEM_MIRROR_TTL", 3600))
+        self.cache = (cache if cache is not None
+                      else TieredCache(TTLCache(maxsize=4096, ttl=self.ttl, name="item_mirror")))
+
+    @staticmethod
+    def _key(shop_id, item_id):
+        return ("item", str(shop_id), item_id)
+
+    def get(self, shop_id, item_id, max_age):
+        """
+        Devuelve el documento del item si se leyó hace max_age segundos o menos.
+
+        Returns:
+            tuple: (documento, edad en segundos) o None
+        """
+        entry = self.cache.get(self._key(shop_id, item_id))
+        if entry is None:
+            item_mirror_reads.inc(result="miss")
+            return None
+        age = max(0.0, time.time() - entry["fetched_at"])
+        if age > max_age:
+            item_mirror_reads.inc(result="stale")
+            return None
+        item_mirror_reads.inc(result="hit")
+        return entry["item"], age
+
+    def put(self, shop_id, item, source, fetched_at=None):
+        """
+        Guarda el documento completo de un item.
+
+        Args:
+            shop_id: Vendedor dueño del item
+            item (dict): Documento del item (con id)
+            source (str): Origen del documento (create, update, verify, notification...)
+            fetched_at (float): Momento de la lectura (default: ahora)
+
+        Returns:
+            bool: False si el espejo ya tenía una versión más reciente
+        """
+        key = self._key(shop_id, item["id"])
+        version = item.get("last_updated")
+        current = self.cache.get(key)
+        if current is not None and version and current.get("version") and version < current["version"]:
+            item_mirror_writes.inc(source=source, result="outdated")
+            return False
+        self.cache.set(key, {"item": item, "version": version,
+                             "fetched_at": fetched_at if fetched_at is not None else time.time()}, ttl=self.ttl)
+        item_mirror_writes.inc(source=source, result="stored")
+        return True
+
+    def delete(self, shop_id, item_id):
+        self.cache.delete(self._key(shop_id, item_id))
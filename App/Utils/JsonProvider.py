@@ -0,0 +1,92 @@
+import json
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+from App.Utils.Timing import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def _resolve_backend():
+    """
+    Determina el codificador JSON a utilizar.
+    Se puede forzar con la variable de entorno JSON_ENCODER (orjson | json).
+    """
+    backend = os.environ.get("JSON_ENCODER", "auto").lower()
+    if backend == "json" or orjson is None:
+        return "json"
+    return "orjson"
+
+
+JSON_BACKEND = _resolve_backend()
+
+
+def _default(obj):
+    """Serializa los tipos no nativos igual que el proveedor por defecto de Flask."""
+    return DefaultJSONProvider.default(obj)
+
+
+def dumps_bytes(obj, sort_keys=False, indent=False):
+    """
+    Serializa un objeto a JSON (bytes UTF-8) usando el codificador más rápido disponible.
+
+    Si orjson no puede serializar el objeto (ej: enteros mayores a 64 bits),
+    se utiliza json de la librería estándar como respaldo.
+    """
+    if JSON_BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except (orjson.JSONEncodeError, TypeError):
+            pass
+
+    return json.dumps(
+        obj,
+        default=_default,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":")
+    ).encode("utf-8")
+
+
+def dumps(obj, sort_keys=False):
+    """Serializa un objeto a JSON (str)."""
+    return dumps_bytes(obj, sort_keys=sort_keys).decode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON para Flask que usa orjson cuando está disponible.
+
+    Mantiene el comportamiento del proveedor por defecto (orden de llaves,
+    serialización de fechas, decimales y UUIDs) pero evita la conversión
+    intermedia a str al construir las respuestas.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(
+            obj,
+            sort_keys=kwargs.get("sort_keys", self.sort_keys),
+            indent=bool(kwargs.get("indent"))
+        ).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if JSON_BACKEND == "orjson" and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        with span("serialization"):
+            body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
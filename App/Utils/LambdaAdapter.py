@@ -0,0 +1,88 @@
+import base64
+from io import BytesIO
+
+from aws_lambda_wsgi import environ as build_environ
+
+# Tipos de contenido que se pueden devolver como texto a API Gateway
+TEXT_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript"
+)
+
+
+class _StartResponse:
+    def __init__(self):
+        self.status = 500
+        self.headers = []
+        self.chunks = []
+
+    def __call__(self, status, headers, exc_info=None):
+        self.status = status.split()[0]
+        self.headers[:] = headers
+        return self.chunks.append
+
+
+def _is_text_response(headers):
+    """Indica si la respuesta puede enviarse como texto plano (sin base64)."""
+    if headers.get("Content-Encoding"):
+        return False
+    content_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+    return content_type.startswith("text/") or content_type in TEXT_MIMETYPES or content_type == ""
+
+
+def response(app, event, context):
+    """
+    Ejecuta la aplicación WSGI para un evento de API Gateway.
+
+    Reemplaza a aws_lambda_wsgi.response para manejar correctamente cuerpos binarios:
+    las peticiones con isBase64Encoded se decodifican antes de llegar a Flask y las
+    respuestas comprimidas o binarias se devuelven en base64.
+
+    API Gateway (integración proxy) no admite respuestas en streaming: el cuerpo completo
+    se acumula en memoria antes de devolverlo, incluso para respuestas NDJSON
+    (format=ndjson en el árbol de categorías), que en Lambda no reducen el tiempo al
+    primer byte ni la memoria usada.
+    """
+    wsgi_environ = build_environ(event, context)
+    wsgi_environ.setdefault("wsgi.url_scheme", "https")
+    wsgi_environ.setdefault("SERVER_NAME", "localhost")
+    wsgi_environ.setdefault("SERVER_PORT", "443")
+
+    if event.get("isBase64Encoded") and event.get("body"):
+        body = base64.b64decode(event["body"])
+        wsgi_environ["wsgi.input"] = BytesIO(body)
+        wsgi_environ["CONTENT_LENGTH"] = str(len(body))
+
+    start_response = _StartResponse()
+    output = app(wsgi_environ, start_response)
+    try:
+        body = b"".join(start_response.chunks) + b"".join(output)
+    finally:
+        if hasattr(output, "close"):
+            output.close()
+
+    # headers conserva el último valor de cada nombre; multiValueHeaders conserva los
+    # headers repetidos (ej: Set-Cookie) y API Gateway le da prioridad
+    headers = dict(start_response.headers)
+    multi_value_headers = {}
+    for name, value in start_response.headers:
+        multi_value_headers.setdefault(name, []).append(value)
+
+    if _is_text_response(headers):
+        return {
+            "statusCode": int(start_response.status),
+            "headers": headers,
+            "multiValueHeaders": multi_value_headers,
+            "body": body.decode("utf-8"),
+            "isBase64Encoded": False
+        }
+
+    return {
+        "statusCode": int(start_response.status),
+        "headers": headers,
+        "multiValueHeaders": multi_value_headers,
+        "body": base64.b64encode(body).decode("ascii"),
+        "isBase64Encoded": True
+    }
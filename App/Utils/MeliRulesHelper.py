@@ -1,10 +1,14 @@
 from datetime import datetime
+import copy
+import hashlib
 import inspect
+import threading
 from marshmallow import Schema, fields, validate, validates_schema, ValidationError
 from App.Models.Schemas.MeliSchemas import (
     CategoryRequestSchema, CategoryAttributesRequestSchema, ImageUploadRequestSchema,
     ProductDataSchema, ProductCreateRequestSchema, ProductVerifyRequestSchema, ProductUpdateRequestSchema
 )
+from App.Utils.JsonProvider import dumps_bytes
 from App.Utils.Logger import app_logger
 
 
@@ -14,6 +18,110 @@ class MeliRulesHelper:
     de los esquemas Marshmallow para la API de Mercado Libre.
     """
 
+    # Reglas normalizadas y su ETag, calculadas una sola vez por proceso
+    _cached_rules = None
+    _cache_lock = threading.Lock()
+
+    @classmethod
+    def get_cached_rules(cls):
+        """
+        Devuelve las reglas normalizadas y su ETag, calculándolas solo la primera vez.
+
+        Los esquemas no cambian mientras el proceso está vivo, por lo que la introspección
+        se hace una sola vez. El ETag es un hash del contenido de las reglas (sin el timestamp),
+        así que es estable entre contenedores mientras no cambien los esquemas.
+
+        Returns:
+            tuple: (reglas normalizadas, etag)
+        """
+        if cls._cached_rules is None:
+            with cls._cache_lock:
+                if cls._cached_rules is None:
+                    rules = cls().get_normalized_rules()
+                    cls._cached_rules = (rules, cls.content_etag(rules["rules"]))
+                    app_logger.info(f"Reglas de producto calculadas y memorizadas con ETag {cls._cached_rules[1]}")
+        return cls._cached_rules
+
+    @staticmethod
+    def content_etag(content):
+        """ETag débil calculado a partir del JSON canónico del contenido."""
+        digest = hashlib.sha256(dumps_bytes(content, sort_keys=True)).hexdigest()
+        return f'W/"{digest[:32]}"'
+
+    @staticmethod
+    def _attribute_rule(attribute):
+        """Normaliza un atributo de categoría de Mercado Libre al formato de reglas."""
+        tags = attribute.get("tags") or {}
+        allows_variations = "allow_variations" in tags
+        variation_attribute = "variation_attribute" in tags
+
+        rule = {
+            "id": attribute.get("id"),
+            "name": attribute.get("name"),
+            "type": attribute.get("value_type", "string"),
+            # Misma definición que get_category_attributes (required_attributes / required_ids);
+            # catalog_required solo es obligatorio en publicaciones de catálogo
+            "required": "required" in tags,
+            "catalog_required": "catalog_required" in tags,
+            "multivalued": "multivalued" in tags,
+            "allows_variations": allows_variations,
+            "variation_attribute": variation_attribute,
+            "is_show": "hidden" not in tags and "read_only" not in tags
+        }
+        if attribute.get("values"):
+            rule["values"] = [{"id": value.get("id"), "name": value.get("name")} for value in attribute["values"]]
+        if attribute.get("allowed_units"):
+            rule["allowed_units"] = [unit.get("id") for unit in attribute["allowed_units"]]
+        if attribute.get("value_max_length"):
+            rule["max_length"] = attribute["value_max_length"]
+        return rule
+
+    @classmethod
+    def build_category_rules(cls, category_id, category_attributes):
+        """
+        Combina las reglas generales de ProductDataSchema con los atributos de una categoría.
+
+        Args:
+            category_id (str): ID de la categoría
+            category_attributes (dict): Atributos separados en "required_attributes" y
+                "optional_attributes" (formato de MeliProducts.get_category_attributes)
+
+        Returns:
+            tuple: (reglas combinadas, etag)
+        """
+        base_rules, _ = cls.get_cached_rules()
+        rules = copy.deepcopy(base_rules["rules"])
+
+        required = [cls._attribute_rule(attr) for attr in category_attributes.get("required_attributes", [])]
+        optional = [cls._attribute_rule(attr) for attr in category_attributes.get("optional_attributes", [])]
+        variation = [rule for rule in required + optional if rule["allows_variations"] or rule["variation_attribute"]]
+
+        if "attributes" in rules:
+            rules["attributes"].pop("note", None)
+            rules["attributes"]["required_ids"] = [rule["id"] for rule in required]
+            rules["attributes"]["catalog_required_ids"] = [rule["id"] for rule in required + optional
+                                                           if rule["catalog_required"]]
+        if "variations" in rules:
+            rules["variations"].pop("note", None)
+            rules["variations"]["allowed_attributes"] = [rule["id"] for rule in variation]
+
+        content = {
+            "rules": rules,
+            "category": {
+                "category_id": category_id,
+                "required_attributes": required,
+                "optional_attributes": optional,
+                "variation_attributes": variation
+            }
+        }
+        etag = cls.content_etag(content)
+
+        return {
+            **content,
+            "timestamp": datetime.now().isoformat(),
+            "message": f"Especificación de datos para validación en Mercado Libre (categoría {category_id})"
+        }, etag
+
     def __init__(self):
         # Mapeo de tipos de Marshmallow a tipos en el formato requerido
         self.type_mapping = {
@@ -0,0 +1,244 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+# Permite desactivar las métricas (METRICS_ENABLED=false) sin cambiar código
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() != "false"
+
+# Límites superiores (segundos) de las cubetas de los histogramas de latencia
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# CloudWatch acepta como máximo 100 valores por métrica en un documento EMF
+EMF_MAX_VALUES = 100
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monótono con etiquetas. Las series se crean en el primer incremento."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=(), enabled=True):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.enabled = enabled
+        self._values = {}
+        self._flushed = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def render(self):
+        lines = [f"# TYPE {self.name} counter", f"# HELP {self.name} {self.documentation}"]
+        with self._lock:
+            series = sorted(self._values.items())
+        for key, value in series:
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+    def emf_deltas(self):
+        """Incrementos desde el último envío: [(etiquetas, valor)]."""
+        with self._lock:
+            deltas = [(key, value - self._flushed.get(key, 0)) for key, value in self._values.items()]
+            self._flushed = dict(self._values)
+        return [(key, delta) for key, delta in deltas if delta]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._flushed.clear()
+
+
+class Histogram:
+    """
+    Histograma acumulado con cubetas fijas y etiquetas.
+
+    Para el formato EMF se conservan además los valores observados desde el último envío
+    (hasta EMF_MAX_VALUES por serie), solo cuando el registro lo solicita.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, enabled=True, keep_values=False):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self.keep_values = keep_values
+        self._series = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not self.enabled:
+            return
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += 1
+            series[2] += value
+            if self.keep_values:
+                pending = self._pending.setdefault(key, [])
+                if len(pending) < EMF_MAX_VALUES:
+                    pending.append(value)
+
+    def count(self, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        return series[1] if series else 0
+
+    def render(self):
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.documentation}"]
+        with self._lock:
+            series = sorted((key, (list(counts), count, total)) for key, (counts, count, total) in self._series.items())
+        for key, (counts, count, total) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                le = f'le="{bound if bound == "+Inf" else repr(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {count}")
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+        return lines
+
+    def emf_deltas(self):
+        """Valores observados desde el último envío: [(etiquetas, [valores])]."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return [(key, values) for key, values in pending.items() if values]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._pending.clear()
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas del proceso (contadores e histogramas con etiquetas).
+
+    Se exporta de dos formas:
+    - render_openmetrics(): texto OpenMetrics para el endpoint de scrape en modo servidor.
+    - flush_emf(): líneas CloudWatch Embedded Metric Format con los incrementos desde el
+      envío anterior, para Lambda (CloudWatch las convierte en métricas desde los logs).
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED, emf=None):
+        self.enabled = enabled
+        # En Lambda los histogramas guardan los valores crudos para el formato EMF
+        self.emf = bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME")) if emf is None else emf
+        self.namespace = os.environ.get("METRICS_NAMESPACE", "MeliApi")
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        """Devuelve el contador con ese nombre, creándolo la primera vez."""
+        return self._register(name, lambda: Counter(name, documentation, labelnames, self.enabled))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Devuelve el histograma con ese nombre, creándolo la primera vez."""
+        return self._register(
+            name, lambda: Histogram(name, documentation, labelnames, buckets, self.enabled, self.emf))
+
+    def _register(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def render_openmetrics(self):
+        """Texto en formato OpenMetrics con todas las métricas registradas."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def emf_documents(self, timestamp_ms=None):
+        """
+        Documentos EMF con los incrementos de los contadores y los valores de los histogramas
+        desde la llamada anterior. Cada combinación de etiquetas es un documento.
+        """
+        timestamp_ms = timestamp_ms or int(time.time() * 1000)
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        documents = {}
+        for metric in metrics:
+            unit = "Seconds" if metric.kind == "histogram" and metric.name.endswith("_seconds") else "Count"
+            for key, value in metric.emf_deltas():
+                dimensions = tuple(zip(metric.labelnames, key))
+                document = documents.get(dimensions)
+                if document is None:
+                    document = documents[dimensions] = {
+                        "_aws": {
+                            "Timestamp": timestamp_ms,
+                            "CloudWatchMetrics": [{
+                                "Namespace": self.namespace,
+                                "Dimensions": [[name for name, _ in dimensions]],
+                                "Metrics": []
+                            }]
+                        },
+                        **dict(dimensions)
+                    }
+                document["_aws"]["CloudWatchMetrics"][0]["Metrics"].append({"Name": metric.name, "Unit": unit})
+                document[metric.name] = value
+        return list(documents.values())
+
+    def flush_emf(self, write=print):
+        """Escribe los documentos EMF pendientes, uno por línea (stdout llega a CloudWatch Logs)."""
+        if not self.enabled:
+            return 0
+        documents = self.emf_documents()
+        for document in documents:
+            write(json.dumps(document, separators=(",", ":")))
+        return len(documents)
+
+    def clear(self):
+        """Reinicia los valores de todas las métricas (pruebas y benchmarks)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+# Registro compartido por toda la aplicación
+metrics = MetricsRegistry()
@@ -0,0 +1,92 @@
+import base64
+import json
+import math
+
+
+def encode_cursor(offset):
+    """Codifica un offset como cursor opaco (base64 url-safe)."""
+    raw = json.dumps({"offset": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["offset"])
+    except Exception:
+        raise ValueError(f"Cursor inválido: {cursor}")
+
+    if offset < 0:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return offset
+
+
+def wants_pagination(data):
+    """Indica si la petición incluye parámetros de paginación."""
+    return any(key in data for key in ("cursor", "page", "page_size"))
+
+
+def page_bounds(data, default_size=50, max_size=200):
+    """
+    Obtiene (offset, page_size) a partir de los parámetros de la petición.
+
+    Se acepta, en orden de prioridad: cursor, page (base 1) u offset.
+    El tamaño de página se toma de page_size o limit y se limita a max_size.
+
+    Raises:
+        ValueError: Si algún parámetro no es válido
+    """
+    page_size = int(data.get("page_size", data.get("limit", default_size)))
+    if page_size < 1:
+        raise ValueError("page_size debe ser mayor a 0")
+    page_size = min(page_size, max_size)
+
+    if data.get("cursor"):
+        offset = decode_cursor(data["cursor"])
+    elif data.get("page") is not None:
+        page = int(data["page"])
+        if page < 1:
+            raise ValueError("page debe ser mayor a 0")
+        offset = (page - 1) * page_size
+    else:
+        offset = int(data.get("offset", 0))
+        if offset < 0:
+            raise ValueError("offset no puede ser negativo")
+
+    return offset, page_size
+
+
+def page_info(total_items, offset, page_size, returned):
+    """
+    Construye el bloque de paginación de la respuesta.
+
+    Args:
+        total_items (int | None): Total de elementos (None si se desconoce)
+        offset (int): Posición del primer elemento de la página
+        page_size (int): Tamaño de página solicitado
+        returned (int): Número de elementos devueltos en esta página
+
+    Si el total se desconoce, total_items y total_pages se devuelven como None
+    y solo next_cursor indica si hay más páginas.
+    """
+    next_offset = offset + returned
+    if total_items is None:
+        has_more = returned >= page_size
+        total_pages = None
+    else:
+        has_more = next_offset < total_items
+        total_pages = math.ceil(total_items / page_size) if page_size else 0
+
+    return {
+        "total_items": total_items,
+        "total_pages": total_pages,
+        "current_page": offset // page_size + 1 if page_size else 0,
+        "items_per_page": page_size,
+        "next_cursor": encode_cursor(next_offset) if has_more and returned > 0 else None
+    }
@@ -0,0 +1,80 @@
+import os
+import pstats
+import sys
+
+
+def _short_path(filename):
+    """Ruta relativa a la entrada de sys.path que la contiene (ej: flask/app.py, App/Services/...)."""
+    for base in sorted((os.path.abspath(path) for path in sys.path if path), key=len, reverse=True):
+        if filename.startswith(base + os.sep):
+            return filename[len(base) + 1:]
+    return filename
+
+
+def _function_label(function):
+    filename, line, name = function
+    if filename == "~":
+        # Funciones built-in: cProfile las registra como ('~', 0, '<built-in method ...>')
+        return name
+    return f"{_short_path(filename)}:{line}({name})"
+
+
+def profile_summary(profiler, top_n=40, max_stack_depth=20):
+    """
+    Resume un cProfile.Profile en un diccionario serializable (para la respuesta o MongoDB).
+
+    Args:
+        profiler: Perfil ya detenido
+        top_n: Número de funciones a incluir, ordenadas por tiempo acumulado
+        max_stack_depth: Profundidad máxima de las pilas reconstruidas
+
+    Returns:
+        dict: {"total_calls", "total_ms", "functions": [...], "stacks": [...]}
+
+        Cada función incluye llamadas, tiempo propio y acumulado (ms) y sus principales
+        llamadores. Las pilas se reconstruyen desde cada una de las funciones con más tiempo
+        propio subiendo por el llamador con más tiempo acumulado, de modo que muestran la
+        ruta más costosa que llega a cada punto caliente.
+    """
+    stats = pstats.Stats(profiler)
+    entries = stats.stats  # {función: (llamadas primitivas, llamadas, tottime, cumtime, llamadores)}
+
+    by_cumulative = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[:top_n]
+    functions = []
+    for function, (primitive_calls, calls, own_time, cumulative_time, callers) in by_cumulative:
+        hottest_callers = sorted(callers.items(), key=lambda item: item[1][3], reverse=True)[:5]
+        functions.append({
+            "function": _function_label(function),
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "own_ms": round(own_time * 1000, 3),
+            "cumulative_ms": round(cumulative_time * 1000, 3),
+            "callers": [
+                {"function": _function_label(caller), "calls": caller_stats[1],
+                 "cumulative_ms": round(caller_stats[3] * 1000, 3)}
+                for caller, caller_stats in hottest_callers
+            ]
+        })
+
+    stacks = []
+    by_own_time = sorted(entries.items(), key=lambda item: item[1][2], reverse=True)[:10]
+    for function, (_, _, own_time, _, _) in by_own_time:
+        stack = [_function_label(function)]
+        seen = {function}
+        current = function
+        while len(stack) < max_stack_depth:
+            callers = entries.get(current, (0, 0, 0, 0, {}))[4]
+            candidates = [caller for caller in callers if caller not in seen]
+            if not candidates:
+                break
+            current = max(candidates, key=lambda caller: callers[caller][3])
+            seen.add(current)
+            stack.append(_function_label(current))
+        stacks.append({"own_ms": round(own_time * 1000, 3), "stack": stack})
+
+    return {
+        "total_calls": stats.total_calls,
+        "total_ms": round(stats.total_tt * 1000, 3),
+        "functions": functions,
+        "stacks": stacks
+    }
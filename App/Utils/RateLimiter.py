@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+from App.Utils.Metrics import metrics
+
+rate_limiter_wait = metrics.histogram(
+    "meli_api_rate_limiter_wait_seconds",
+    "Espera para obtener un turno del limitador de peticiones a la API de Mercado Libre",
+    ("limiter",)
+)
+
+
+class TokenBucket:
+    """
+    Cubeta de tokens: permite ráfagas de hasta burst llamadas y después rate llamadas por
+    segundo. Cada llamada reserva su turno bajo el candado y espera fuera de él, por lo que
+    los hilos se atienden en orden de llegada.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "_lock")
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, timeout=None):
+        """
+        Reserva un turno.
+
+        Returns:
+            float: Segundos que hay que esperar antes de usar el turno, o None si la espera
+            superaría timeout (en ese caso no se reserva nada)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return None
+            self.tokens -= 1
+            return wait
+
+
+class RateLimiter:
+    """
+    Limitador de peticiones a la API de Mercado Libre con una cubeta de tokens por llave
+    (normalmente el vendedor), compartido por los hilos del proceso.
+    """
+
+    def __init__(self, rate=None, burst=None, name="meli"):
+        """
+        Args:
+            rate (float): Llamadas por segundo y llave (default: MELI_RATE_LIMIT_PER_SECOND o 10)
+            burst (int): Ráfaga máxima (default: MELI_RATE_LIMIT_BURST o 20)
+            name (str): Nombre del limitador (para métricas)
+        """
+        self.rate = float(rate if rate is not None else os.environ.get("MELI_RATE_LIMIT_PER_SECOND", 10))
+        self.burst = int(burst if burst is not None else os.environ.get("MELI_RATE_LIMIT_BURST", 20))
+        self.name = name
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, timeout=None):
+        """
+        Espera un turno para la llave.
+
+        Args:
+            key: Llave de la cubeta (ej: user_id)
+            timeout (float): Espera máxima en segundos (None: sin límite)
+
+        Returns:
+            bool: True si se obtuvo el turno, False si la espera superaba timeout
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+
+        wait = bucket.reserve(timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        rate_limiter_wait.observe(wait, limiter=self.name)
+        return True
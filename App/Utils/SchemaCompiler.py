@@ -0,0 +1,323 @@
+import math
+import os
+import weakref
+from collections.abc import Mapping
+
+from marshmallow import EXCLUDE, INCLUDE, Schema, ValidationError, fields, missing
+from marshmallow.decorators import POST_LOAD, PRE_LOAD, VALIDATES, VALIDATES_SCHEMA
+from marshmallow.error_store import merge_errors
+from marshmallow.utils import is_collection
+from marshmallow.validate import And
+
+from App.Utils.Logger import app_logger
+
+# Permite volver a marshmallow puro (FAST_VALIDATION=false) sin cambiar código
+FAST_VALIDATION_ENABLED = os.environ.get("FAST_VALIDATION", "true").lower() != "false"
+
+# Enteros que se pueden convertir a float sin pérdida ni desbordamiento
+_MAX_EXACT_FLOAT_INT = 2 ** 53
+
+
+def _store_error(errors, key, messages):
+    """Guarda mensajes de error bajo una llave, combinándolos igual que ErrorStore de marshmallow."""
+    if key in errors:
+        errors[key] = merge_errors(errors[key], messages)
+    else:
+        errors[key] = messages
+
+
+def _value_deserializer(field):
+    """
+    Devuelve una función que convierte el valor de un campo o None si el tipo no tiene camino rápido.
+
+    Cada función resuelve directamente los casos comunes (str para String, int para Integer, etc.)
+    y delega el resto en field._deserialize, de modo que las conversiones y mensajes de error
+    menos frecuentes siguen siendo exactamente los de marshmallow.
+    """
+    field_type = type(field)
+    slow = field._deserialize
+
+    if field_type is fields.String:
+        def deserialize(value):
+            if type(value) is str:
+                return value
+            return slow(value, None, None)
+        return deserialize
+
+    if field_type is fields.Integer:
+        def deserialize(value):
+            if type(value) is int:
+                return value
+            return slow(value, None, None)
+        return deserialize
+
+    if field_type is fields.Float:
+        allow_nan = field.allow_nan
+
+        def deserialize(value):
+            value_type = type(value)
+            if value_type is float and (allow_nan or math.isfinite(value)):
+                return value
+            if value_type is int and -_MAX_EXACT_FLOAT_INT <= value <= _MAX_EXACT_FLOAT_INT:
+                return float(value)
+            return slow(value, None, None)
+        return deserialize
+
+    if field_type is fields.Boolean:
+        def deserialize(value):
+            if value is True or value is False:
+                return value
+            return slow(value, None, None)
+        return deserialize
+
+    if field_type is fields.Dict and field.key_field is None and field.value_field is None:
+        def deserialize(value):
+            if type(value) is dict:
+                return dict(value)
+            return slow(value, None, None)
+        return deserialize
+
+    if field_type is fields.Raw:
+        return lambda value: value
+
+    if field_type is fields.List:
+        inner = _compile_field(field.inner)
+        invalid = field.make_error("invalid").messages
+
+        def deserialize(value):
+            if type(value) is not list and not is_collection(value):
+                raise ValidationError(list(invalid))
+            result = []
+            errors = None
+            for index, each in enumerate(value):
+                try:
+                    result.append(inner(each))
+                except ValidationError as error:
+                    if error.valid_data is not None:
+                        result.append(error.valid_data)
+                    if errors is None:
+                        errors = {}
+                    errors[index] = error.messages
+            if errors:
+                raise ValidationError(errors, valid_data=result)
+            return result
+        return deserialize
+
+    if field_type is fields.Nested and not field.many:
+        try:
+            nested = compile_schema(field.schema)
+        except Exception:
+            return None
+        if nested.fallback:
+            return None
+        unknown = field.unknown
+
+        def deserialize(value):
+            try:
+                return nested.load_compiled(value, unknown)
+            except ValidationError as error:
+                raise ValidationError(error.messages, valid_data=error.valid_data) from error
+        return deserialize
+
+    return None
+
+
+def _compile_field(field):
+    """
+    Compila un campo a una función valor -> valor deserializado equivalente a field.deserialize
+    (para valores presentes). Lanza ValidationError con los mismos mensajes que marshmallow.
+    """
+    deserialize = _value_deserializer(field)
+    if deserialize is None:
+        return field.deserialize
+
+    allow_none = field.allow_none
+    null = field.make_error("null").messages
+    validator = And(*field.validators, error=field.error_messages["validator_failed"]) if field.validators else None
+
+    if validator is None:
+        def compiled(value):
+            if value is None:
+                if allow_none:
+                    return None
+                raise ValidationError(list(null))
+            return deserialize(value)
+    else:
+        def compiled(value):
+            if value is None:
+                if allow_none:
+                    return None
+                raise ValidationError(list(null))
+            output = deserialize(value)
+            validator(output)
+            return output
+    return compiled
+
+
+class CompiledSchema:
+    """
+    Versión compilada de un esquema marshmallow para validar en el camino crítico.
+
+    Al compilar se recorren una sola vez los campos del esquema y se genera, para cada uno,
+    una función especializada en su tipo, validadores y valores por defecto. En cada petición
+    solo se ejecutan esas funciones, sin la maquinaria genérica de Schema.load. Los mensajes
+    de error, la combinación de errores y el resultado son los mismos que los de marshmallow.
+
+    Los esquemas con hooks pre_load/post_load/validates_schema, many o partial no se compilan
+    y se validan con marshmallow (fallback = True); los campos sin camino rápido se
+    deserializan con su propio field.deserialize.
+
+    La compilación lee estructuras internas de marshmallow (Schema._hooks, Field._deserialize),
+    probadas con marshmallow 3.26+. Si no tienen la forma esperada, el esquema se valida con
+    schema.load en lugar de fallar.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.fallback = not FAST_VALIDATION_ENABLED or not self._is_compilable(schema)
+        if self.fallback:
+            return
+
+        try:
+            self._compile(schema)
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            app_logger.warning(f"No se pudo compilar el esquema {type(schema).__name__}: {error}")
+            self.fallback = True
+
+    def _compile(self, schema):
+
+        self.unknown = schema.unknown
+        self.type_error = schema.error_messages["type"]
+        self.unknown_error = schema.error_messages["unknown"]
+
+        specs = []
+        data_keys = set()
+        for attr_name, field in schema.load_fields.items():
+            data_key = field.data_key if field.data_key is not None else attr_name
+            data_keys.add(data_key)
+            result_key = field.attribute or attr_name
+
+            required = field.make_error("required").messages if field.required else None
+            node = _compile_field(field)
+            # Los campos sin camino rápido reciben la llave y los datos, como en Schema._deserialize
+            needs_data = node == field.deserialize
+            specs.append((result_key, data_key, node, needs_data, required, field.load_default))
+        self.specs = tuple(specs)
+        self.data_keys = frozenset(data_keys)
+
+        validators = []
+        for attr_name, _, validator_kwargs in schema._hooks[VALIDATES]:
+            # marshmallow 3 registra un campo por hook ("field_name"); marshmallow 4, varios ("field_names")
+            if "field_name" in validator_kwargs:
+                field_names = (validator_kwargs["field_name"],)
+            else:
+                field_names = tuple(validator_kwargs["field_names"])
+            for field_name in field_names:
+                field = schema.fields.get(field_name)
+                if field is None:
+                    continue
+                data_key = field.data_key if field.data_key is not None else field_name
+                validators.append((field.attribute or field_name, field_name, data_key, getattr(schema, attr_name)))
+        self.field_validators = tuple(validators)
+
+    @staticmethod
+    def _is_compilable(schema):
+        if schema.many or schema.partial or schema.dict_class is not dict:
+            return False
+        try:
+            hooks = schema._hooks
+            if hooks[PRE_LOAD] or hooks[POST_LOAD] or hooks[VALIDATES_SCHEMA]:
+                return False
+            if not all(isinstance(hook, tuple) and len(hook) == 3 and isinstance(hook[2], Mapping)
+                       for hook in hooks[VALIDATES]):
+                return False
+        except (AttributeError, KeyError, TypeError):
+            return False
+        return not any(field.attribute and "." in field.attribute for field in schema.load_fields.values())
+
+    def load_compiled(self, data, unknown=None):
+        """Equivalente a schema.load(data, unknown=unknown) para esquemas compilados."""
+        errors = {}
+        result = {}
+
+        if not isinstance(data, Mapping):
+            errors["_schema"] = [self.type_error]
+        else:
+            for result_key, data_key, node, needs_data, required, load_default in self.specs:
+                raw_value = data.get(data_key, missing)
+                if raw_value is missing:
+                    if required is not None:
+                        _store_error(errors, data_key, list(required))
+                    elif load_default is not missing:
+                        result[result_key] = load_default() if callable(load_default) else load_default
+                    continue
+
+                try:
+                    result[result_key] = node(raw_value, data_key, data) if needs_data else node(raw_value)
+                except ValidationError as error:
+                    _store_error(errors, data_key, error.messages)
+                    if error.valid_data:
+                        result[result_key] = error.valid_data
+
+            unknown = self.unknown if unknown is None else unknown
+            if unknown != EXCLUDE and len(data) > 0:
+                for key in data.keys() - self.data_keys:
+                    if unknown == INCLUDE:
+                        result[key] = data[key]
+                    else:
+                        _store_error(errors, key, [self.unknown_error])
+
+        for result_key, field_name, data_key, validator in self.field_validators:
+            if result_key in result:
+                try:
+                    validator(result[result_key])
+                except ValidationError as error:
+                    _store_error(errors, data_key, error.messages)
+                    # marshmallow quita el valor rechazado de los datos válidos
+                    result.pop(field_name, None)
+
+        if errors:
+            raise ValidationError(errors, data=data, valid_data=result)
+        return result
+
+    def load(self, data):
+        """Deserializa y valida los datos. Lanza ValidationError igual que schema.load."""
+        if self.fallback:
+            return self.schema.load(data)
+        return self.load_compiled(data)
+
+    def validate(self, data):
+        """Valida los datos y devuelve el diccionario de errores (vacío si son válidos), igual que schema.validate."""
+        if self.fallback:
+            return self.schema.validate(data)
+        try:
+            self.load_compiled(data)
+        except ValidationError as error:
+            return error.messages
+        return {}
+
+
+_compiled_instances = weakref.WeakKeyDictionary()
+_compiled_classes = {}
+
+
+def compile_schema(schema):
+    """
+    Devuelve la versión compilada de un esquema (instancia o clase), compilándolo la primera vez.
+
+    Las instancias se compilan una vez y se reutilizan mientras existan; las clases se
+    instancian con sus opciones por defecto.
+    """
+    if isinstance(schema, type) and issubclass(schema, Schema):
+        compiled = _compiled_classes.get(schema)
+        if compiled is None:
+            compiled = _compiled_classes[schema] = compile_schema(schema())
+        return compiled
+
+    compiled = _compiled_instances.get(schema)
+    if compiled is None:
+        compiled = CompiledSchema(schema)
+        _compiled_instances[schema] = compiled
+        if compiled.fallback and FAST_VALIDATION_ENABLED:
+            app_logger.info(f"Esquema {type(schema).__name__} sin compilar, se valida con marshmallow")
+    return compiled
@@ -0,0 +1,93 @@
+import os
+import threading
+
+from App.Utils.Metrics import metrics
+from App.Utils.Timing import span
+
+single_flight_calls = metrics.counter(
+    "meli_api_single_flight_calls",
+    "Llamadas que pasan por single-flight por operación y resultado (leader, shared, shared_error, timeout)",
+    ("operation", "result")
+)
+upstream_calls_saved = metrics.counter(
+    "meli_api_upstream_calls_saved",
+    "Llamadas a la API de Mercado Libre evitadas al reutilizar una petición idéntica en curso",
+    ("operation",)
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas idénticas concurrentes: mientras una llamada con la misma llave está en
+    curso, las demás esperan y reciben su mismo resultado (o su misma excepción) en lugar
+    de repetirla.
+
+    El resultado no se guarda: en cuanto la llamada termina, la siguiente con esa llave se
+    ejecuta de nuevo. Si la espera supera timeout segundos (la llamada original quedó
+    colgada), quien espera ejecuta la llamada por su cuenta.
+    """
+
+    def __init__(self, timeout=None):
+        """
+        Args:
+            timeout (float): Espera máxima por la llamada en curso (default: SINGLE_FLIGHT_TIMEOUT o 30)
+        """
+        self.timeout = float(timeout if timeout is not None else os.environ.get("SINGLE_FLIGHT_TIMEOUT", 30))
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key, function, operation="default"):
+        """
+        Ejecuta function() una sola vez para todas las llamadas concurrentes con la misma llave.
+
+        Args:
+            key: Llave hashable que identifica la llamada
+            function: Función sin argumentos
+            operation: Nombre de la operación (para métricas)
+
+        Returns:
+            El resultado de function() (propio o de la llamada en curso)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            single_flight_calls.inc(operation=operation, result="leader")
+            try:
+                call.result = function()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+
+        with span("single_flight_wait"):
+            finished = call.done.wait(self.timeout)
+        if not finished:
+            single_flight_calls.inc(operation=operation, result="timeout")
+            return function()
+
+        upstream_calls_saved.inc(operation=operation)
+        if call.error is not None:
+            single_flight_calls.inc(operation=operation, result="shared_error")
+            raise call.error
+        single_flight_calls.inc(operation=operation, result="shared")
+        return call.result
@@ -0,0 +1,158 @@
+import re
+
+from App.Utils.CategoryTree import normalize_text
+from App.Utils.SizeChartValidator import main_attribute_ids
+
+# Atributo de talla de los items y variantes (las guías usan además su atributo principal, ej: MX_SIZE)
+ITEM_SIZE_ATTRIBUTE = "SIZE"
+
+_SITE_PREFIX = re.compile(r"^[A-Z]{3}-")
+
+
+def normalize_domain(domain_id):
+    """Dominio sin prefijo de sitio: las guías usan "SNEAKERS" y los items "MLM-SNEAKERS"."""
+    return _SITE_PREFIX.sub("", str(domain_id or "").strip().upper())
+
+
+def normalize_size(value_name):
+    """Valor de talla comparable: minúsculas, sin acentos y con los espacios colapsados."""
+    return " ".join(normalize_text(str(value_name or "")).split())
+
+
+def _attribute_values(attribute):
+    """Valores normalizados de un atributo de item (value_name) o de guía (values)."""
+    names = [value.get("name") for value in attribute.get("values") or []]
+    if attribute.get("value_name"):
+        names.append(attribute["value_name"])
+    return {normalize_size(name) for name in names if name}
+
+
+def item_attribute_values(item):
+    """
+    Valores por atributo de un item: atributos generales, combinaciones y atributos de sus variantes.
+
+    Returns:
+        dict: {attribute_id: set de valores normalizados}
+    """
+    values = {}
+    sources = list(item.get("attributes") or [])
+    for variation in item.get("variations") or []:
+        sources.extend(variation.get("attribute_combinations") or [])
+        sources.extend(variation.get("attributes") or [])
+    for attribute in sources:
+        attribute_id = attribute.get("id")
+        if attribute_id:
+            values.setdefault(attribute_id, set()).update(_attribute_values(attribute))
+    return values
+
+
+class _Entry:
+    __slots__ = ("chart_id", "domain_id", "main_ids", "sizes", "attributes")
+
+    def __init__(self, chart):
+        self.chart_id = str(chart.get("id"))
+        self.domain_id = normalize_domain(chart.get("domain_id"))
+        self.main_ids = tuple(main_attribute_ids(chart))
+        self.sizes = frozenset(
+            value
+            for row in chart.get("rows") or []
+            for attribute in row.get("attributes") or []
+            if attribute.get("id") in self.main_ids
+            for value in _attribute_values(attribute)
+        )
+        self.attributes = {attribute.get("id"): frozenset(_attribute_values(attribute))
+                           for attribute in chart.get("attributes") or [] if attribute.get("id")}
+
+
+class SizeChartIndex:
+    """
+    Índice en memoria de las guías de tallas de un vendedor por dominio.
+
+    Cada guía se indexa con su atributo principal y el conjunto de tallas de sus filas.
+    Para un item se consideran las guías de su dominio cuyos atributos generales (ej:
+    GENDER, BRAND) no contradicen los del item, y se ordenan por cobertura de las tallas
+    del item, luego por atributos generales coincidentes y por último por menos tallas
+    sobrantes (la guía más ajustada).
+    """
+
+    __slots__ = ("by_domain", "size")
+
+    def __init__(self, charts):
+        self.by_domain = {}
+        self.size = 0
+        for chart in charts:
+            entry = _Entry(chart)
+            if entry.domain_id and entry.sizes:
+                self.by_domain.setdefault(entry.domain_id, []).append(entry)
+                self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def item_sizes(values, main_ids=()):
+        """Tallas del item: atributo SIZE más los atributos principales de la guía que tenga el item."""
+        sizes = set(values.get(ITEM_SIZE_ATTRIBUTE) or ())
+        for main_id in main_ids:
+            sizes.update(values.get(main_id) or ())
+        return sizes
+
+    def match(self, domain_id, item, limit=3):
+        """
+        Guías candidatas para un item, de mejor a peor.
+
+        Args:
+            domain_id (str): Dominio del item (con o sin prefijo de sitio)
+            item (dict): attributes y variations con el formato de /items
+            limit (int): Máximo de candidatas
+
+        Returns:
+            list: [{"size_chart_id", "domain_id", "main_attribute_id", "coverage",
+                    "missing_sizes", "extra_sizes", "attribute_matches"}, ...]
+        """
+        values = item_attribute_values(item)
+        ranked = []
+        for entry in self.by_domain.get(normalize_domain(domain_id), ()):
+            sizes = self.item_sizes(values, entry.main_ids)
+            if not sizes:
+                continue
+
+            attribute_matches = 0
+            conflict = False
+            for attribute_id, chart_values in entry.attributes.items():
+                item_values = values.get(attribute_id)
+                if not item_values or not chart_values:
+                    continue
+                if item_values & chart_values:
+                    attribute_matches += 1
+                else:
+                    conflict = True
+                    break
+            if conflict:
+                continue
+
+            missing = sizes - entry.sizes
+            coverage = (len(sizes) - len(missing)) / len(sizes)
+            extra = len(entry.sizes - sizes)
+            ranked.append(((-coverage, -attribute_matches, extra, entry.chart_id), {
+                "size_chart_id": entry.chart_id,
+                "domain_id": entry.domain_id,
+                "main_attribute_id": entry.main_ids[0] if entry.main_ids else None,
+                "coverage": round(coverage, 3),
+                "missing_sizes": sorted(missing),
+                "extra_sizes": extra,
+                "attribute_matches": attribute_matches
+            }))
+
+        ranked.sort(key=lambda candidate: candidate[0])
+        return [candidate for _, candidate in ranked[:limit]]
+
+    def miss_reason(self, domain_id, item):
+        """Motivo por el que match no devolvió candidatas: no_charts, no_sizes o attribute_conflict."""
+        entries = self.by_domain.get(normalize_domain(domain_id))
+        if not entries:
+            return "no_charts"
+        values = item_attribute_values(item)
+        if not any(self.item_sizes(values, entry.main_ids) for entry in entries):
+            return "no_sizes"
+        return "attribute_conflict"
@@ -0,0 +1,152 @@
+import hashlib
+import re
+
+from App.Utils.CategoryTree import normalize_text
+from App.Utils.JsonProvider import dumps_bytes
+
+# Orden de las tallas con letras (incluye las abreviaturas usadas en México: CH, G, EG)
+LETTER_SIZES = {
+    "xxs": 0, "xs": 1, "s": 2, "ch": 2, "m": 3, "l": 4, "g": 4, "xl": 5, "eg": 5,
+    "xxl": 6, "2xl": 6, "eeg": 6, "xxxl": 7, "3xl": 7, "4xl": 8, "5xl": 9,
+}
+
+_NUMBER = re.compile(r"^\s*(\d+(?:[.,]\d+)?)")
+
+
+def size_rank(value_name):
+    """
+    Posición comparable de una talla: número (primer número del texto, ej: "25.5 cm",
+    "22-23") o letra (XS, M, CH, EG...). None si no se reconoce.
+    """
+    text = normalize_text(str(value_name)).replace(" ", "")
+    if text in LETTER_SIZES:
+        return LETTER_SIZES[text]
+    match = _NUMBER.match(text)
+    return float(match.group(1).replace(",", ".")) if match else None
+
+
+def _cell(attribute):
+    """Valores normalizados de una celda (atributo de fila o atributo general)."""
+    return sorted(normalize_text(str(value.get("name") or "")).strip() for value in attribute.get("values") or [])
+
+
+def main_attribute_ids(chart):
+    """IDs del atributo principal para el sitio de la guía (o todos si ninguno coincide con el sitio)."""
+    attributes = (chart.get("main_attribute") or {}).get("attributes") or []
+    site_ids = [attribute.get("id") for attribute in attributes if attribute.get("site_id") == chart.get("site_id")]
+    return site_ids or [attribute.get("id") for attribute in attributes if attribute.get("id")]
+
+
+def size_chart_fingerprint(chart):
+    """
+    Huella del contenido de una guía de tallas: dominio, sitio, atributo principal,
+    atributos generales y filas (en orden), con los valores normalizados.
+
+    No incluye los nombres de la guía ni los IDs que asigna Mercado Libre (guía, filas,
+    valores), de modo que una guía creada y la misma guía leída de la API tienen la misma huella.
+    """
+    canonical = {
+        "domain_id": str(chart.get("domain_id") or "").upper(),
+        "site_id": str(chart.get("site_id") or "").upper(),
+        "main_attribute": sorted(main_attribute_ids(chart)),
+        "attributes": sorted([attribute.get("id"), _cell(attribute)] for attribute in chart.get("attributes") or []),
+        "rows": [sorted([attribute.get("id"), _cell(attribute)] for attribute in row.get("attributes") or [])
+                 for row in chart.get("rows") or []]
+    }
+    return hashlib.sha256(dumps_bytes(canonical, sort_keys=True)).hexdigest()
+
+
+class SizeChartValidator:
+    """
+    Validador local de guías de tallas antes de enviarlas a /catalog/charts.
+
+    Detecta filas sin el atributo principal, filas con atributos distintos a los de la
+    primera fila, tallas repetidas y tallas que no van de menor a mayor. Las medidas
+    numéricas (ej: FOOT_LENGTH) que disminuyen entre filas se reportan como advertencia.
+    """
+
+    @classmethod
+    def validate(cls, chart):
+        """
+        Valida el contenido de una guía de tallas.
+
+        Returns:
+            dict: {"valid": bool, "errors": [...], "warnings": [...]}; cada entrada
+                incluye field, attribute_id, code y message
+        """
+        errors = []
+        warnings = []
+        main_ids = main_attribute_ids(chart)
+        rows = chart.get("rows") or []
+
+        expected_ids = None
+        seen_sizes = {}
+        for position, row in enumerate(rows):
+            field = f"rows[{position}].attributes"
+            cells = {}
+            for attribute in row.get("attributes") or []:
+                attribute_id = attribute.get("id")
+                if attribute_id in cells:
+                    errors.append(cls._issue(field, attribute_id, "duplicated_attribute",
+                                             f"El atributo {attribute_id} se repite en la fila {position + 1}"))
+                cells[attribute_id] = _cell(attribute)
+
+            for main_id in main_ids:
+                if not cells.get(main_id):
+                    errors.append(cls._issue(field, main_id, "missing_main_attribute",
+                                             f"La fila {position + 1} no tiene valor para el atributo principal {main_id}"))
+
+            ids = frozenset(cells)
+            if expected_ids is None:
+                expected_ids = ids
+            elif ids != expected_ids:
+                errors.append(cls._issue(
+                    field, None, "inconsistent_attributes",
+                    f"Todas las filas deben tener los mismos atributos que la primera: {sorted(expected_ids)}"
+                ))
+
+            size = tuple(tuple(cells.get(main_id) or ()) for main_id in main_ids)
+            if any(size):
+                if size in seen_sizes:
+                    errors.append(cls._issue(
+                        field, main_ids[0] if main_ids else None, "duplicated_size",
+                        f"La talla de la fila {position + 1} se repite en la fila {seen_sizes[size] + 1}"
+                    ))
+                else:
+                    seen_sizes[size] = position
+
+        for main_id in main_ids:
+            cls._check_order(rows, main_id, True, errors)
+        for attribute_id in sorted((expected_ids or frozenset()) - set(main_ids)):
+            cls._check_order(rows, attribute_id, False, warnings)
+
+        return {"valid": not errors, "errors": errors, "warnings": warnings}
+
+    @classmethod
+    def _check_order(cls, rows, attribute_id, strict, issues):
+        """
+        Las tallas (strict) deben crecer en cada fila; las medidas no deben disminuir.
+        Solo se revisa si todas las filas tienen un valor reconocible.
+        """
+        ranks = []
+        for row in rows:
+            values = [attribute for attribute in row.get("attributes") or [] if attribute.get("id") == attribute_id]
+            names = [value.get("name") for value in (values[0].get("values") or [])] if values else []
+            rank = size_rank(names[0]) if names else None
+            if rank is None:
+                return
+            ranks.append(rank)
+
+        for position in range(1, len(ranks)):
+            previous, current = ranks[position - 1], ranks[position]
+            if current < previous or (strict and current == previous):
+                code = "non_monotonic_sizes" if strict else "non_monotonic_measure"
+                issues.append(cls._issue(
+                    f"rows[{position}].attributes", attribute_id, code,
+                    f"Los valores de {attribute_id} deben ir de menor a mayor (fila {position + 1})"
+                ))
+                return
+
+    @staticmethod
+    def _issue(field, attribute_id, code, message):
+        return {"field": field, "attribute_id": attribute_id, "code": code, "message": message}
@@ -0,0 +1,313 @@
+import os
+import threading
+import time
+import zlib
+
+from App.Utils.Cache import TTLCache
+from App.Utils.JsonProvider import dumps_bytes
+from App.Utils.Logger import app_logger
+from App.Utils.Metrics import metrics
+from App.Utils.Timing import span
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - dependencia opcional
+    import json
+    _loads = json.loads
+
+_MISSING = object()
+
+# Prefijo de los valores en el almacén compartido
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+shared_cache_requests = metrics.counter(
+    "meli_api_shared_cache_requests",
+    "Consultas al almacén de caché compartido por caché y resultado (hit, miss, error)",
+    ("cache", "result")
+)
+cache_loads = metrics.counter(
+    "meli_api_cache_loads",
+    "Cargas de valores no encontrados en caché por resultado (loaded, coalesced, waited)",
+    ("cache", "result")
+)
+
+
+class InMemorySharedStore:
+    """
+    Almacén compartido en memoria con la misma interfaz que DynamoSharedCache.
+
+    Sustituye a DynamoDB en desarrollo, pruebas y benchmarks (SHARED_CACHE_BACKEND=memory):
+    varias TieredCache del mismo proceso lo comparten como si fueran contenedores distintos.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Devuelve (bytes, expires_at) o None si no existe o ya expiró."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= time.time():
+                return None
+            return entry
+
+    def set(self, key, data, ttl):
+        with self._lock:
+            self._data[key] = (data, time.time() + ttl)
+
+    def add(self, key, data, ttl):
+        """Guarda la llave solo si no existe (o ya expiró). Devuelve True si la guardó."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > time.time():
+                return False
+            self._data[key] = (data, time.time() + ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class TieredCache:
+    """
+    Caché de dos niveles: TTLCache local del proceso delante de un almacén compartido
+    entre contenedores de Lambda (DynamoDB con TTL o InMemorySharedStore).
+
+    - Lectura: nivel local; si falla, el almacén compartido (el valor se copia al nivel
+      local con el tiempo de vida que le queda).
+    - Escritura (set): en ambos niveles (write-through).
+    - get_or_set: read-through con coalescencia. Dentro del proceso solo un hilo por llave
+      ejecuta el loader y los demás reutilizan su resultado; entre contenedores, el primero
+      toma un lease en el almacén compartido y los demás esperan a que publique el valor
+      (hasta lease_wait segundos) antes de consultarlo ellos mismos.
+
+    Los valores se guardan en el almacén compartido como JSON (encode/decode convierten los
+    objetos que no son JSON, ej: CategoryTree) y se comprimen con zlib a partir de
+    compress_min_bytes. Los errores del almacén compartido se registran y se tratan como
+    fallos de caché: la API sigue funcionando solo con el nivel local.
+
+    Expone la misma interfaz que TTLCache (get, set, delete, get_or_set, clear), por lo que
+    los servicios pueden recibir cualquiera de las dos; add (guardar solo si no existe)
+    es propio de TieredCache.
+    """
+
+    def __init__(self, local: TTLCache, shared=None, namespace=None, encode=None, decode=None,
+                 compress_min_bytes=None, lease_seconds=None, lease_wait=None):
+        """
+        Args:
+            local (TTLCache): Nivel local (define también el TTL por defecto)
+            shared: Almacén compartido (get, set, add, delete) o None para usar solo el nivel local
+            namespace (str): Prefijo de las llaves en el almacén compartido (default: local.name)
+            encode: Convierte el valor en un objeto serializable a JSON (default: identidad)
+            decode: Reconstruye el valor desde el JSON (default: identidad)
+            compress_min_bytes (int): Tamaño a partir del cual se comprime (default: SHARED_CACHE_COMPRESS_MIN o 1024)
+            lease_seconds (int): Duración del lease de carga (default: SHARED_CACHE_LEASE_SECONDS o 10)
+            lease_wait (float): Espera máxima por el valor que carga otro contenedor
+                (default: SHARED_CACHE_LEASE_WAIT o 2)
+        """
+        self.local = local
+        self.shared = shared
+        self.namespace = namespace or local.name
+        self.name = self.namespace
+        self.ttl = local.ttl
+        self.encode = encode
+        self.decode = decode
+        self.compress_min_bytes = int(compress_min_bytes if compress_min_bytes is not None
+                                      else os.environ.get("SHARED_CACHE_COMPRESS_MIN", 1024))
+        self.lease_seconds = int(lease_seconds if lease_seconds is not None
+                                 else os.environ.get("SHARED_CACHE_LEASE_SECONDS", 10))
+        self.lease_wait = float(lease_wait if lease_wait is not None
+                                else os.environ.get("SHARED_CACHE_LEASE_WAIT", 2))
+        # Candados por franja de llaves para add (comprobar y guardar sin carreras)
+        self._stripes = [threading.Lock() for _ in range(64)]
+        # Cargas en curso de get_or_set: llave -> Event que se activa al terminar. Solo se
+        # espera por la misma llave; el loader y la espera del lease corren sin candados
+        self._loading = {}
+        self._loading_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.local)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def _shared_key(self, key):
+        parts = key if isinstance(key, tuple) else (key,)
+        return f"{self.namespace}:" + "|".join(str(part) for part in parts)
+
+    def _serialize(self, value):
+        data = dumps_bytes(self.encode(value) if self.encode else value)
+        if len(data) >= self.compress_min_bytes:
+            return _ZLIB + zlib.compress(data, 6)
+        return _RAW + data
+
+    def _deserialize(self, data):
+        data = bytes(data)
+        payload = zlib.decompress(data[1:]) if data[:1] == _ZLIB else data[1:]
+        value = _loads(payload)
+        return self.decode(value) if self.decode else value
+
+    def _get_shared(self, key):
+        """Consulta el almacén compartido y copia el valor al nivel local."""
+        try:
+            with span("shared_cache"):
+                entry = self.shared.get(self._shared_key(key))
+            if entry is None:
+                shared_cache_requests.inc(cache=self.name, result="miss")
+                return _MISSING
+            data, expires_at = entry
+            value = self._deserialize(data)
+        except Exception as e:
+            shared_cache_requests.inc(cache=self.name, result="error")
+            app_logger.warning(f"Error al leer la caché compartida {self.name}: {str(e)}")
+            return _MISSING
+
+        shared_cache_requests.inc(cache=self.name, result="hit")
+        remaining = expires_at - time.time()
+        if remaining > 0:
+            self.local.set(key, value, min(self.ttl, remaining))
+        return value
+
+    def get(self, key, default=None):
+        """Devuelve el valor del nivel local o del almacén compartido, o default."""
+        value = self.local.get(key, _MISSING)
+        if value is _MISSING and self.shared is not None:
+            value = self._get_shared(key)
+        return default if value is _MISSING else value
+
+    def get_current(self, key, default=None):
+        """
+        Devuelve el valor del almacén compartido, sin confiar en la copia local (para valores
+        que otros contenedores cambian, ej: contadores de generación). Si no hay almacén
+        compartido o falla, usa el nivel local.
+        """
+        value = _MISSING
+        if self.shared is not None:
+            value = self._get_shared(key)
+        if value is _MISSING:
+            value = self.local.get(key, _MISSING)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        """Guarda el valor en ambos niveles."""
+        ttl = self.ttl if ttl is None else ttl
+        self.local.set(key, value, ttl)
+        if self.shared is None:
+            return
+        try:
+            data = self._serialize(value)
+            with span("shared_cache"):
+                self.shared.set(self._shared_key(key), data, ttl)
+        except Exception as e:
+            app_logger.warning(f"Error al escribir en la caché compartida {self.name}: {str(e)}")
+
+    def add(self, key, value, ttl=None):
+        """
+        Guarda el valor solo si la llave no existe. Con almacén compartido la condición se
+        evalúa ahí (una sola escritura gana entre contenedores); si el almacén falla, solo
+        se considera el nivel local.
+
+        Returns:
+            bool: True si se guardó el valor
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._stripes[hash(key) % len(self._stripes)]:
+            if self.local.get(key, _MISSING) is not _MISSING:
+                return False
+            if self.shared is not None:
+                try:
+                    with span("shared_cache"):
+                        added = self.shared.add(self._shared_key(key), self._serialize(value), ttl)
+                except Exception as e:
+                    app_logger.warning(f"Error al escribir en la caché compartida {self.name}: {str(e)}")
+                    added = True
+                if not added:
+                    return False
+            self.local.set(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        """Elimina la llave de ambos niveles."""
+        self.local.delete(key)
+        if self.shared is None:
+            return
+        try:
+            self.shared.delete(self._shared_key(key))
+        except Exception as e:
+            app_logger.warning(f"Error al eliminar de la caché compartida {self.name}: {str(e)}")
+
+    def clear(self):
+        """Vacía el nivel local (el almacén compartido expira por TTL)."""
+        self.local.clear()
+
+    def get_or_set(self, key, loader, ttl=None):
+        """
+        Devuelve el valor en caché o lo calcula con loader() una sola vez y lo guarda en ambos niveles.
+        Las excepciones de loader se propagan y no se guardan.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        while True:
+            with self._loading_lock:
+                done = self._loading.get(key)
+                leader = done is None
+                if leader:
+                    # Otra carga pudo terminar entre la lectura y el candado
+                    value = self.local.get(key, _MISSING)
+                    if value is not _MISSING:
+                        cache_loads.inc(cache=self.name, result="coalesced")
+                        return value
+                    done = self._loading[key] = threading.Event()
+
+            if leader:
+                try:
+                    return self._load(key, loader, ttl)
+                finally:
+                    with self._loading_lock:
+                        self._loading.pop(key, None)
+                    done.set()
+
+            done.wait()
+            value = self.local.get(key, _MISSING)
+            if value is not _MISSING:
+                cache_loads.inc(cache=self.name, result="coalesced")
+                return value
+            # La carga en curso falló: se intenta de nuevo (un solo hilo ejecuta el loader)
+
+    def _load(self, key, loader, ttl):
+        lease_key = f"{self._shared_key(key)}#lease"
+        leased = False
+        if self.shared is not None:
+            try:
+                leased = self.shared.add(lease_key, b"1", self.lease_seconds)
+            except Exception as e:
+                app_logger.warning(f"Error al tomar el lease de la caché compartida {self.name}: {str(e)}")
+                leased = None
+
+            if leased is False:
+                # Otro contenedor está cargando el valor: esperar a que lo publique
+                deadline = time.monotonic() + self.lease_wait
+                while time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    value = self._get_shared(key)
+                    if value is not _MISSING:
+                        cache_loads.inc(cache=self.name, result="waited")
+                        return value
+
+        try:
+            value = loader()
+            self.set(key, value, ttl)
+            cache_loads.inc(cache=self.name, result="loaded")
+            return value
+        finally:
+            if leased:
+                try:
+                    self.shared.delete(lease_key)
+                except Exception as e:
+                    app_logger.warning(f"Error al liberar el lease de la caché compartida {self.name}: {str(e)}")
@@ -0,0 +1,113 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from App.Utils.Metrics import metrics
+
+# Permite desactivar la instrumentación (TIMING_ENABLED=false) sin cambiar código
+TIMING_ENABLED = os.environ.get("TIMING_ENABLED", "true").lower() != "false"
+
+# Duración de cada span (consulta del usuario, validación, meli.<operation_name>, ...)
+span_duration = metrics.histogram(
+    "meli_api_span_duration_seconds",
+    "Duración de las etapas de las peticiones por span",
+    ("span",)
+)
+
+_current_timing = contextvars.ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """
+    Tiempos de una petición agrupados por nombre de span.
+
+    Los spans con el mismo nombre se acumulan (duración total y número de llamadas), de
+    modo que varias consultas a la misma operación aparecen como una sola entrada. Los
+    spans se pueden registrar desde hilos del pool (multiget, validación masiva), por eso
+    las escrituras se protegen con un candado.
+    """
+
+    __slots__ = ("started", "spans", "_lock")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, duration_ms):
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                self.spans[name] = [duration_ms, 1]
+            else:
+                span[0] += duration_ms
+                span[1] += 1
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self):
+        """Tiempos para el documento de log: total y spans {nombre: {"ms", "count"}}."""
+        with self._lock:
+            spans = {name: {"ms": round(total, 3), "count": count} for name, (total, count) in self.spans.items()}
+        return {"total_ms": round(self.elapsed_ms(), 3), "spans": spans}
+
+    def server_timing(self):
+        """Valor del header Server-Timing (https://www.w3.org/TR/server-timing/)."""
+        with self._lock:
+            entries = [
+                f'{name};dur={total:.1f}' + (f';desc="x{count}"' if count > 1 else "")
+                for name, (total, count) in self.spans.items()
+            ]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+
+def start_request_timing():
+    """Inicia la medición de la petición actual. Devuelve el token para terminarla."""
+    return _current_timing.set(RequestTiming() if TIMING_ENABLED else None)
+
+
+def end_request_timing(token):
+    """Termina la medición iniciada con start_request_timing."""
+    _current_timing.reset(token)
+
+
+def current_timing():
+    """Medición de la petición actual o None si no hay una activa."""
+    return _current_timing.get()
+
+
+@contextmanager
+def span(name):
+    """
+    Mide el bloque como un span de la petición actual y lo agrega al histograma del span.
+    Fuera de una petición solo alimenta el histograma.
+    """
+    if not TIMING_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        timing = _current_timing.get()
+        if timing is not None:
+            timing.add(name, duration_ms)
+        span_duration.observe(duration_ms / 1000, span=name)
+
+
+def with_current_context(function):
+    """
+    Envuelve una función para que se ejecute con el contexto de la petición actual.
+    Se usa al enviar tareas a un ThreadPoolExecutor, que no propaga los contextvars.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(function, *args, **kwargs)
+
+    return run
@@ -0,0 +1,241 @@
+"""
+Benchmark de rutas en proceso contra el simulador local de Mercado Libre (sin red).
+
+Levanta Test/meli_simulator.py en un hilo, apunta los servicios al simulador
+(MELI_API_BASE_URL / ACCESS_TOKEN_URL), sustituye la tabla de usuarios de DynamoDB por
+InMemoryMeliUsers y ejecuta cada ruta con el cliente de pruebas de Flask, midiendo
+throughput, latencia (p50/p95/p99), códigos de respuesta y llamadas al API por petición.
+
+Uso:
+    python Test/bench_routes.py [--requests 200] [--latency-ms 20] [--jitter-ms 5]
+                                [--fault 429=0.02 --fault 500=0.01] [--expire-tokens]
+                                [--routes verify,rules] [--spans] [--json resultados.json]
+
+Nota: los controladores comparten ResponseHandlerService entre peticiones (en Lambda
+cada contenedor atiende una petición a la vez), por eso el benchmark es secuencial.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dependency_injector import providers  # noqa: E402
+
+from meli_simulator import DEFAULT_SHOP_ID, DEFAULT_USER_ID, InMemoryMeliUsers, MeliSimulator, parse_faults  # noqa: E402
+
+SHOP = DEFAULT_SHOP_ID
+
+
+def product_data(index=0):
+    return {
+        "title": f"Tenis deportivos para correr {index}",
+        "category_id": "MLM1111",
+        "price": 1299.0,
+        "currency_id": "MXN",
+        "available_quantity": 10,
+        "buying_mode": "buy_it_now",
+        "condition": "new",
+        "listing_type_id": "gold_special",
+        "description": {"plain_text": "Descripción detallada del producto de prueba"},
+        "pictures": [{"id": "PIC-1"}],
+        "attributes": [{"id": "BRAND", "value_name": "Marca"}, {"id": "MODEL", "value_name": "Modelo"},
+                       {"id": "GENDER", "value_id": "339666"}],
+        "variations": [{"price": 1299.0, "available_quantity": 1,
+                        "attribute_combinations": [{"id": "SIZE", "value_name": str(24 + size)}]}
+                       for size in range(5)]
+    }
+
+
+def size_chart(index=0):
+    return {
+        "shop_id": SHOP,
+        "names": {"MLM": f"Guía benchmark {index}"},
+        "domain_id": "SNEAKERS",
+        "site_id": "MLM",
+        "main_attribute": {"attributes": [{"site_id": "MLM", "id": "MX_SIZE"}]},
+        "attributes": [{"id": "GENDER", "values": [{"name": "Hombre"}]}],
+        "rows": [{"attributes": [{"id": "MX_SIZE", "values": [{"name": str(22 + size)}]}]} for size in range(10)]
+    }
+
+
+# (nombre, método, ruta, generador de query/body por índice de petición)
+ROUTES = [
+    ("hello", "GET", "/meli/products/hello", None),
+    ("rules", "GET", "/meli/products/rules", lambda i: {"shop_id": SHOP}),
+    ("rules_category", "GET", "/meli/products/rules", lambda i: {"shop_id": SHOP, "category_id": "MLM1111"}),
+    ("category_predict", "POST", "/meli/products/categories",
+     lambda i: {"shop_id": SHOP, "product_name": f"Tenis para correr {i % 20}"}),
+    ("category_attributes", "POST", "/meli/products/categories/attributes",
+     lambda i: {"shop_id": SHOP, "category_id": f"MLM{i % 8 + 1}1"}),
+    ("category_tree", "GET", "/meli/products/categories/tree", lambda i: {"shop_id": SHOP, "max_depth": 3}),
+    ("category_tree_page", "GET", "/meli/products/categories/tree",
+     lambda i: {"shop_id": SHOP, "max_depth": 4, "page": i % 5 + 1, "page_size": 100}),
+    ("category_search", "GET", "/meli/products/categories/search", lambda i: {"shop_id": SHOP, "q": "tenis"}),
+    ("category_autocomplete", "GET", "/meli/products/categories/autocomplete",
+     lambda i: {"shop_id": SHOP, "prefix": "ro"}),
+    ("category_subtree", "GET", "/meli/products/categories/subtree",
+     lambda i: {"shop_id": SHOP, "category_id": "MLM1"}),
+    ("upload_image", "POST", "/meli/products/image",
+     lambda i: {"shop_id": SHOP, "image_data": f"https://example.com/{i}.jpg"}),
+    ("validate_batch", "POST", "/meli/products/validate/batch",
+     lambda i: {"shop_id": SHOP, "products": [product_data(n) for n in range(50)]}),
+    ("create_product", "POST", "/meli/products/create", lambda i: {"shop_id": SHOP, "product_data": product_data(i)}),
+    ("verify", "POST", "/meli/products/verify", lambda i: {"shop_id": SHOP, "item_id": f"MLM{1000001 + i * 2}"}),
+    ("verify_fields", "POST", "/meli/products/verify",
+     lambda i: {"shop_id": SHOP, "item_id": f"MLM{1000001 + i * 2}", "fields": "status,price"}),
+    ("verify_max_age", "POST", "/meli/products/verify",
+     lambda i: {"shop_id": SHOP, "item_id": f"MLM{1000001 + i % 10 * 2}", "fields": "status,price", "max_age": 60}),
+    ("verify_batch_200", "POST", "/meli/products/verify/batch",
+     lambda i: {"shop_id": SHOP, "item_ids": [f"MLM{2000000 + i * 200 + n}" for n in range(200)]}),
+    ("update_product", "POST", "/meli/products/update/product",
+     lambda i: {"shop_id": SHOP, "item_id": f"MLM{1000001 + i * 2}", "update_data": {"price": 100 + i}}),
+    ("update_unchanged", "POST", "/meli/products/update/product",
+     lambda i: {"shop_id": SHOP, "item_id": f"MLM{1000001 + i * 2}", "update_data": {"price": 100 + i}}),
+    ("update_unchanged_mirror", "POST", "/meli/products/update/product",
+     lambda i: {"shop_id": SHOP, "item_id": f"MLM{1000001 + i * 2}", "update_data": {"price": 100 + i},
+                "state_max_age": 60}),
+    ("size_chart_list", "GET", "/meli/products/size_charts", lambda i: {"shop_id": SHOP, "page_size": 100}),
+    ("size_chart_get", "GET", "/meli/products/size_charts/500001", lambda i: {"shop_id": SHOP}),
+    ("size_chart_create", "POST", "/meli/products/size_charts", size_chart),
+    ("size_chart_associate", "POST", "/meli/products/items/MLM1000001/size_charts/500001",
+     lambda i: {"shop_id": SHOP}),
+    ("size_chart_match", "POST", "/meli/products/size_charts/match",
+     lambda i: {"shop_id": SHOP, "domain_id": "MLM-SNEAKERS", "attributes": product_data(i)["attributes"],
+                "variations": product_data(i)["variations"]}),
+    ("notification", "POST", "/meli/notifications",
+     lambda i: {"_id": f"bench-{i}", "resource": f"/items/MLM{1000001 + i % 40 * 2}", "user_id": DEFAULT_USER_ID,
+                "topic": "items", "application_id": 1, "attempts": 1}),
+    ("size_chart_batch_50", "POST", "/meli/products/size_charts/500001/associate/batch",
+     lambda i: {"shop_id": SHOP, "item_ids": [f"MLM{3000001 + i * 100 + n * 2}" for n in range(50)]}),
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def parse_server_timing(header):
+    """Convierte un header Server-Timing en {nombre: duración ms}."""
+    spans = {}
+    for entry in filter(None, (part.strip() for part in (header or "").split(","))):
+        name, *params = entry.split(";")
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                spans[name.strip()] = float(value)
+    return spans
+
+
+def run_route(client, simulator, route, requests, warmup):
+    name, method, path, payload = route
+    for index in range(warmup):
+        call(client, method, path, payload, index)
+
+    simulator.reset_stats()
+    latencies = []
+    statuses = {}
+    spans = {}
+    started = time.perf_counter()
+    for index in range(requests):
+        start = time.perf_counter()
+        status, server_timing = call(client, method, path, payload, warmup + index)
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses[status] = statuses.get(status, 0) + 1
+        for span_name, duration in parse_server_timing(server_timing).items():
+            spans[span_name] = spans.get(span_name, 0) + duration
+    elapsed = time.perf_counter() - started
+
+    return {
+        "route": name,
+        "requests": requests,
+        "throughput_rps": requests / elapsed if elapsed else 0,
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "statuses": statuses,
+        "upstream_per_request": simulator.stats.get("requests", 0) / requests,
+        "token_refreshes": simulator.stats.get("token_refreshes", 0),
+        "spans_mean_ms": {span_name: total / requests for span_name, total in spans.items()},
+    }
+
+
+def call(client, method, path, payload, index):
+    data = payload(index) if payload else None
+    if method == "GET":
+        response = client.get(path, query_string=data)
+    else:
+        response = client.post(path, json=data)
+    response.get_data()
+    return response.status_code, response.headers.get("Server-Timing")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de rutas contra el simulador de Mercado Libre")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--fault", action="append", help="CODIGO=PROBABILIDAD, ej: 429=0.02 (repetible)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--expire-tokens", action="store_true",
+                        help="Invalida el token antes de cada ruta para medir el flujo de renovación")
+    parser.add_argument("--routes", help="Nombres de rutas separados por coma")
+    parser.add_argument("--spans", action="store_true",
+                        help="Muestra el desglose promedio por span del header Server-Timing")
+    parser.add_argument("--json", help="Archivo donde guardar los resultados")
+    args = parser.parse_args()
+
+    simulator = MeliSimulator(args.latency_ms, args.jitter_ms, parse_faults(args.fault), args.seed)
+    simulator.start()
+
+    # La configuración se lee al construir los servicios, antes de importar la aplicación
+    os.environ["MELI_API_BASE_URL"] = simulator.base_url
+    os.environ["ACCESS_TOKEN_URL"] = simulator.token_url
+    # El simulador no limita peticiones: sin esto la asociación masiva mediría el limitador
+    os.environ.setdefault("MELI_RATE_LIMIT_PER_SECOND", "1000")
+    os.environ.setdefault("MELI_RATE_LIMIT_BURST", "1000")
+    from App.Containers.Container import Container
+    Container.meli_users.override(providers.Object(InMemoryMeliUsers()))
+    import lambda_function
+    logging.getLogger("meli_api").setLevel(logging.WARNING)
+
+    client = lambda_function.app.test_client()
+    selected = set(args.routes.split(",")) if args.routes else None
+    results = []
+
+    print(f"Simulador: {simulator.base_url} latencia={args.latency_ms}ms jitter={args.jitter_ms}ms "
+          f"fallas={simulator.faults or 'ninguna'}")
+    print(f"{'ruta':<24}{'req/s':>10}{'media ms':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'upstream':>10}  status")
+    try:
+        for route in ROUTES:
+            if selected and route[0] not in selected:
+                continue
+            if args.expire_tokens:
+                simulator.expire_tokens()
+            result = run_route(client, simulator, route, args.requests, args.warmup)
+            results.append(result)
+            statuses = " ".join(f"{code}:{count}" for code, count in sorted(result["statuses"].items()))
+            print(f"{result['route']:<24}{result['throughput_rps']:>10.1f}{result['mean_ms']:>10.2f}"
+                  f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                  f"{result['upstream_per_request']:>10.2f}  {statuses}")
+            if args.spans:
+                print("    " + "  ".join(f"{span_name}={duration:.2f}"
+                                         for span_name, duration in result["spans_mean_ms"].items()))
+    finally:
+        simulator.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump({"config": vars(args), "results": results}, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
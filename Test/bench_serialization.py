@@ -0,0 +1,95 @@
+"""
+Benchmark de serialización JSON y compresión para payloads de árboles de categorías.
+
+Uso:
+    python Test/bench_serialization.py [respuesta_arbol.json]
+
+Si se proporciona un archivo, se usa como payload (por ejemplo, una respuesta real de
+/meli/products/categories/tree guardada con curl). Si no, se genera un árbol sintético
+con la misma forma que devuelve get_category_tree.
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Utils.JsonProvider import JSON_BACKEND, dumps_bytes  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_synthetic_tree(branching=(30, 12, 8), parent_path=None, prefix="MLM"):
+    """Genera un árbol con nodos id/name/path/breadcrumb/children."""
+    parent_path = parent_path or []
+    if not branching:
+        return []
+
+    tree = []
+    for i in range(branching[0]):
+        category_id = f"{prefix}{len(parent_path)}{i:04d}"
+        name = f"Categoría {category_id} ñandú"
+        node = {
+            "id": category_id,
+            "name": name,
+            "path": parent_path.copy(),
+            "breadcrumb": " > ".join(parent["name"] for parent in parent_path),
+            "children": []
+        }
+        node["children"] = build_synthetic_tree(
+            branching[1:], parent_path + [{"id": category_id, "name": name}], category_id)
+        tree.append(node)
+    return tree
+
+
+def timeit(func, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            payload = json.loads(f.read())
+        print(f"Payload cargado desde {sys.argv[1]}")
+    else:
+        payload = {"metaData": {"is_error": False}, "data": {"site_id": "MLM", "tree": build_synthetic_tree()}}
+        print("Payload sintético generado")
+
+    print(f"Codificador rápido: {JSON_BACKEND}\n")
+
+    ms, baseline = timeit(lambda: json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    print(f"json.dumps (Flask por defecto): {ms:8.2f} ms  {len(baseline) / 1024:10.1f} KB")
+
+    ms, fast = timeit(lambda: dumps_bytes(payload, sort_keys=True))
+    print(f"dumps_bytes (sort_keys):        {ms:8.2f} ms  {len(fast) / 1024:10.1f} KB")
+
+    ms, fast = timeit(lambda: dumps_bytes(payload))
+    print(f"dumps_bytes (sin ordenar):      {ms:8.2f} ms  {len(fast) / 1024:10.1f} KB\n")
+
+    for level in (1, 6, 9):
+        ms, compressed = timeit(lambda: gzip.compress(fast, compresslevel=level), repeat=3)
+        print(f"gzip nivel {level}:    {ms:8.2f} ms  {len(compressed) / 1024:10.1f} KB "
+              f"({len(compressed) * 100 / len(fast):.1f}%)")
+
+    if brotli is not None:
+        for quality in (4, 5, 9):
+            ms, compressed = timeit(lambda: brotli.compress(fast, quality=quality), repeat=3)
+            print(f"brotli calidad {quality}: {ms:8.2f} ms  {len(compressed) / 1024:10.1f} KB "
+                  f"({len(compressed) * 100 / len(fast):.1f}%)")
+    else:
+        print("brotli no está instalado, se omite")
+
+
+if __name__ == "__main__":
+    main()
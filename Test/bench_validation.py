@@ -0,0 +1,108 @@
+"""
+Benchmark de validación: marshmallow (schema.load) contra los validadores compilados.
+
+Uso:
+    python Test/bench_validation.py [repeticiones]
+
+Mide payloads representativos de los endpoints con más carga: creación de productos con
+muchas variantes/atributos, verificación masiva de items y creación de guías de tallas
+con muchas filas.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from marshmallow import ValidationError  # noqa: E402
+
+from App.Models.Schemas.MeliSchemas import (  # noqa: E402
+    ProductCreateRequestSchema, ProductVerifyBatchRequestSchema
+)
+from App.Models.Schemas.MeliSizeGridSchemas import SizeChartCreateRequestSchema  # noqa: E402
+from App.Utils.SchemaCompiler import CompiledSchema  # noqa: E402
+
+
+def product_payload(variations=100, attributes=50):
+    return {
+        "shop_id": "1234",
+        "product_data": {
+            "title": "Tenis deportivos para correr",
+            "category_id": "MLM1055",
+            "price": 1299.0,
+            "currency_id": "MXN",
+            "available_quantity": 10,
+            "buying_mode": "buy_it_now",
+            "condition": "new",
+            "listing_type_id": "gold_special",
+            "description": {"plain_text": "Descripción detallada del producto de prueba"},
+            "pictures": [{"id": f"PIC{index}"} for index in range(10)],
+            "attributes": [{"id": f"ATTR_{index}", "value_name": f"Valor {index}"} for index in range(attributes)],
+            "variations": [
+                {
+                    "price": 1299.0,
+                    "available_quantity": 1,
+                    "attribute_combinations": [{"id": "SIZE", "value_name": str(index)}],
+                    "picture_ids": ["PIC0"]
+                }
+                for index in range(variations)
+            ],
+            "shipping": {"mode": "me2"},
+            "sale_terms": [{"id": "WARRANTY_TYPE", "value_name": "Garantía del vendedor"}],
+            "accepts_mercadopago": True
+        }
+    }
+
+
+def size_chart_payload(rows=200):
+    return {
+        "shop_id": "1234",
+        "names": {"MLM": "Guía de tallas de tenis"},
+        "domain_id": "SNEAKERS",
+        "site_id": "MLM",
+        "main_attribute": {"attributes": [{"site_id": "MLM", "id": "MX_SIZE"}]},
+        "attributes": [{"id": "GENDER", "values": [{"name": "Hombre"}]}],
+        "rows": [
+            {"attributes": [
+                {"id": "MX_SIZE", "values": [{"name": str(22 + index * 0.5)}]},
+                {"id": "FOOT_LENGTH", "values": [{"name": f"{22 + index * 0.5} cm"}]}
+            ]}
+            for index in range(rows)
+        ]
+    }
+
+
+def verify_batch_payload(items=5000):
+    return {"shop_id": "1234", "item_ids": [f"MLM{100000 + index}" for index in range(items)]}
+
+
+def timeit(function, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            function(payload)
+        except ValidationError:
+            pass
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    cases = [
+        ("create product (100 var, 50 attr)", ProductCreateRequestSchema(), product_payload()),
+        ("create product inválido", ProductCreateRequestSchema(),
+         {"shop_id": 1, "product_data": dict(product_payload()["product_data"], price="gratis", title="x")}),
+        ("verify batch (5000 ids)", ProductVerifyBatchRequestSchema(), verify_batch_payload()),
+        ("size chart (200 filas)", SizeChartCreateRequestSchema(), size_chart_payload()),
+    ]
+
+    print(f"{'caso':<36}{'marshmallow ms':>16}{'compilado ms':>14}{'aceleración':>13}")
+    for name, schema, payload in cases:
+        compiled = CompiledSchema(schema)
+        baseline = timeit(schema.load, payload, repeat)
+        fast = timeit(compiled.load, payload, repeat)
+        print(f"{name:<36}{baseline:>16.3f}{fast:>14.3f}{baseline / fast:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+"""
+Simulador local de la API de Mercado Libre para pruebas y benchmarks sin red.
+
+Implementa los endpoints que usan los servicios (MeliProducts, MeliSizeChartService y
+AccessTokenService) con datos deterministas:
+
+    GET  /sites/<site>/categories              categorías raíz
+    GET  /categories/<id>                      categoría con children_categories y path_from_root
+    GET  /categories/<id>/attributes           atributos (requeridos, de variante, con valores)
+    GET  /sites/<site>/domain_discovery/search predicción de categoría por nombre
+    POST /pictures                             subida de imágenes
+    POST /items                                creación de productos
+    GET  /items/<id>                           producto (IDs terminados en 0 no existen)
+    GET  /items?ids=...                        multiget
+    PUT  /items/<id>                           actualización
+    GET  /users/<id>/size_charts               guías de tallas paginadas
+    GET  /size_charts/<id>                     guía de tallas
+    POST /catalog/charts                       creación de guías de tallas
+    POST /items/<id>/size_charts/<chart_id>    asociación de guía de tallas
+    POST /oauth/refresh                        renovación de token (ACCESS_TOKEN_URL)
+
+Las respuestas GET 200 llevan ETag y Cache-Control (catálogo: public, max-age=600; datos
+del vendedor: private, no-cache) y las peticiones condicionales (If-None-Match) reciben 304,
+como la caché HTTP de MeliApiClient espera.
+
+Permite configurar latencia (fija + variación) e inyectar respuestas 401, 429 y 5xx con
+probabilidades fijas y semilla determinista. También expone /__sim/config y /__sim/stats
+para cambiar la configuración y leer contadores cuando corre como proceso aparte:
+
+    python Test/meli_simulator.py --port 8089 --latency-ms 40 --fault 429=0.05 --fault 500=0.01
+
+Para usarlo dentro del proceso (ver Test/bench_routes.py):
+
+    with MeliSimulator(latency_ms=20) as simulator:
+        os.environ["MELI_API_BASE_URL"] = simulator.base_url
+        os.environ["ACCESS_TOKEN_URL"] = simulator.token_url
+        Container.meli_users.override(providers.Object(InMemoryMeliUsers()))
+"""
+import argparse
+import hashlib
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+DEFAULT_SHOP_ID = "1234"
+DEFAULT_USER_ID = 100001
+DEFAULT_ACCESS_TOKEN = "APP_USR-SIM-0"
+DEFAULT_REFRESH_TOKEN = "TG-SIM-REFRESH"
+
+# Cache-Control de las respuestas GET por prefijo de ruta (el resto: datos del vendedor)
+CATALOG_CACHE_CONTROL = "public, max-age=600, stale-while-revalidate=60"
+SELLER_CACHE_CONTROL = "private, no-cache"
+CATALOG_PREFIXES = ("/sites/", "/categories/")
+
+# Forma del árbol de categorías del sitio: hijos por nivel (8 raíces, 4 subniveles)
+CATEGORY_BRANCHING = (8, 6, 4, 3)
+SIZE_CHART_FIXTURES = 120
+
+FAULT_MESSAGES = {
+    401: ("invalid_token", "invalid access token"),
+    429: ("too_many_requests", "Too Many Requests"),
+    500: ("internal_error", "Internal server error"),
+    502: ("bad_gateway", "Bad Gateway"),
+    503: ("service_unavailable", "Service Unavailable"),
+    504: ("gateway_timeout", "Gateway Timeout"),
+}
+
+WORDS = ["Ropa", "Calzado", "Hogar", "Electrónica", "Deportes", "Juguetes", "Belleza", "Herramientas",
+         "Accesorios", "Tenis", "Camisas", "Cocina", "Audio", "Ciclismo", "Muebles", "Jardín", "Cámaras",
+         "Relojes", "Bebés", "Mascotas", "Oficina", "Autos", "Libros", "Música"]
+
+
+def _timestamp():
+    """Fecha actual con el formato de last_updated de Mercado Libre."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _stable_int(text):
+    """Entero determinista a partir de un texto (independiente de PYTHONHASHSEED)."""
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+class InMemoryMeliUsers:
+    """
+    Sustituto en memoria de App.Dynamo.MeliUsers con los mismos métodos.
+    Se usa para sobreescribir Container.meli_users en pruebas y benchmarks.
+    """
+
+    def __init__(self, users=None):
+        self.users = {}
+        for user in users or [{
+            "user_id": DEFAULT_USER_ID,
+            "shop_id": DEFAULT_SHOP_ID,
+            "access_token": DEFAULT_ACCESS_TOKEN,
+            "refresh_token": DEFAULT_REFRESH_TOKEN,
+            "token_type": "bearer",
+            "expires_in": 21600,
+            "created_at": "2024-01-01T00:00:00"
+        }]:
+            self.users[user["user_id"]] = dict(user)
+        self._lock = threading.Lock()
+
+    def create_user(self, user_id, access_token, created_at, expires_in, refresh_token, shop_id, token_type):
+        with self._lock:
+            self.users[user_id] = {
+                "user_id": user_id, "access_token": access_token, "created_at": created_at,
+                "expires_in": expires_in, "refresh_token": refresh_token, "shop_id": str(shop_id),
+                "token_type": token_type
+            }
+        return {"message": "User created successfully"}
+
+    def get_user_by_id(self, user_id):
+        user = self.users.get(user_id)
+        return dict(user) if user else None
+
+    def get_users_by_shop_id(self, shop_id):
+        return [dict(user) for user in self.users.values() if user["shop_id"] == str(shop_id)]
+
+    def update_user(self, user_id, updates):
+        with self._lock:
+            self.users.setdefault(user_id, {"user_id": user_id}).update(updates)
+        return {"message": "User updated successfully"}
+
+    def delete_user(self, user_id):
+        with self._lock:
+            self.users.pop(user_id, None)
+        return {"message": "User deleted successfully"}
+
+
+class MeliSimulator:
+    """
+    Servidor HTTP local (hilo en segundo plano) que simula la API de Mercado Libre.
+
+    Args:
+        latency_ms (float): Latencia fija añadida a cada respuesta
+        jitter_ms (float): Variación aleatoria máxima sobre la latencia
+        faults (dict): Probabilidad de respuesta por código, ej: {429: 0.05, 500: 0.01}
+        seed (int): Semilla para latencias y fallas (mismas secuencias en cada corrida)
+        host (str), port (int): Dirección de escucha; port=0 elige un puerto libre
+    """
+
+    def __init__(self, latency_ms=0, jitter_ms=0, faults=None, seed=42, host="127.0.0.1", port=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.faults = dict(faults or {})
+        self.seed = seed
+        self.host = host
+        self.port = port
+        self.stats = Counter()
+        self.valid_tokens = {DEFAULT_ACCESS_TOKEN}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(900000001)
+        self._server = None
+        self._thread = None
+
+        self.categories = {}
+        self.site_roots = []
+        self.items = {}
+        self.size_charts = {}
+        self.associations = {}
+        self._build_fixtures()
+        self.app = self._create_app()
+
+    # ------------------------------------------------------------------ ciclo de vida
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def token_url(self):
+        return f"{self.base_url}/oauth/refresh"
+
+    def start(self):
+        """Inicia el servidor en un hilo y devuelve la URL base."""
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        self._server = make_server(self.host, self.port, self.app, threaded=True)
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever, name="meli-simulator", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def configure(self, latency_ms=None, jitter_ms=None, faults=None, seed=None):
+        """Cambia latencia, fallas o semilla en caliente."""
+        with self._lock:
+            if latency_ms is not None:
+                self.latency_ms = latency_ms
+            if jitter_ms is not None:
+                self.jitter_ms = jitter_ms
+            if faults is not None:
+                self.faults = {int(code): float(rate) for code, rate in faults.items()}
+            if seed is not None:
+                self.seed = seed
+                self._random = random.Random(seed)
+
+    def expire_tokens(self):
+        """Invalida todos los tokens emitidos: la siguiente llamada recibirá 401 y forzará la renovación."""
+        with self._lock:
+            self.valid_tokens = set()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = Counter()
+
+    # ------------------------------------------------------------------ fixtures
+
+    def _build_fixtures(self):
+        def build(parent_path, level, prefix):
+            if level >= len(CATEGORY_BRANCHING):
+                return []
+            children = []
+            for index in range(CATEGORY_BRANCHING[level]):
+                category_id = f"{prefix}{index + 1}"
+                word = WORDS[_stable_int(category_id) % len(WORDS)]
+                name = f"{word} {category_id[3:]}"
+                path = parent_path + [{"id": category_id, "name": name}]
+                self.categories[category_id] = {"id": category_id, "name": name, "path_from_root": path,
+                                                "children_categories": []}
+                grandchildren = build(path, level + 1, category_id)
+                self.categories[category_id]["children_categories"] = [
+                    {"id": child, "name": self.categories[child]["name"],
+                     "total_items_in_this_category": _stable_int(child) % 5000}
+                    for child in grandchildren
+                ]
+                children.append(category_id)
+            return children
+
+        self.site_roots = build([], 0, "MLM")
+
+        for index in range(SIZE_CHART_FIXTURES):
+            chart_id = str(500000 + index)
+            self.size_charts[chart_id] = self._size_chart(chart_id, {
+                "names": {"MLM": f"Guía {index}"},
+                "domain_id": ["SNEAKERS", "T_SHIRTS", "PANTS"][index % 3],
+                "site_id": "MLM",
+                "main_attribute": {"attributes": [{"site_id": "MLM", "id": "MX_SIZE"}]},
+                "rows": [{"attributes": [{"id": "MX_SIZE", "values": [{"name": str(22 + size)}]}]}
+                         for size in range(6)]
+            })
+
+    @staticmethod
+    def _size_chart(chart_id, data):
+        chart = dict(data)
+        chart["id"] = chart_id
+        chart["rows"] = [dict(row, id=f"{chart_id}:{position + 1}") for position, row in enumerate(data.get("rows") or [])]
+        return chart
+
+    @staticmethod
+    def category_attributes(category_id):
+        """Atributos deterministas de una categoría."""
+        attributes = [
+            {"id": "BRAND", "name": "Marca", "value_type": "string", "value_max_length": 255,
+             "tags": {"required": True}},
+            {"id": "MODEL", "name": "Modelo", "value_type": "string", "value_max_length": 255,
+             "tags": {"required": True}},
+            {"id": "COLOR", "name": "Color", "value_type": "list", "tags": {"allow_variations": True},
+             "values": [{"id": str(52000 + index), "name": name}
+                        for index, name in enumerate(["Negro", "Blanco", "Rojo", "Azul", "Verde"])]},
+            {"id": "SIZE", "name": "Talla", "value_type": "string", "tags": {"allow_variations": True,
+                                                                            "variation_attribute": True}},
+            {"id": "GTIN", "name": "Código universal de producto", "value_type": "string",
+             "tags": {"multivalued": True}},
+            {"id": "PACKAGE_WEIGHT", "name": "Peso del paquete", "value_type": "number_unit",
+             "allowed_units": [{"id": "g", "name": "g"}, {"id": "kg", "name": "kg"}], "tags": {}},
+        ]
+        if _stable_int(category_id) % 2:
+            attributes.append({"id": "GENDER", "name": "Género", "value_type": "list", "tags": {"required": True},
+                               "values": [{"id": "339666", "name": "Hombre"}, {"id": "339665", "name": "Mujer"}]})
+        return attributes
+
+    def item(self, item_id):
+        """Item creado en el simulador o generado de forma determinista (None si no existe)."""
+        if item_id in self.items:
+            return self.items[item_id]
+        if item_id.endswith("0"):
+            return None
+        seed = _stable_int(item_id)
+        return {
+            "id": item_id,
+            "title": f"Producto {item_id}",
+            "category_id": f"MLM{seed % 8 + 1}{seed % 6 + 1}",
+            "price": float(100 + seed % 5000),
+            "currency_id": "MXN",
+            "available_quantity": seed % 50,
+            "status": "active" if seed % 7 else "paused",
+            "sub_status": [],
+            "permalink": f"https://articulo.mercadolibre.com.mx/{item_id}",
+            "last_updated": "2024-01-01T00:00:00.000Z",
+            "attributes": [{"id": "BRAND", "value_name": "Marca de prueba"}],
+            "variations": [{"id": seed * 10 + index, "price": float(100 + seed % 5000), "available_quantity": index,
+                            "attribute_combinations": [{"id": "SIZE", "value_name": str(24 + index)}]}
+                           for index in range(3)]
+        }
+
+    # ------------------------------------------------------------------ aplicación
+
+    def _next_id(self):
+        with self._lock:
+            return next(self._ids)
+
+    def _create_app(self):
+        app = Flask("meli_simulator")
+        simulator = self
+
+        def error(status, code, message):
+            return jsonify({"message": message, "error": code, "status": status, "cause": []}), status
+
+        @app.before_request
+        def simulate():
+            if request.path.startswith("/__sim"):
+                return None
+            route = request.url_rule.rule if request.url_rule else request.path
+            with simulator._lock:
+                simulator.stats[f"{request.method} {route}"] += 1
+                simulator.stats["requests"] += 1
+                delay = simulator.latency_ms + (simulator._random.uniform(0, simulator.jitter_ms)
+                                                if simulator.jitter_ms else 0)
+                fault = None
+                if request.path != "/oauth/refresh":
+                    draw = simulator._random.random()
+                    for code, rate in simulator.faults.items():
+                        if draw < rate:
+                            fault = code
+                            break
+                        draw -= rate
+                token_valid = request.headers.get("Authorization", "").removeprefix("Bearer ") \
+                    in simulator.valid_tokens
+            if delay:
+                time.sleep(delay / 1000)
+
+            if fault is not None:
+                simulator.stats[f"fault_{fault}"] += 1
+                return error(fault, *FAULT_MESSAGES.get(fault, ("error", "Simulated error")))
+            if request.path != "/oauth/refresh" and not token_valid:
+                simulator.stats["unauthorized"] += 1
+                return error(401, *FAULT_MESSAGES[401])
+            return None
+
+        @app.after_request
+        def conditional(response):
+            if request.method != "GET" or response.status_code != 200 or request.path.startswith("/__sim"):
+                return response
+            response.headers["Cache-Control"] = (CATALOG_CACHE_CONTROL if request.path.startswith(CATALOG_PREFIXES)
+                                                 else SELLER_CACHE_CONTROL)
+            response.add_etag()
+            response.make_conditional(request)
+            if response.status_code == 304:
+                with simulator._lock:
+                    simulator.stats["not_modified"] += 1
+            return response
+
+        @app.route("/oauth/refresh", methods=["POST"])
+        def refresh_token():
+            body = request.get_json(silent=True) or {}
+            if not body.get("refresh_token"):
+                return error(400, "invalid_grant", "refresh_token requerido")
+            token = f"APP_USR-SIM-{simulator._next_id()}"
+            with simulator._lock:
+                simulator.valid_tokens.add(token)
+                simulator.stats["token_refreshes"] += 1
+            return jsonify({"access_token": token, "refresh_token": body["refresh_token"], "token_type": "bearer",
+                            "expires_in": 21600, "user_id": DEFAULT_USER_ID})
+
+        @app.route("/sites/<site_id>/categories")
+        def site_categories(site_id):
+            return jsonify([{"id": category_id, "name": simulator.categories[category_id]["name"]}
+                            for category_id in simulator.site_roots])
+
+        @app.route("/categories/<category_id>")
+        def category(category_id):
+            data = simulator.categories.get(category_id)
+            if data is None:
+                return error(404, "not_found", f"Category {category_id} not found")
+            return jsonify(data)
+
+        @app.route("/categories/<category_id>/attributes")
+        def category_attributes(category_id):
+            if category_id not in simulator.categories:
+                return error(404, "not_found", f"Category {category_id} not found")
+            return jsonify(simulator.category_attributes(category_id))
+
+        @app.route("/sites/<site_id>/domain_discovery/search")
+        def domain_discovery(site_id):
+            query = request.args.get("q", "")
+            leaves = [category_id for category_id, data in simulator.categories.items()
+                      if not data["children_categories"]]
+            start = _stable_int(query) % len(leaves)
+            results = []
+            for category_id in (leaves * 2)[start:start + 3]:
+                data = simulator.categories[category_id]
+                results.append({"category_id": category_id, "category_name": data["name"],
+                                "domain_id": f"{site_id}-{data['name'].split()[0].upper()}",
+                                "domain_name": data["name"].split()[0], "attributes": []})
+            return jsonify(results)
+
+        @app.route("/pictures", methods=["POST"])
+        def pictures():
+            picture_id = f"{simulator._next_id()}-MLM"
+            return jsonify({"id": picture_id, "max_size": "1200x1200",
+                            "variations": [{"size": "1200x1200", "url": f"{simulator.base_url}/img/{picture_id}.jpg"}]})
+
+        @app.route("/items", methods=["POST"])
+        def create_item():
+            body = request.get_json(silent=True) or {}
+            if body.get("category_id") not in simulator.categories:
+                return error(400, "validation_error", "item.category_id is invalid")
+            item_id = f"MLM{simulator._next_id()}"
+            name = simulator.categories[body["category_id"]]["name"]
+            item = dict(body, id=item_id, status="active", sub_status=[],
+                        domain_id=f"MLM-{name.split()[0].upper()}",
+                        permalink=f"https://articulo.mercadolibre.com.mx/{item_id}")
+            item["last_updated"] = _timestamp()
+            with simulator._lock:
+                simulator.items[item_id] = item
+            return jsonify(item), 201
+
+        @app.route("/items", methods=["GET"])
+        def multiget():
+            attributes = [name for name in request.args.get("attributes", "").split(",") if name]
+            results = []
+            for item_id in [value for value in request.args.get("ids", "").split(",") if value]:
+                item = simulator.item(item_id)
+                if item is None:
+                    results.append({"code": 404, "body": {"message": f"Item with id {item_id} not found",
+                                                          "error": "not_found", "status": 404, "cause": []}})
+                    continue
+                if attributes:
+                    item = {key: value for key, value in item.items() if key in attributes}
+                results.append({"code": 200, "body": item})
+            return jsonify(results)
+
+        @app.route("/items/<item_id>", methods=["GET"])
+        def get_item(item_id):
+            item = simulator.item(item_id)
+            if item is None:
+                return error(404, "not_found", f"Item with id {item_id} not found")
+            attributes = [name for name in request.args.get("attributes", "").split(",") if name]
+            if attributes:
+                item = {key: value for key, value in item.items() if key in attributes}
+            return jsonify(item)
+
+        @app.route("/items/<item_id>", methods=["PUT"])
+        def update_item(item_id):
+            item = simulator.item(item_id)
+            if item is None:
+                return error(404, "not_found", f"Item with id {item_id} not found")
+            item = dict(item, **(request.get_json(silent=True) or {}))
+            item["last_updated"] = _timestamp()
+            with simulator._lock:
+                simulator.items[item_id] = item
+            return jsonify(item)
+
+        @app.route("/users/<user_id>/size_charts")
+        def list_size_charts(user_id):
+            offset = int(request.args.get("offset", 0))
+            limit = min(int(request.args.get("limit", 50)), 50)
+            charts = list(simulator.size_charts.values())
+            return jsonify({"charts": charts[offset:offset + limit],
+                            "paging": {"total": len(charts), "offset": offset, "limit": limit}})
+
+        @app.route("/size_charts/<chart_id>")
+        def get_size_chart(chart_id):
+            chart = simulator.size_charts.get(chart_id)
+            if chart is None:
+                return error(404, "not_found", f"Chart {chart_id} not found")
+            return jsonify(chart)
+
+        @app.route("/catalog/charts", methods=["POST"])
+        def create_size_chart():
+            body = request.get_json(silent=True) or {}
+            if not body.get("rows"):
+                return error(400, "validation_error", "rows is required")
+            chart = simulator._size_chart(str(simulator._next_id()), body)
+            with simulator._lock:
+                simulator.size_charts[chart["id"]] = chart
+            return jsonify(chart), 201
+
+        @app.route("/items/<item_id>/size_charts/<chart_id>", methods=["POST"])
+        def associate_size_chart(item_id, chart_id):
+            if simulator.item(item_id) is None:
+                return error(404, "not_found", f"Item with id {item_id} not found")
+            if chart_id not in simulator.size_charts:
+                return error(404, "not_found", f"Chart {chart_id} not found")
+            with simulator._lock:
+                simulator.associations[item_id] = chart_id
+            return jsonify({"item_id": item_id, "chart_id": chart_id, "status": "associated"})
+
+        @app.route("/__sim/config", methods=["GET", "POST"])
+        def sim_config():
+            if request.method == "POST":
+                body = request.get_json(silent=True) or {}
+                simulator.configure(body.get("latency_ms"), body.get("jitter_ms"), body.get("faults"), body.get("seed"))
+                if body.get("expire_tokens"):
+                    simulator.expire_tokens()
+            return jsonify({"latency_ms": simulator.latency_ms, "jitter_ms": simulator.jitter_ms,
+                            "faults": simulator.faults, "seed": simulator.seed})
+
+        @app.route("/__sim/stats", methods=["GET", "DELETE"])
+        def sim_stats():
+            if request.method == "DELETE":
+                simulator.reset_stats()
+            return jsonify(dict(simulator.stats))
+
+        return app
+
+
+def parse_faults(values):
+    """Convierte ["429=0.05", "500=0.01"] en {429: 0.05, 500: 0.01}."""
+    faults = {}
+    for value in values or []:
+        code, rate = value.split("=", 1)
+        faults[int(code)] = float(rate)
+    return faults
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador local de la API de Mercado Libre")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--fault", action="append", help="CODIGO=PROBABILIDAD, ej: 429=0.05 (repetible)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    simulator = MeliSimulator(args.latency_ms, args.jitter_ms, parse_faults(args.fault), args.seed,
+                              args.host, args.port)
+    simulator.start()
+    print(f"Simulador escuchando en {simulator.base_url} (ACCESS_TOKEN_URL={simulator.token_url})")
+    try:
+        simulator._thread.join()
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
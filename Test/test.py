@@ -10,7 +10,7 @@ shop_id = "126526290"  # Usa un ID de tienda válido
 # 1. Buscar categoría
 print("1. Buscando categoría...")
 r = requests.post(
-    f"{base_url}/meli/products/category",
+    f"{base_url}/meli/products/categories",
     json={"shop_id": shop_id, "product_name": "Smartphone Samsung Galaxy"}
 )
 print(f"Status: {r.status_code}")
@@ -22,7 +22,7 @@ category_id = category_data.get("data", {}).get("categories", [])[0].get("catego
 if category_id:
     print("\n2. Obteniendo atributos de categoría...")
     r = requests.post(
-        f"{base_url}/meli/products/category/attributes",
+        f"{base_url}/meli/products/categories/attributes",
         json={"shop_id": shop_id, "category_id": category_id}
     )
     print(f"Status: {r.status_code}")
@@ -70,7 +70,7 @@ if category_id and image_id:
     }
 
     r = requests.post(
-        f"{base_url}/meli/products",
+        f"{base_url}/meli/products/create",
         json={"shop_id": shop_id, "product_data": product_data}
     )
     print(f"Status: {r.status_code}")
@@ -91,7 +91,7 @@ if category_id and image_id:
         # 6. Actualizar el producto
         print("\n6. Actualizando producto...")
         r = requests.post(
-            f"{base_url}/meli/products/update",
+            f"{base_url}/meli/products/update/product",
             json={
                 "shop_id": shop_id,
                 "item_id": item_id,
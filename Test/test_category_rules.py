@@ -0,0 +1,53 @@
+"""
+Pruebas de las reglas combinadas por categoría (MeliRulesHelper.build_category_rules).
+
+Uso:
+    python -m unittest Test/test_category_rules.py
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Utils.MeliRulesHelper import MeliRulesHelper  # noqa: E402
+
+CATEGORY_ATTRIBUTES = {
+    "required_attributes": [
+        {"id": "BRAND", "name": "Marca", "value_type": "string", "tags": {"required": True}},
+    ],
+    "optional_attributes": [
+        {"id": "GTIN", "name": "Código universal", "value_type": "string", "tags": {"catalog_required": True}},
+        {"id": "SIZE", "name": "Talla", "value_type": "list", "tags": {"allow_variations": True},
+         "values": [{"id": "1", "name": "M"}]},
+    ]
+}
+
+
+class CategoryRulesTest(unittest.TestCase):
+
+    def setUp(self):
+        content, self.etag = MeliRulesHelper.build_category_rules("MLM1055", CATEGORY_ATTRIBUTES)
+        self.rules = content["rules"]
+        self.category = content["category"]
+
+    def test_required_matches_required_ids(self):
+        required = {rule["id"] for rule in self.category["required_attributes"] + self.category["optional_attributes"]
+                    if rule["required"]}
+        self.assertEqual(required, {"BRAND"})
+        self.assertEqual(self.rules["attributes"]["required_ids"], ["BRAND"])
+
+    def test_catalog_required_is_reported_apart(self):
+        gtin = next(rule for rule in self.category["optional_attributes"] if rule["id"] == "GTIN")
+        self.assertFalse(gtin["required"])
+        self.assertTrue(gtin["catalog_required"])
+        self.assertEqual(self.rules["attributes"]["catalog_required_ids"], ["GTIN"])
+
+    def test_variation_attributes_and_etag(self):
+        self.assertEqual(self.rules["variations"]["allowed_attributes"], ["SIZE"])
+        _, etag = MeliRulesHelper.build_category_rules("MLM1055", CATEGORY_ATTRIBUTES)
+        self.assertEqual(etag, self.etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Pruebas del validador local de atributos por categoría (App/Utils/CategoryValidator.py).
+
+Uso:
+    python -m unittest Test/test_category_validator.py
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Utils.CategoryValidator import CategoryValidator  # noqa: E402
+
+CATEGORY_ATTRIBUTES = {
+    "required_attributes": [
+        {"id": "BRAND", "name": "Marca", "value_type": "string", "tags": {"required": True}},
+    ],
+    "optional_attributes": [
+        {"id": "GTIN", "name": "Código universal", "value_type": "string", "tags": {"catalog_required": True}},
+        {"id": "LENGTH", "name": "Largo", "value_type": "number_unit", "tags": {},
+         "allowed_units": [{"id": "cm"}, {"id": "m"}]},
+        {"id": "PIECES", "name": "Piezas", "value_type": "number", "tags": {}},
+    ]
+}
+
+
+def codes(issues):
+    return [(issue["attribute_id"], issue["code"]) for issue in issues]
+
+
+class CategoryValidatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = CategoryValidator("MLM1055", CATEGORY_ATTRIBUTES)
+
+    def test_missing_required_is_an_error(self):
+        result = self.validator.validate({"attributes": [{"id": "GTIN", "value_name": "7501"}]})
+        self.assertFalse(result["valid"])
+        self.assertEqual(codes(result["errors"]), [("BRAND", "missing_required")])
+
+    def test_catalog_required_only_blocks_catalog_listings(self):
+        product = {"attributes": [{"id": "BRAND", "value_name": "Nike"}]}
+        result = self.validator.validate(product)
+        self.assertTrue(result["valid"])
+        self.assertEqual(codes(result["warnings"]), [("GTIN", "missing_catalog_required")])
+
+        result = self.validator.validate(dict(product, catalog_listing=True))
+        self.assertFalse(result["valid"])
+        self.assertEqual(codes(result["errors"]), [("GTIN", "missing_required")])
+
+    def test_number_unit_with_or_without_space(self):
+        for value in ("10 cm", "10cm", "2,5 m", "0.5m"):
+            result = self.validator.validate({"attributes": [{"id": "BRAND", "value_name": "Nike"},
+                                                             {"id": "LENGTH", "value_name": value}]})
+            self.assertTrue(result["valid"], value)
+        for value in ("10", "cm", "10 kg", "10 cm extra"):
+            result = self.validator.validate({"attributes": [{"id": "BRAND", "value_name": "Nike"},
+                                                             {"id": "LENGTH", "value_name": value}]})
+            self.assertEqual(codes(result["errors"]), [("LENGTH", "invalid_number")], value)
+
+    def test_plain_numbers(self):
+        for value, valid in (("3", True), ("3,5", True), ("3 pz", False), ("tres", False)):
+            result = self.validator.validate({"attributes": [{"id": "BRAND", "value_name": "Nike"},
+                                                             {"id": "PIECES", "value_name": value}]})
+            self.assertEqual(result["valid"], valid, value)
+
+
+if __name__ == "__main__":
+    unittest.main()
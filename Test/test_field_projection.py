@@ -0,0 +1,47 @@
+"""
+Pruebas de las proyecciones de campos (App/Utils/FieldProjection.py).
+
+Uso:
+    python -m unittest Test/test_field_projection.py
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Utils.FieldProjection import compile_projection, normalize_fields, top_level_fields  # noqa: E402
+
+ATTRIBUTE = {"id": "BRAND", "name": "Marca", "tags": {"required": True},
+             "values": [{"id": 1, "name": "Nike"}, {"id": 2, "name": "Adidas"}]}
+
+
+class FieldProjectionTest(unittest.TestCase):
+
+    def test_normalize_sorts_and_dedupes(self):
+        self.assertEqual(normalize_fields(" price,status,price ,"), "price,status")
+        self.assertEqual(normalize_fields(["status", "price"]), "price,status")
+        self.assertEqual(normalize_fields(None), "")
+        self.assertIsNone(compile_projection(""))
+
+    def test_top_level_fields(self):
+        self.assertEqual(top_level_fields("values.id,id,tags.required"), ["id", "tags", "values"])
+
+    def test_nested_fields_on_lists(self):
+        project = compile_projection("id,values.id")
+        self.assertEqual(project(ATTRIBUTE), {"id": "BRAND", "values": [{"id": 1}, {"id": 2}]})
+        self.assertEqual(project([ATTRIBUTE]), [{"id": "BRAND", "values": [{"id": 1}, {"id": 2}]}])
+
+    def test_whole_field_wins_over_its_subfields(self):
+        expected = {"values": ATTRIBUTE["values"]}
+        self.assertEqual(compile_projection("values,values.id")(ATTRIBUTE), expected)
+        self.assertEqual(compile_projection("values.id,values")(ATTRIBUTE), expected)
+        self.assertEqual(compile_projection("tags,tags.required.x")(ATTRIBUTE), {"tags": {"required": True}})
+
+    def test_missing_fields_are_omitted(self):
+        self.assertEqual(compile_projection("id,missing.field")(ATTRIBUTE), {"id": "BRAND"})
+        self.assertEqual(compile_projection("name.first")(ATTRIBUTE), {"name": "Marca"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Pruebas de la caché HTTP de lecturas (App/Utils/HttpCache.py).
+
+Uso:
+    python -m unittest Test/test_http_cache.py
+"""
+import os
+import sys
+import unittest
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Utils.HttpCache import HttpCache  # noqa: E402
+
+BASE = "https://api.mercadolibre.com"
+SELLER = ("user", 100001)
+
+
+def make_response(cache_control="private, max-age=300", status_code=200, etag='"v1"', vary=None, content=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content or b'{"id": "MLM1"}'
+    response.headers = CaseInsensitiveDict({"Content-Type": "application/json", "Cache-Control": cache_control})
+    if etag:
+        response.headers["ETag"] = etag
+    if vary:
+        response.headers["Vary"] = vary
+    return response
+
+
+class HttpCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = HttpCache(maxsize=64, max_stale=60, retention=3600)
+
+    def store(self, endpoint, params=None, **kwargs):
+        resource = HttpCache.resource_key(f"{BASE}{endpoint}", params)
+        return resource, self.cache.store(resource, SELLER, make_response(**kwargs))
+
+    def test_storable_responses(self):
+        _, entry = self.store("/items/MLM1")
+        self.assertTrue(entry.is_fresh())
+        self.assertIsNone(self.store("/items/MLM2", cache_control="no-store")[1])
+        self.assertIsNone(self.store("/items/MLM3", cache_control="private", etag=None)[1])
+        self.assertIsNone(self.store("/items/MLM4", status_code=404)[1])
+
+    def test_public_entries_are_shared(self):
+        resource, _ = self.store("/categories/MLM1055", cache_control="public, max-age=600")
+        self.assertIsNotNone(self.cache.lookup(resource, ("user", 200002)))
+        resource, _ = self.store("/items/MLM1")
+        self.assertIsNone(self.cache.lookup(resource, ("user", 200002)))
+
+    def test_responses_varying_by_request_headers_are_not_stored(self):
+        self.assertIsNone(self.store("/items/MLM1", vary="Authorization")[1])
+        self.assertIsNone(self.store("/items/MLM2", vary="Accept-Encoding, Accept-Language")[1])
+        self.assertIsNone(self.store("/items/MLM3", vary="*")[1])
+        self.assertIsNotNone(self.store("/items/MLM4", vary="Accept-Encoding")[1])
+
+    def test_seller_entry_wins_over_public_copy(self):
+        resource = HttpCache.resource_key(f"{BASE}/items/MLM1")
+        self.cache.store(resource, SELLER, make_response(content=b'{"id": "MLM1", "seller": true}'))
+        self.cache.store(resource, ("user", 200002), make_response("public, max-age=300"))
+        self.assertEqual(self.cache.lookup(resource, SELLER).content, b'{"id": "MLM1", "seller": true}')
+        self.assertEqual(self.cache.lookup(resource, ("user", 300003)).content, b'{"id": "MLM1"}')
+
+    def test_write_invalidates_dependent_reads(self):
+        item, _ = self.store("/items/MLM1")
+        projected, _ = self.store("/items/MLM1", {"attributes": "id,price"})
+        multiget, _ = self.store("/items", {"ids": "MLM1,MLM2", "attributes": "id,price"})
+        other_multiget, _ = self.store("/items", {"ids": "MLM2,MLM3"})
+        other_item, _ = self.store("/items/MLM2", {"attributes": "id,price"})
+
+        self.cache.invalidate(f"{BASE}/items/MLM1", SELLER)
+
+        for resource in (item, projected, multiget):
+            self.assertIsNone(self.cache.lookup(resource, SELLER), resource)
+        for resource in (other_multiget, other_item):
+            self.assertIsNotNone(self.cache.lookup(resource, SELLER), resource)
+
+    def test_dependency_paths(self):
+        self.assertEqual(HttpCache.dependency_paths(f"{BASE}/items?attributes=id&ids=MLM1%2CMLM2"),
+                         [f"{BASE}/items", f"{BASE}/items/MLM1", f"{BASE}/items/MLM2"])
+        self.assertEqual(HttpCache.dependency_paths(f"{BASE}/items/MLM1"), [f"{BASE}/items/MLM1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
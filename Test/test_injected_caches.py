@@ -0,0 +1,75 @@
+"""
+Pruebas de inyección de dependencias en los servicios.
+
+Las cachés (TTLCache, TieredCache), el índice de guías y el batcher definen __len__, por lo
+que una instancia vacía es falsa: los servicios deben usar la instancia inyectada
+(comparando con None) y no crear una privada.
+
+Uso:
+    python -m unittest Test/test_injected_caches.py
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Services.AccessTokenService import AccessTokenService  # noqa: E402
+from App.Services.MeliApiClient import MeliApiClient  # noqa: E402
+from App.Services.MeliNotificationsService import MeliNotificationsService  # noqa: E402
+from App.Services.MeliProducts import MeliProducts  # noqa: E402
+from App.Services.MeliSizeChartService import MeliSizeChartService  # noqa: E402
+from App.Services.MeliUsersService import MeliUsersService  # noqa: E402
+from App.Utils.Batcher import KeyedBatcher  # noqa: E402
+from App.Utils.Cache import TTLCache  # noqa: E402
+from App.Utils.ItemMirror import ItemMirror  # noqa: E402
+from App.Utils.TieredCache import TieredCache  # noqa: E402
+from Test.meli_simulator import InMemoryMeliUsers  # noqa: E402
+
+
+class InjectedCachesTest(unittest.TestCase):
+
+    def setUp(self):
+        users = InMemoryMeliUsers()
+        self.users_service = MeliUsersService(users, AccessTokenService(users))
+
+    def test_products_keep_empty_injected_caches(self):
+        client = MeliApiClient(self.users_service)
+        tree, attributes, rules = TTLCache(maxsize=1, ttl=1), TTLCache(maxsize=1, ttl=1), TTLCache(maxsize=1, ttl=1)
+        mirror = ItemMirror(TieredCache(TTLCache(maxsize=1, ttl=1)))
+        self.assertEqual(len(tree), 0)
+
+        products = MeliProducts(self.users_service, categoryTreeCache=tree, categoryAttributesCache=attributes,
+                                categoryRulesCache=rules, meliApiClient=client, itemMirror=mirror)
+
+        self.assertIs(products.categoryTreeCache, tree)
+        self.assertIs(products.categoryAttributesCache, attributes)
+        self.assertIs(products.categoryRulesCache, rules)
+        self.assertIs(products.meliApiClient, client)
+        self.assertIs(products.itemMirror, mirror)
+
+    def test_size_charts_keep_empty_injected_caches(self):
+        charts, runs = TieredCache(TTLCache(maxsize=1, ttl=1)), TieredCache(TTLCache(maxsize=1, ttl=1))
+        index = TTLCache(maxsize=1, ttl=1)
+
+        service = MeliSizeChartService(self.users_service, size_chart_cache=charts, batch_run_cache=runs,
+                                       index_cache=index)
+
+        self.assertIs(service.size_chart_cache, charts)
+        self.assertIs(service.batch_run_cache, runs)
+        self.assertIs(service.index_cache, index)
+
+    def test_notifications_keep_empty_injected_batcher(self):
+        dedupe = TieredCache(TTLCache(maxsize=1, ttl=1))
+        batcher = KeyedBatcher(max_delay=60, name="test")
+        self.assertEqual(len(batcher), 0)
+
+        service = MeliNotificationsService(self.users_service, MeliProducts(self.users_service),
+                                           dedupe_cache=dedupe, batcher=batcher)
+
+        self.assertIs(service.dedupe_cache, dedupe)
+        self.assertIs(service.batcher, batcher)
+
+
+if __name__ == "__main__":
+    unittest.main()
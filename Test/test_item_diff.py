@@ -0,0 +1,105 @@
+"""
+Pruebas de la comparación de actualizaciones con el item publicado (App/Utils/ItemDiff.py).
+
+Uso:
+    python -m unittest Test/test_item_diff.py
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Utils.ItemDiff import diff_update  # noqa: E402
+
+ITEM = {
+    "id": "MLM1000001",
+    "title": "Tenis Running  Hombre",
+    "price": 1299.0,
+    "available_quantity": 5,
+    "pictures": [{"id": "P1", "url": "https://img/1.jpg"}, {"id": "P2", "url": "https://img/2.jpg"}],
+    "attributes": [
+        {"id": "BRAND", "value_id": "14810", "value_name": "Nike"},
+        {"id": "MODEL", "value_id": None, "value_name": "Air Zoom"},
+    ],
+    "variations": [
+        {"id": 11, "price": 1299.0, "available_quantity": 2,
+         "attribute_combinations": [{"id": "SIZE", "value_id": "3189", "value_name": "26"}]},
+        {"id": 12, "price": 1299.0, "available_quantity": 3,
+         "attribute_combinations": [{"id": "SIZE", "value_id": "3190", "value_name": "27"}]},
+    ]
+}
+
+
+class ItemDiffTest(unittest.TestCase):
+
+    def test_numbers_compare_as_floats(self):
+        changes, unchanged = diff_update({"price": 1299, "available_quantity": 5.0}, ITEM)
+        self.assertEqual(changes, {})
+        self.assertEqual(sorted(unchanged), ["available_quantity", "price"])
+
+        changes, _ = diff_update({"price": 1299.5, "available_quantity": 4}, ITEM)
+        self.assertEqual(changes, {"price": 1299.5, "available_quantity": 4})
+
+    def test_booleans_are_not_numbers(self):
+        changes, _ = diff_update({"available_quantity": True}, dict(ITEM, available_quantity=1))
+        self.assertEqual(changes, {"available_quantity": True})
+
+    def test_title_ignores_repeated_whitespace_only(self):
+        self.assertEqual(diff_update({"title": " Tenis Running Hombre "}, ITEM)[0], {})
+        self.assertEqual(diff_update({"title": "tenis running hombre"}, ITEM)[0], {"title": "tenis running hombre"})
+
+    def test_pictures_compare_by_id_and_order(self):
+        self.assertEqual(diff_update({"pictures": [{"id": "P1"}, {"id": "P2"}]}, ITEM)[0], {})
+        reordered = [{"id": "P2"}, {"id": "P1"}]
+        self.assertEqual(diff_update({"pictures": reordered}, ITEM)[0], {"pictures": reordered})
+        by_source = [{"source": "https://img/1.jpg"}]
+        self.assertEqual(diff_update({"pictures": by_source}, ITEM)[0], {"pictures": by_source})
+
+    def test_attributes_by_value_id(self):
+        same = [{"id": "BRAND", "value_id": 14810, "value_name": "Otra marca"}]
+        self.assertEqual(diff_update({"attributes": same}, ITEM)[0], {})
+        changed = [{"id": "BRAND", "value_id": "9999"}]
+        self.assertEqual(diff_update({"attributes": changed}, ITEM)[0], {"attributes": changed})
+
+    def test_attributes_by_value_name(self):
+        same = [{"id": "MODEL", "value_name": " Air  Zoom"}]
+        self.assertEqual(diff_update({"attributes": same}, ITEM)[0], {})
+        changed = [{"id": "MODEL", "value_name": "air zoom"}]
+        self.assertEqual(diff_update({"attributes": changed}, ITEM)[0], {"attributes": changed})
+
+    def test_only_changed_attributes_are_sent(self):
+        attributes = [{"id": "BRAND", "value_id": "14810"}, {"id": "MODEL", "value_name": "Pegasus"},
+                      {"id": "COLOR", "value_name": "Negro"}]
+        changes, unchanged = diff_update({"attributes": attributes}, ITEM)
+        self.assertEqual(changes, {"attributes": attributes[1:]})
+        self.assertEqual(unchanged, [])
+
+    def test_variations_with_ids(self):
+        same = [{"id": 11, "available_quantity": 2}, {"id": 12, "price": 1299}]
+        self.assertEqual(diff_update({"variations": same}, ITEM)[0], {})
+
+        changed = [{"id": 11, "available_quantity": 1}, {"id": 12}]
+        self.assertEqual(diff_update({"variations": changed}, ITEM)[0], {"variations": changed})
+
+        combination = [{"id": 11, "attribute_combinations": [{"id": "SIZE", "value_name": "28"}]}, {"id": 12}]
+        self.assertEqual(diff_update({"variations": combination}, ITEM)[0], {"variations": combination})
+
+    def test_variations_missing_or_without_ids_are_sent_in_full(self):
+        missing = [{"id": 11, "available_quantity": 2}]
+        self.assertEqual(diff_update({"variations": missing}, ITEM)[0], {"variations": missing})
+
+        without_ids = [{"available_quantity": 2, "attribute_combinations": [{"id": "SIZE", "value_id": "3189"}]},
+                       {"id": 12}]
+        self.assertEqual(diff_update({"variations": without_ids}, ITEM)[0], {"variations": without_ids})
+
+    def test_fields_not_in_the_item_are_always_sent(self):
+        update = {"description": {"plain_text": "Descripción nueva del producto"}, "price": 1299}
+        changes, unchanged = diff_update(update, ITEM)
+        self.assertEqual(changes, {"description": update["description"]})
+        self.assertEqual(unchanged, ["price"])
+        self.assertEqual(diff_update({"price": 10}, {"id": "MLM1"})[0], {"price": 10})
+
+
+if __name__ == "__main__":
+    unittest.main()
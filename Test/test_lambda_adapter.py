@@ -0,0 +1,83 @@
+"""
+Pruebas del adaptador de eventos de API Gateway (App/Utils/LambdaAdapter.py).
+
+Uso:
+    python -m unittest Test/test_lambda_adapter.py
+"""
+import base64
+import gzip
+import os
+import sys
+import unittest
+
+from flask import Flask, Response, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Utils.LambdaAdapter import response  # noqa: E402
+
+
+def event(method="GET", path="/", body=None, is_base64=False, headers=None):
+    return {
+        "httpMethod": method,
+        "path": path,
+        "headers": dict({"Host": "api.example.com", "Content-Type": "application/json"}, **(headers or {})),
+        "queryStringParameters": None,
+        "body": body,
+        "isBase64Encoded": is_base64,
+        "requestContext": {}
+    }
+
+
+def create_app():
+    app = Flask(__name__)
+
+    @app.route("/cookies")
+    def cookies():
+        result = Response('{"ok": true}', mimetype="application/json")
+        result.set_cookie("session", "a")
+        result.set_cookie("theme", "dark")
+        return result
+
+    @app.route("/gzip")
+    def compressed():
+        result = Response(gzip.compress(b'{"ok": true}'), mimetype="application/json")
+        result.headers["Content-Encoding"] = "gzip"
+        return result
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        return Response(request.get_data(), mimetype="application/json")
+
+    return app
+
+
+class LambdaAdapterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+
+    def test_repeated_headers_survive(self):
+        result = response(self.app, event(path="/cookies"), None)
+        self.assertEqual(result["statusCode"], 200)
+        cookies = result["multiValueHeaders"]["Set-Cookie"]
+        self.assertEqual(len(cookies), 2)
+        self.assertTrue(cookies[0].startswith("session=a"))
+        self.assertTrue(cookies[1].startswith("theme=dark"))
+        self.assertEqual(result["headers"]["Set-Cookie"], cookies[-1])
+        self.assertEqual(result["multiValueHeaders"]["Content-Type"], ["application/json"])
+
+    def test_compressed_responses_are_base64(self):
+        result = response(self.app, event(path="/gzip"), None)
+        self.assertTrue(result["isBase64Encoded"])
+        self.assertEqual(gzip.decompress(base64.b64decode(result["body"])), b'{"ok": true}')
+
+    def test_base64_request_bodies_are_decoded(self):
+        body = base64.b64encode(b'{"a": 1}').decode("ascii")
+        result = response(self.app, event("POST", "/echo", body, is_base64=True), None)
+        self.assertFalse(result["isBase64Encoded"])
+        self.assertEqual(result["body"], '{"a": 1}')
+
+
+if __name__ == "__main__":
+    unittest.main()
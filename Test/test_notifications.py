@@ -0,0 +1,164 @@
+"""
+Pruebas de la recepción de notificaciones de Mercado Libre (App/Services/MeliNotificationsService.py).
+
+Uso:
+    python -m unittest Test/test_notifications.py
+"""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Services.MeliNotificationsService import MeliNotificationsService, notifications_received  # noqa: E402
+from App.Utils.Batcher import KeyedBatcher  # noqa: E402
+from App.Utils.Cache import TTLCache  # noqa: E402
+from App.Utils.TieredCache import InMemorySharedStore, TieredCache  # noqa: E402
+
+USER_ID = 100001
+
+
+class FakeUsersService:
+    """error simula una falla transitoria al consultar el vendedor (ej: throttling de DynamoDB)."""
+
+    def __init__(self):
+        self.error = None
+
+    def getMeliUserByUserId(self, user_id):
+        if self.error:
+            return {"error": self.error}
+        return {"user_id": user_id, "shop_id": "1234"} if user_id == USER_ID else None
+
+
+class FakeProductsService:
+    """Registra las lecturas; failing contiene los items cuya lectura falla con 500."""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+        self.gone = set()
+        self._lock = threading.Lock()
+
+    def refresh_items(self, user, item_ids):
+        with self._lock:
+            self.calls.append(list(item_ids))
+        results = {}
+        for item_id in item_ids:
+            if item_id in self.failing:
+                results[item_id] = {"item_id": item_id, "status_code": 500, "error": "Error interno"}
+            elif item_id in self.gone:
+                results[item_id] = {"item_id": item_id, "status_code": 404, "error": "Item no encontrado"}
+            else:
+                results[item_id] = {"item_id": item_id, "status_code": 200, "product": {"id": item_id}}
+        return results
+
+
+def notification(notification_id, item_id="MLM1000001", user_id=USER_ID, topic="items"):
+    return {"_id": notification_id, "resource": f"/items/{item_id}", "user_id": user_id, "topic": topic,
+            "sent": "2026-10-19T00:00:00.000Z"}
+
+
+class NotificationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.users = FakeUsersService()
+        self.products = FakeProductsService()
+        self.store = InMemorySharedStore()
+
+    def service(self, inline=False):
+        os.environ["MELI_NOTIFICATION_INLINE"] = "true" if inline else "false"
+        try:
+            return MeliNotificationsService(
+                self.users, self.products,
+                dedupe_cache=TieredCache(TTLCache(maxsize=64, ttl=300, name="notifications"), self.store),
+                batcher=KeyedBatcher(max_delay=60, name="test")
+            )
+        finally:
+            os.environ.pop("MELI_NOTIFICATION_INLINE", None)
+
+    def test_ignores_other_topics_and_resources(self):
+        service = self.service()
+        self.assertEqual(service.receive_notification(notification("a", topic="orders_v2"))["status"], "ignored")
+        self.assertEqual(service.receive_notification(
+            dict(notification("b"), resource="/questions/1"))["status"], "ignored")
+        self.assertEqual(len(service.batcher), 0)
+
+    def test_ignored_topics_share_one_metric_label(self):
+        service = self.service()
+        before = notifications_received.value(topic="other", result="ignored")
+        service.receive_notification(notification("a", topic="topic-inventado-1"))
+        service.receive_notification(notification("b", topic="topic-inventado-2"))
+        self.assertEqual(notifications_received.value(topic="other", result="ignored"), before + 2)
+        self.assertEqual(notifications_received.value(topic="topic-inventado-1", result="ignored"), 0)
+
+    def test_batches_coalesce_and_flush(self):
+        service = self.service()
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "accepted")
+        self.assertEqual(service.receive_notification(notification("b"))["status"], "coalesced")
+        self.assertEqual(service.receive_notification(notification("c", "MLM1000003"))["status"], "accepted")
+        self.assertEqual(self.products.calls, [])
+
+        service.batcher.flush()
+
+        self.assertEqual(self.products.calls, [["MLM1000001", "MLM1000003"]])
+        self.assertEqual(len(service.batcher), 0)
+
+    def test_retries_after_refresh_are_duplicates(self):
+        service = self.service()
+        service.receive_notification(notification("a"))
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "coalesced")
+        service.batcher.flush()
+
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "duplicate")
+        # Otro contenedor con el mismo almacén compartido
+        self.assertEqual(self.service().receive_notification(notification("a"))["status"], "duplicate")
+
+    def test_failed_refresh_does_not_record_the_notification(self):
+        service = self.service()
+        self.products.failing.add("MLM1000001")
+        service.receive_notification(notification("a"))
+        service.batcher.flush()
+
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "accepted")
+        self.products.failing.clear()
+        service.batcher.flush()
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "duplicate")
+        self.assertEqual(len(self.products.calls), 2)
+
+    def test_inline_refreshes_before_answering(self):
+        service = self.service(inline=True)
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "refreshed")
+        self.assertEqual(self.products.calls, [["MLM1000001"]])
+        self.assertEqual(len(service.batcher), 0)
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "duplicate")
+
+    def test_inline_failure_is_an_error_so_it_is_retried(self):
+        service = self.service(inline=True)
+        self.products.failing.add("MLM1000001")
+        self.assertIn("error", service.receive_notification(notification("a")))
+
+        self.products.failing.clear()
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "refreshed")
+
+    def test_inline_user_lookup_failure_is_retried(self):
+        service = self.service(inline=True)
+        self.users.error = "ProvisionedThroughputExceededException"
+        self.assertIn("error", service.receive_notification(notification("a")))
+        self.assertEqual(self.products.calls, [])
+
+        self.users.error = None
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "refreshed")
+        self.assertEqual(self.products.calls, [["MLM1000001"]])
+
+    def test_inline_final_outcomes_are_recorded(self):
+        service = self.service(inline=True)
+        self.products.gone.add("MLM1000001")
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "refreshed")
+        self.assertEqual(service.receive_notification(notification("b", user_id=999))["status"], "refreshed")
+        self.assertEqual(service.receive_notification(notification("a"))["status"], "duplicate")
+        self.assertEqual(service.receive_notification(notification("b", user_id=999))["status"], "duplicate")
+
+
+if __name__ == "__main__":
+    unittest.main()
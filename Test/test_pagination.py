@@ -0,0 +1,54 @@
+"""
+Pruebas de la paginación por cursor (App/Utils/Pagination.py) y del bloque de
+paginación de ResponseHandlerService.
+
+Uso:
+    python -m unittest Test/test_pagination.py
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Services.ResponseHandlerService import ResponseHandlerService  # noqa: E402
+from App.Utils.Pagination import decode_cursor, page_info  # noqa: E402
+
+
+class PageInfoTest(unittest.TestCase):
+    def test_known_total(self):
+        info = page_info(45, 20, 20, 20)
+        self.assertEqual(info["total_items"], 45)
+        self.assertEqual(info["total_pages"], 3)
+        self.assertEqual(info["current_page"], 2)
+        self.assertEqual(decode_cursor(info["next_cursor"]), 40)
+
+        last = page_info(45, 40, 20, 5)
+        self.assertIsNone(last["next_cursor"])
+
+    def test_unknown_total_is_not_invented(self):
+        info = page_info(None, 0, 20, 20)
+        self.assertIsNone(info["total_items"])
+        self.assertIsNone(info["total_pages"])
+        self.assertEqual(decode_cursor(info["next_cursor"]), 20)
+
+        last = page_info(None, 20, 20, 7)
+        self.assertIsNone(last["total_items"])
+        self.assertIsNone(last["next_cursor"])
+
+
+class ResponsePaginationTest(unittest.TestCase):
+    def test_next_cursor_always_present(self):
+        handler = ResponseHandlerService()
+        handler.buildPaginatedResponse(**page_info(45, 0, 20, 20))
+        body, _ = handler.doResponse()
+        self.assertIsNotNone(body["pagination"]["next_cursor"])
+
+        # La siguiente respuesta (sin paginación) mantiene la misma forma
+        body, _ = handler.doResponse()
+        self.assertIn("next_cursor", body["pagination"])
+        self.assertIsNone(body["pagination"]["next_cursor"])
+
+
+if __name__ == "__main__":
+    unittest.main()
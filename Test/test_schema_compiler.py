@@ -0,0 +1,240 @@
+"""
+Pruebas de conformidad entre los validadores compilados (App/Utils/SchemaCompiler.py) y marshmallow.
+
+Para cada esquema de App/Models/Schemas se genera un payload válido y cientos de variantes
+(campos faltantes, nulos, tipos incorrectos, campos desconocidos, listas con elementos
+inválidos, valores fuera de rango) y se verifica que el validador compilado produzca
+exactamente el mismo resultado y los mismos mensajes de error que schema.load/schema.validate.
+
+Uso:
+    python -m unittest Test/test_schema_compiler.py
+"""
+import collections
+import copy
+import inspect
+import math
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from marshmallow import Schema, ValidationError, fields  # noqa: E402
+
+from App.Models.Schemas import MeliSchemas, MeliSizeGridSchemas  # noqa: E402
+from App.Utils.SchemaCompiler import CompiledSchema, compile_schema  # noqa: E402
+
+# Valores con formato específico que exigen algunos validadores @validates
+FIELD_SAMPLES = {
+    "item_id": "MLM123456789",
+    "category_id": "MLM1055",
+    "item_ids": ["MLM1", "MLM22", "MLA333"],
+}
+
+# Valores de tipos incorrectos o límite para las mutaciones
+ODD_VALUES = [None, "", "texto", "123", "1.5", "MLM1", b"bytes", 0, 1, -1, 10 ** 20, 1.5, -3.0,
+              float("nan"), float("inf"), True, False, [], [1, "a"], {}, {"a": 1}, ("t",), "x" * 80]
+
+
+def schema_classes():
+    """Todas las clases Schema declaradas en los módulos de esquemas del proyecto."""
+    classes = []
+    for module in (MeliSchemas, MeliSizeGridSchemas):
+        for name, value in inspect.getmembers(module, inspect.isclass):
+            if issubclass(value, Schema) and value is not Schema and value.__module__ == module.__name__:
+                classes.append(value)
+    return classes
+
+
+def sample_value(field, name):
+    """Genera un valor válido para un campo."""
+    if name in FIELD_SAMPLES:
+        return copy.deepcopy(FIELD_SAMPLES[name])
+    if isinstance(field, fields.Nested):
+        return sample_payload(field.schema)
+    if isinstance(field, fields.List):
+        return [sample_value(field.inner, name) for _ in range(3)]
+    if isinstance(field, fields.Dict):
+        return {"clave": "valor"}
+    if isinstance(field, fields.Boolean):
+        return True
+    if isinstance(field, fields.Integer):
+        return 5
+    if isinstance(field, fields.Float):
+        return 150.5
+    return "texto de prueba suficientemente largo"
+
+
+def sample_payload(schema):
+    """Genera un payload válido con todos los campos del esquema."""
+    payload = {}
+    for name, field in schema.load_fields.items():
+        payload[field.data_key or name] = sample_value(field, name)
+    return payload
+
+
+def field_paths(schema, payload, prefix=()):
+    """Rutas (tuplas de llaves/índices) de todos los valores del payload que corresponden a campos."""
+    paths = []
+    for name, field in schema.load_fields.items():
+        key = field.data_key or name
+        if key not in payload:
+            continue
+        path = prefix + (key,)
+        paths.append(path)
+        value = payload[key]
+        inner = field.inner if isinstance(field, fields.List) else field
+        if isinstance(inner, fields.Nested):
+            if isinstance(field, fields.List):
+                items = enumerate(value) if isinstance(value, list) else []
+            else:
+                items = [(None, value)]
+            for index, item in items:
+                if isinstance(item, dict):
+                    item_prefix = path if index is None else path + (index,)
+                    paths.extend(field_paths(inner.schema, item, item_prefix))
+        elif isinstance(field, fields.List) and isinstance(value, list):
+            paths.extend(path + (index,) for index in range(len(value)))
+    return paths
+
+
+def mutate(payload, path, action, value=None):
+    """Devuelve una copia del payload con la ruta eliminada, reemplazada o con una llave extra."""
+    mutated = copy.deepcopy(payload)
+    target = mutated
+    for key in path[:-1]:
+        target = target[key]
+    last = path[-1]
+    if action == "delete":
+        if isinstance(target, list):
+            target.pop(last)
+        else:
+            target.pop(last, None)
+    elif action == "replace":
+        target[last] = value
+    elif action == "unknown" and isinstance(target[last], dict):
+        target[last]["campo_desconocido"] = value
+    return mutated
+
+
+def generate_cases(schema, rng, random_cases=150):
+    """Casos deterministas: payload válido, todas las mutaciones simples y combinaciones aleatorias."""
+    base = sample_payload(schema)
+    cases = [base, {}, None, [], "texto", dict(base, campo_desconocido=1)]
+    paths = field_paths(schema, base)
+
+    for path in paths:
+        cases.append(mutate(base, path, "delete"))
+        for value in ODD_VALUES:
+            cases.append(mutate(base, path, "replace", value))
+        cases.append(mutate(base, path, "unknown", 1))
+
+    for _ in range(random_cases):
+        case = base
+        for _ in range(rng.randint(2, 4)):
+            case_paths = field_paths(schema, case) if isinstance(case, dict) else []
+            if not case_paths:
+                break
+            path = rng.choice(case_paths)
+            action = rng.choice(["delete", "replace", "replace", "unknown"])
+            case = mutate(case, path, action, rng.choice(ODD_VALUES))
+        cases.append(case)
+    return cases
+
+
+def marshmallow_outcome(schema, data):
+    try:
+        return "ok", schema.load(data)
+    except ValidationError as error:
+        return "error", (error.messages, error.valid_data)
+
+
+def compiled_outcome(compiled, data):
+    try:
+        return "ok", compiled.load(data)
+    except ValidationError as error:
+        return "error", (error.messages, error.valid_data)
+
+
+def same(left, right):
+    """Igualdad que considera NaN igual a NaN (los payloads de prueba incluyen NaN)."""
+    if isinstance(left, float) and isinstance(right, float) and math.isnan(left) and math.isnan(right):
+        return True
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(same(left[key], right[key]) for key in left)
+    if isinstance(left, (list, tuple)) and isinstance(right, (list, tuple)):
+        return type(left) is type(right) and len(left) == len(right) and all(map(same, left, right))
+    return type(left) is type(right) and left == right
+
+
+class SchemaCompilerConformanceTest(unittest.TestCase):
+
+    def test_all_schemas_are_compiled(self):
+        for schema_cls in schema_classes():
+            with self.subTest(schema=schema_cls.__name__):
+                self.assertFalse(compile_schema(schema_cls()).fallback)
+
+    def test_load_matches_marshmallow(self):
+        rng = random.Random(20240601)
+        for schema_cls in schema_classes():
+            schema = schema_cls()
+            compiled = CompiledSchema(schema)
+            for case in generate_cases(schema, rng):
+                with self.subTest(schema=schema_cls.__name__, case=case):
+                    expected = marshmallow_outcome(schema, copy.deepcopy(case))
+                    actual = compiled_outcome(compiled, copy.deepcopy(case))
+                    self.assertEqual(expected[0], actual[0])
+                    self.assertTrue(same(expected[1], actual[1]), f"{expected[1]!r} != {actual[1]!r}")
+
+    def test_validate_matches_marshmallow(self):
+        rng = random.Random(7)
+        for schema_cls in schema_classes():
+            schema = schema_cls()
+            compiled = CompiledSchema(schema)
+            for case in generate_cases(schema, rng, random_cases=50):
+                with self.subTest(schema=schema_cls.__name__, case=case):
+                    self.assertEqual(schema.validate(copy.deepcopy(case)), compiled.validate(copy.deepcopy(case)))
+
+    def test_large_lists_report_item_indexes(self):
+        schema = MeliSchemas.ProductVerifyBatchRequestSchema()
+        data = {"shop_id": "1", "item_ids": ["MLM1"] * 3000 + [5, None, "bad"]}
+        self.assertEqual(marshmallow_outcome(schema, data), compiled_outcome(compile_schema(schema), data))
+
+    def test_schema_with_hooks_falls_back_to_marshmallow(self):
+        from marshmallow import validates_schema
+
+        class HookedSchema(Schema):
+            value = fields.Int(required=True)
+
+            @validates_schema
+            def check(self, data, **kwargs):
+                raise ValidationError("siempre falla")
+
+        compiled = compile_schema(HookedSchema)
+        self.assertTrue(compiled.fallback)
+        self.assertEqual(compiled.validate({"value": 1}), HookedSchema().validate({"value": 1}))
+
+    def test_multi_field_validates_hooks(self):
+        # Forma de marshmallow 4: un hook con varios campos en "field_names"
+        schema = MeliSchemas.ProductVerifyBatchRequestSchema()
+        schema._hooks = {key: list(hooks) for key, hooks in schema._hooks.items()}
+        schema._hooks["validates"] = [(name, many, {"field_names": (kwargs["field_name"],)})
+                                      for name, many, kwargs in schema._hooks["validates"]]
+        compiled = CompiledSchema(schema)
+        self.assertFalse(compiled.fallback)
+        data = {"shop_id": "1", "item_ids": ["MLM1", 5]}
+        self.assertEqual(marshmallow_outcome(MeliSchemas.ProductVerifyBatchRequestSchema(), data),
+                         compiled_outcome(compiled, data))
+
+    def test_unexpected_hook_structure_falls_back_to_marshmallow(self):
+        # Un cambio interno de marshmallow no debe romper la compilación: se usa schema.load
+        for hooks in ({"validates": [("check", False)]}, {"validates": [("check", False, {"otro": "x"})]}, None):
+            schema = MeliSchemas.ProductVerifyBatchRequestSchema()
+            schema._hooks = collections.defaultdict(list, hooks) if hooks is not None else None
+            with self.subTest(hooks=hooks):
+                self.assertTrue(CompiledSchema(schema).fallback)
+
+
+if __name__ == "__main__":
+    unittest.main()
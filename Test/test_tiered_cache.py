@@ -0,0 +1,147 @@
+"""
+Pruebas de la caché de dos niveles (App/Utils/TieredCache.py) con InMemorySharedStore.
+
+Cada TieredCache con su propia TTLCache local representa un contenedor de Lambda distinto
+que comparte el mismo almacén.
+
+Uso:
+    python -m unittest Test/test_tiered_cache.py
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Utils.Cache import TTLCache  # noqa: E402
+from App.Utils.CategoryTree import CategoryTree  # noqa: E402
+from App.Utils.TieredCache import InMemorySharedStore, TieredCache  # noqa: E402
+
+
+def container_cache(store, **kwargs):
+    return TieredCache(TTLCache(maxsize=64, ttl=300, name="test"), store, **kwargs)
+
+
+def sample_tree():
+    tree = CategoryTree([{"id": "MLM1000", "name": "Ropa"}])
+    shoes = tree.add("MLM1001", "Calzado")
+    tree.add("MLM1002", "Tenis", shoes)
+    tree.add("MLM1003", "Botas", shoes)
+    tree.add("MLM1004", "Playeras")
+    return tree
+
+
+class TieredCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = InMemorySharedStore()
+
+    def test_round_trip_raw_and_compressed(self):
+        value = {"name": "Categoría", "values": list(range(50))}
+        for compress_min_bytes, prefix in ((1 << 20, b"\x00"), (1, b"\x01")):
+            writer = container_cache(self.store, compress_min_bytes=compress_min_bytes)
+            writer.set("key", value)
+            data, _ = self.store.get("test:key")
+            self.assertEqual(data[:1], prefix)
+            self.assertEqual(container_cache(self.store).get("key"), value)
+
+    def test_tuple_keys_and_local_copy(self):
+        container_cache(self.store).set(("MLM", "", 3), [1, 2])
+        reader = container_cache(self.store)
+        self.assertEqual(reader.get(("MLM", "", 3)), [1, 2])
+        self.store.delete("test:MLM||3")
+        self.assertEqual(reader.get(("MLM", "", 3)), [1, 2])
+
+    def test_category_tree_state_round_trip(self):
+        tree = sample_tree()
+        container_cache(self.store, encode=CategoryTree.to_state, decode=CategoryTree.from_state).set("tree", tree)
+
+        loaded = container_cache(self.store, encode=CategoryTree.to_state, decode=CategoryTree.from_state).get("tree")
+
+        self.assertIsInstance(loaded, CategoryTree)
+        self.assertEqual(loaded.to_state(), tree.to_state())
+        self.assertEqual([loaded.record(index) for index in range(len(loaded))],
+                         [tree.record(index) for index in range(len(tree))])
+
+    def test_add_only_once_across_containers(self):
+        first, second = container_cache(self.store), container_cache(self.store)
+        self.assertTrue(first.add("notification", 1, ttl=60))
+        self.assertFalse(first.add("notification", 1, ttl=60))
+        self.assertFalse(second.add("notification", 1, ttl=60))
+        second.delete("notification")
+        self.assertTrue(second.add("notification", 1, ttl=60))
+
+    def test_lease_waits_for_other_container(self):
+        loads = []
+
+        def slow_loader():
+            loads.append(1)
+            time.sleep(0.2)
+            return {"loaded": True}
+
+        first = container_cache(self.store, lease_wait=2)
+        second = container_cache(self.store, lease_wait=2)
+        thread = threading.Thread(target=first.get_or_set, args=("tree", slow_loader))
+        thread.start()
+        time.sleep(0.05)
+
+        self.assertEqual(second.get_or_set("tree", slow_loader), {"loaded": True})
+        thread.join()
+        self.assertEqual(len(loads), 1)
+        self.assertIsNone(self.store.get("test:tree#lease"))
+
+    def test_slow_load_only_blocks_its_own_key(self):
+        cache = container_cache(self.store)
+        release = threading.Event()
+        loads = []
+
+        def slow_loader():
+            loads.append(1)
+            release.wait(2)
+            return "slow"
+
+        # 1 y 65 caen en la misma franja de candados de add
+        threads = [threading.Thread(target=cache.get_or_set, args=(1, slow_loader)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        self.assertEqual(cache.get_or_set(65, lambda: "fast"), "fast")
+        self.assertLess(time.monotonic() - started, 0.5)
+
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(cache.get(1), "slow")
+
+    def test_loader_errors_are_not_cached(self):
+        cache = container_cache(self.store)
+
+        def failing_loader():
+            raise ValueError("upstream")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_set("key", failing_loader)
+        self.assertIsNone(self.store.get("test:key#lease"))
+        self.assertEqual(cache.get_or_set("key", lambda: 7), 7)
+
+    def test_shared_store_errors_fall_back_to_local(self):
+        class BrokenStore:
+            def get(self, key, *args):
+                raise ConnectionError("down")
+
+            set = add = delete = get
+
+        cache = container_cache(BrokenStore())
+        cache.set("key", 1)
+        self.assertEqual(cache.get("key"), 1)
+        self.assertTrue(cache.add("other", 2))
+        self.assertEqual(cache.get_or_set("third", lambda: 3), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
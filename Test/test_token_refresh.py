@@ -0,0 +1,110 @@
+"""
+Pruebas de la renovación de token de MeliApiClient ante respuestas 401.
+
+El refresh token de Mercado Libre es de un solo uso: los hilos que reciben un 401 con el
+mismo token deben compartir una sola renovación.
+
+Uso:
+    python -m unittest Test/test_token_refresh.py
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from App.Services.AccessTokenService import AccessTokenService  # noqa: E402
+from App.Services.MeliApiClient import MeliApiClient  # noqa: E402
+from App.Services.MeliProducts import MeliProducts  # noqa: E402
+from App.Services.MeliUsersService import MeliUsersService  # noqa: E402
+from Test.meli_simulator import DEFAULT_SHOP_ID, InMemoryMeliUsers, MeliSimulator  # noqa: E402
+
+
+class CountingUsersService:
+    """Renueva tokens con una demora para que los hilos concurrentes se encimen."""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def refreshAccessToken(self, user_id):
+        time.sleep(0.05)
+        with self._lock:
+            self.calls += 1
+            return {"access_token": f"token-{self.calls}", "refresh_token": f"refresh-{self.calls}"}
+
+
+class TokenRefreshTest(unittest.TestCase):
+
+    def test_concurrent_refreshes_share_one_call(self):
+        users_service = CountingUsersService()
+        client = MeliApiClient(users_service)
+        user = {"user_id": 100001, "access_token": "expired"}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: client.refresh_token(user, "expired"), range(8)))
+
+        self.assertEqual(users_service.calls, 1)
+        self.assertEqual(user["access_token"], "token-1")
+
+    def test_separate_user_copies_share_one_call(self):
+        # Cada petición trae su propio diccionario del usuario (leído de la base de datos)
+        users_service = CountingUsersService()
+        client = MeliApiClient(users_service)
+        users = [{"user_id": 100001, "access_token": "expired"} for _ in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda user: client.refresh_token(user, "expired"), users))
+
+        self.assertEqual(users_service.calls, 1)
+        self.assertEqual({user["access_token"] for user in users}, {"token-1"})
+
+        # Una copia leída después con el token viejo reutiliza la misma renovación
+        late = {"user_id": 100001, "access_token": "expired"}
+        client.refresh_token(late, "expired")
+        self.assertEqual(users_service.calls, 1)
+        self.assertEqual(late["access_token"], "token-1")
+
+    def test_refresh_without_expired_token_always_renews(self):
+        users_service = CountingUsersService()
+        client = MeliApiClient(users_service)
+        user = {"user_id": 100001, "access_token": "expired"}
+
+        client.refresh_token(user)
+        client.refresh_token(user)
+
+        self.assertEqual(users_service.calls, 2)
+
+    def test_batch_verification_refreshes_once(self):
+        simulator = MeliSimulator()
+        simulator.start()
+        previous = {name: os.environ.get(name) for name in ("MELI_API_BASE_URL", "ACCESS_TOKEN_URL")}
+        os.environ["MELI_API_BASE_URL"] = simulator.base_url
+        os.environ["ACCESS_TOKEN_URL"] = simulator.token_url
+        try:
+            users = InMemoryMeliUsers()
+            products = MeliProducts(MeliUsersService(users, AccessTokenService(users)))
+            simulator.expire_tokens()
+            simulator.reset_stats()
+
+            result = products.verify_products_batch({
+                "shop_id": DEFAULT_SHOP_ID,
+                "item_ids": [f"MLM{1000001 + 2 * i}" for i in range(200)]
+            })
+
+            self.assertEqual(simulator.stats["token_refreshes"], 1)
+            self.assertEqual(result["summary"]["errors"], 0)
+        finally:
+            simulator.stop()
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,23 @@
+import os
+
 from flask import Flask
-from aws_lambda_wsgi import response
 
 from App.Containers.Container import Container
+from App.Middleware.CompressionMiddleware import apply_compression
+from App.Middleware.ProfilingMiddleware import apply_profiling
+from App.Middleware.TimingMiddleware import apply_timing
 from App.Routes.customRoutes import create_custom_routes
+from App.Routes.metricsRoutes import create_metrics_routes
+from App.Routes.notificationsRoutes import create_notifications_routes
 from App.Routes.productsRoutes import create_products_routes
 from App.Utils.Logger import configure_mongodb, app_logger
 from App.Routes.sizeChartRoutes import create_size_chart_routes
+from App.Utils.JsonProvider import FastJSONProvider
+from App.Utils.LambdaAdapter import response
+from App.Utils.Metrics import metrics
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 container = Container()
 
 # Registrar rutas existentes
@@ -17,6 +27,23 @@ app.register_blueprint(create_products_routes(container.products_controller()))
 # Registrar nuevas rutas para guías de tallas
 app.register_blueprint(create_size_chart_routes(container.size_chart_controller()))
 
+# Notificaciones de Mercado Libre (URL de callback de la aplicación)
+app.register_blueprint(create_notifications_routes(container.notifications_controller()))
+
+# En modo servidor las métricas se exponen para scrape; en Lambda se envían como EMF
+if not os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    app.register_blueprint(create_metrics_routes(container.metrics_controller()))
+
+# Tiempos por petición (Server-Timing, logs e histogramas); se registra antes que la
+# compresión para que el total incluya el tiempo de compresión
+apply_timing(app)
+
+# Compresión gzip/brotli negociada por Accept-Encoding
+apply_compression(app)
+
+# Perfilado bajo demanda (solo si PROFILING_TOKEN está configurado)
+apply_profiling(app)
+
 def lambda_handler(event, context):
     configure_mongodb(
         app_logger,
@@ -24,4 +51,11 @@ def lambda_handler(event, context):
         "meli_api_logs",
         "logs"
     )
-    return response(app, event, context)
\ No newline at end of file
+    try:
+        return response(app, event, context)
+    finally:
+        # El contenedor se congela al terminar la invocación: procesar los lotes de
+        # notificaciones pendientes (vacíos si MELI_NOTIFICATION_INLINE está activo)
+        container.notification_batcher().flush()
+        # Métricas de la invocación en Embedded Metric Format (CloudWatch las extrae del log)
+        metrics.flush_emf()
\ No newline at end of file